@@ -0,0 +1,20 @@
+import re
+
+# Devanagari vowel signs are not matched by \w, so include the block (minus the danda punctuation)
+TOKEN_PATTERN = re.compile(r'[\w\u0900-\u0963\u0966-\u097F]+')
+
+
+class AnalysisContext:
+    """Per-turn analysis of a user message, built once and shared by every stage"""
+
+    def __init__(self, message, language):
+        """Capture the raw message and its detected language"""
+        self.message = message
+        self.language = language
+        self._keyword_hits = None
+
+    def keyword_hits(self, index):
+        """Keyword categories found in the message, scanned once"""
+        if self._keyword_hits is None:
+            self._keyword_hits = index.scan(self.message)
+        return self._keyword_hits
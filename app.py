@@ -1,22 +1,201 @@
 import os
+import hmac
+import uuid
+import atexit
 import logging
-from flask import Flask, render_template, request, jsonify, session
+import threading
+import multiprocessing
+from io import BytesIO
+import json
+import base64
+from flask import Flask, Request, render_template, request, jsonify, session, send_file, Response, stream_with_context
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.middleware.proxy_fix import ProxyFix
 from assistant import MentalHealthAssistant
-from voice_handler import VoiceHandler
+from voice_handler import VoiceHandler, AUDIO_FORMATS
+from tts_pool import TTSPoolBusy
+from voice_capabilities import VoiceCapabilityRegistry
+import audio_cache
+import metrics
+from database import create_database_engine
+from write_behind import BatchWriter
+from session_store import DatabaseSessionInterface
+from conversation_log import ConversationLogger
+from meditation_tracking import MeditationTracker
+from content_catalog import ContentCatalog
+from warmup import Warmup
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 
+class InMemoryUploadRequest(Request):
+    """Request that keeps multipart file parts in memory instead of spooling them to temp files
+    
+    MAX_CONTENT_LENGTH bounds how large they can get.
+    """
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return BytesIO()
+
 # Create the app
 app = Flask(__name__)
+app.request_class = InMemoryUploadRequest
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 
+# Per-route request metrics and the /metrics endpoint
+metrics.init_app(app)
+
+# PostgreSQL is optional; without it sessions stay in the signed cookie
+db_engine = create_database_engine()
+db_writer = BatchWriter(db_engine) if db_engine else None
+if db_writer:
+    atexit.register(db_writer.close)
+
+if db_writer and os.environ.get('SESSION_BACKEND', 'database').lower() == 'database':
+    app.session_interface = DatabaseSessionInterface(db_engine)
+
+# Chat turns are logged to conversation_logs off the response path
+conversation_logger = None
+if db_writer and os.environ.get('CONVERSATION_LOGGING', 'true').lower() in ('1', 'true', 'yes'):
+    conversation_logger = ConversationLogger(db_writer, app.session_interface)
+
+# Meditation starts and completions are recorded through the same write path
+meditation_tracker = MeditationTracker(db_engine, db_writer, app.session_interface) if db_writer else None
+
+@app.cli.command('replay-conversation-logs')
+def replay_conversation_logs_command():
+    """Queue conversation log rows spilled to disk for insertion again"""
+    if not conversation_logger:
+        logging.error("Conversation logging is not enabled")
+        return
+    queued = conversation_logger.replay_spill()
+    db_writer.close(timeout=60)
+    logging.info(f"Replayed {queued} spilled conversation log rows")
+
+@app.cli.command('prune-sessions')
+def prune_sessions_command():
+    """Delete user_sessions rows that have expired"""
+    if not isinstance(app.session_interface, DatabaseSessionInterface):
+        logging.error("Sessions are not stored in the database")
+        return
+    max_age = app.permanent_session_lifetime.total_seconds()
+    deleted = app.session_interface.prune(max_age)
+    logging.info(f"Deleted {deleted} expired sessions")
+
 # Initialize the mental health assistant and voice handler
 assistant = MentalHealthAssistant()
 voice_handler = VoiceHandler()
 
+# Meditation scripts and resources never change at runtime, so serialize them once
+content_catalog = ContentCatalog(assistant)
+
+# Slow imports (translation, sentiment, voice) load in the background after the
+# worker starts; /readyz reports when they are done, /healthz only liveness
+warmup = Warmup([
+    ('assistant', assistant.warm_up),
+    ('voice', voice_handler.ensure_initialized)
+])
+
+# Voice capabilities are probed in the background and served from memory
+voice_capabilities = VoiceCapabilityRegistry(voice_handler)
+
+@app.cli.command('prewarm-audio')
+def prewarm_audio_command():
+    """Render every canned response and meditation step into the audio cache"""
+    audio_cache.prewarm(voice_handler, assistant)
+
+def prewarm_audio_cache():
+    audio_cache.prewarm_once(voice_handler, assistant)
+
+def load_shared_modules():
+    """Import slow library code without creating clients, engines or threads
+
+    Safe to run in a preloading gunicorn master: the loaded modules are then
+    shared copy-on-write by every forked worker.
+    """
+    for load in (assistant.load_shared, voice_handler.preload_libraries):
+        try:
+            load()
+        except Exception as e:
+            logging.error(f"Preloading {load.__name__} failed: {e}")
+
+def start_worker_services():
+    """Start the threads and clients each worker process needs for itself"""
+    metrics.mark_worker_started()
+    
+    if db_engine:
+        # Never reuse pooled connections inherited from a parent process
+        db_engine.dispose(close=False)
+    
+    if os.environ.get('WARMUP_ON_START', 'true').lower() in ('1', 'true', 'yes'):
+        warmup.start()
+    else:
+        warmup.skip()
+    
+    voice_capabilities.start()
+    
+    # Optionally pre-warm the audio cache in the background when a worker starts
+    if os.environ.get('AUDIO_CACHE_PREWARM', '').lower() in ('1', 'true', 'yes'):
+        threading.Thread(target=prewarm_audio_cache, daemon=True).start()
+
+def importing_into_spawned_child():
+    """Whether multiprocessing is re-importing the main script into a spawned child
+    
+    Under `python app.py` or `python main.py` every TTS pool worker re-imports
+    this module while bootstrapping; it must not start services of its own.
+    """
+    return getattr(multiprocessing.current_process(), '_inheriting', False)
+
+# In preload mode (see gunicorn.conf.py) this module is imported once in the
+# gunicorn master and each worker starts its services from the post_fork hook
+if os.environ.get('SERENITY_PRELOAD') == '1':
+    load_shared_modules()
+elif not importing_into_spawned_child():
+    start_worker_services()
+
+# Upper bound on messages accepted by a single /chat/batch request
+CHAT_BATCH_MAX_ITEMS = int(os.environ.get('CHAT_BATCH_MAX_ITEMS', '100'))
+# Batches are mostly replays and evaluation runs, so their turns stay out of conversation_logs
+CHAT_BATCH_LOGGING = os.environ.get('CHAT_BATCH_LOGGING', '').lower() in ('1', 'true', 'yes')
+
+# Largest audio upload accepted by /voice/speech-to-text, checked before buffering
+VOICE_MAX_UPLOAD_BYTES = int(os.environ.get('VOICE_MAX_UPLOAD_BYTES', str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Audio uploads are the largest bodies any route accepts. Werkzeug enforces
+# this while reading, so it also bounds chunked uploads without a Content-Length
+app.config['MAX_CONTENT_LENGTH'] = VOICE_MAX_UPLOAD_BYTES
+
+# Browser cache lifetime for binary text-to-speech responses
+TTS_RESPONSE_MAX_AGE = int(os.environ.get('TTS_RESPONSE_MAX_AGE', '86400'))
+
+# Cache lifetime for meditation scripts and resources
+CONTENT_MAX_AGE = int(os.environ.get('CONTENT_MAX_AGE', '86400'))
+
+class UploadTooLarge(Exception):
+    """Raised when a request body exceeds its size limit"""
+
+def read_upload(stream, limit=VOICE_MAX_UPLOAD_BYTES):
+    """Read a binary upload in chunks into a single buffer, enforcing the size limit"""
+    buffer = bytearray()
+    while True:
+        chunk = stream.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            return buffer
+        if len(buffer) + len(chunk) > limit:
+            raise UploadTooLarge()
+        buffer += chunk
+
+def chat_payload(response):
+    """Shape an assistant response for the chat API"""
+    return {
+        'success': True,
+        'response': response['message'],
+        'language': response['language'],
+        'session_type': response.get('session_type'),
+        'crisis_detected': response.get('crisis_detected', False)
+    }
+
 @app.route('/')
 def index():
     """Main chat interface"""
@@ -27,6 +206,17 @@ def index():
     
     return render_template('index.html')
 
+@app.route('/healthz')
+def healthz():
+    """Liveness: the worker is up and serving requests"""
+    return jsonify({'status': 'ok'})
+
+@app.route('/readyz')
+def readyz():
+    """Readiness: background warmup of slow components has finished"""
+    report = warmup.report()
+    return jsonify(report), 200 if report['ready'] else 503
+
 @app.route('/chat', methods=['POST'])
 def chat():
     """Handle chat messages"""
@@ -43,25 +233,109 @@ def chat():
         # Get response from assistant
         response = assistant.process_message(user_message, session)
         
+        if conversation_logger:
+            conversation_logger.log_turn(session, user_message, response)
+        
+        return jsonify(chat_payload(response))
+        
+    except Exception as e:
+        logging.error(f"Error in chat endpoint: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'An error occurred while processing your message. Please try again.'
+        }), 500
+
+@app.route('/chat/batch', methods=['POST'])
+def chat_batch():
+    """Handle many chat messages, each with its own session state, in one request"""
+    try:
+        data = request.get_json(silent=True) or {}
+        items = data.get('messages')
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({
+                'success': False,
+                'error': 'messages must be a non-empty list'
+            }), 400
+        
+        if len(items) > CHAT_BATCH_MAX_ITEMS:
+            return jsonify({
+                'success': False,
+                'error': f'At most {CHAT_BATCH_MAX_ITEMS} messages are accepted per batch'
+            }), 413
+        
+        batch = []
+        for item in items:
+            if isinstance(item, str):
+                item = {'message': item}
+            if not isinstance(item, dict):
+                item = {}
+            
+            message = str(item.get('message') or '').strip()
+            item_session = item.get('session')
+            item_session = dict(item_session) if isinstance(item_session, dict) else {}
+            batch.append((message, item_session))
+        
+        # Empty messages are rejected per item; the rest go through the batched pipeline
+        valid = [position for position, (message, _) in enumerate(batch) if message]
+        responses = assistant.process_messages([batch[position] for position in valid])
+        
+        results = [{
+            'success': False,
+            'error': 'Message cannot be empty'
+        } for _ in batch]
+        
+        for position, response in zip(valid, responses):
+            if conversation_logger and CHAT_BATCH_LOGGING:
+                conversation_logger.log_turn(batch[position][1], batch[position][0], response)
+            
+            payload = chat_payload(response)
+            payload['emotion'] = response.get('emotion')
+            payload['session'] = batch[position][1]
+            results[position] = payload
+        
         return jsonify({
             'success': True,
-            'response': response['message'],
-            'language': response['language'],
-            'session_type': response.get('session_type'),
-            'crisis_detected': response.get('crisis_detected', False)
+            'results': results
         })
         
     except Exception as e:
-        logging.error(f"Error in chat endpoint: {str(e)}")
+        logging.error(f"Error in chat batch endpoint: {str(e)}")
         return jsonify({
             'success': False,
-            'error': 'An error occurred while processing your message. Please try again.'
+            'error': 'An error occurred while processing the batch. Please try again.'
         }), 500
 
+def content_language():
+    """Language for catalog content: ?lang= if given, else the session's language"""
+    return request.args.get('lang') or session.get('user_language') or 'en'
+
+def catalog_response(entry):
+    """Serve a pre-serialized catalog entry, answering revalidations with 304"""
+    if entry.etag in request.if_none_match:
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(entry.body, mimetype='application/json')
+    
+    response.set_etag(entry.etag)
+    response.cache_control.max_age = CONTENT_MAX_AGE
+    if 'lang' in request.args:
+        # The URL fully determines the content, so shared caches may keep it
+        response.cache_control.public = True
+    else:
+        # The language came from the session cookie
+        response.cache_control.private = True
+        response.vary.add('Cookie')
+    return response
+
 @app.route('/meditation/<session_type>/<duration>')
 def start_meditation(session_type, duration):
     """Start a guided meditation session"""
     try:
+        entry = content_catalog.meditation(session_type, duration, content_language())
+        if entry:
+            return catalog_response(entry)
+        
         # Get user's preferred language from session
         user_language = session.get('user_language', 'en')
         
@@ -84,18 +358,109 @@ def start_meditation(session_type, duration):
             'error': 'Unable to start meditation session. Please try again.'
         }), 500
 
-@app.route('/resources')
-def get_resources():
-    """Get mental health resources"""
+def tracking_unavailable():
+    return jsonify({
+        'success': False,
+        'error': 'Meditation tracking is not available on this server'
+    }), 503
+
+@app.route('/meditation/sessions', methods=['POST'])
+def record_meditation_start():
+    """Record that a guided meditation session was started"""
+    if not meditation_tracker:
+        return tracking_unavailable()
+    
     try:
-        user_language = session.get('user_language', 'en')
-        resources = assistant.get_mental_health_resources(user_language)
+        data = request.get_json(silent=True) or {}
+        session_type = str(data.get('session_type', '')).lower()
+        duration = str(data.get('duration', ''))
+        language = data.get('language') or session.get('user_language') or 'en'
+        
+        if not isinstance(language, str) or not assistant.meditation_scripts.has_script(session_type, duration, language):
+            return jsonify({
+                'success': False,
+                'error': 'Unknown meditation type, duration or language'
+            }), 400
+        
+        meditation_id = meditation_tracker.start(session, session_type, duration, language)
+        if not meditation_id:
+            return jsonify({
+                'success': False,
+                'error': 'Meditation tracking is busy. Please try again.'
+            }), 503
         
         return jsonify({
             'success': True,
-            'resources': resources,
-            'language': user_language
-        })
+            'meditation_id': meditation_id
+        }), 202
+        
+    except Exception as e:
+        logging.error(f"Error recording meditation start: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Unable to record meditation session.'
+        }), 500
+
+@app.route('/meditation/sessions/<meditation_id>/<action>', methods=['POST'])
+def record_meditation_end(meditation_id, action):
+    """Record that a meditation session was completed or abandoned"""
+    if not meditation_tracker:
+        return tracking_unavailable()
+    
+    if action not in ('complete', 'abandon'):
+        return jsonify({'success': False, 'error': 'Unknown action'}), 404
+    
+    try:
+        meditation_id = str(uuid.UUID(meditation_id))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid meditation id'}), 400
+    
+    try:
+        if action == 'complete':
+            queued = meditation_tracker.complete(session, meditation_id)
+        else:
+            queued = meditation_tracker.abandon(session, meditation_id)
+        
+        if not queued:
+            return jsonify({
+                'success': False,
+                'error': 'Meditation tracking is busy. Please try again.'
+            }), 503
+        
+        return jsonify({'success': True}), 202
+        
+    except Exception as e:
+        logging.error(f"Error recording meditation {action}: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Unable to record meditation session.'
+        }), 500
+
+@app.route('/meditation/stats')
+def meditation_stats():
+    """Aggregated meditation starts, completions and abandonments"""
+    if not meditation_tracker:
+        return tracking_unavailable()
+    
+    stats = meditation_tracker.stats()
+    if stats is None:
+        return jsonify({
+            'success': False,
+            'error': 'Meditation statistics are temporarily unavailable'
+        }), 503
+    
+    response = jsonify({
+        'success': True,
+        'stats': stats
+    })
+    response.headers['Cache-Control'] = f"public, max-age={int(meditation_tracker.stats_ttl)}"
+    return response
+
+@app.route('/resources')
+def get_resources():
+    """Get mental health resources"""
+    try:
+        return catalog_response(content_catalog.resources_for(content_language()))
         
     except Exception as e:
         logging.error(f"Error getting resources: {str(e)}")
@@ -117,28 +482,57 @@ def speech_to_text():
                 'error': 'Voice functionality not available on this server'
             }), 503
         
-        data = request.get_json()
-        if not data:
-            logging.error("No JSON data received")
+        if request.content_length and request.content_length > VOICE_MAX_UPLOAD_BYTES:
             return jsonify({
                 'success': False,
-                'error': 'No data provided'
-            }), 400
+                'error': 'Audio recording is too large'
+            }), 413
+        
+        if request.mimetype == 'application/json':
+            # Compatibility mode: base64 audio inside a JSON body
+            data = request.get_json(silent=True)
+            if not data:
+                logging.error("No JSON data received")
+                return jsonify({
+                    'success': False,
+                    'error': 'No data provided'
+                }), 400
             
-        audio_data = data.get('audio_data')
-        language = data.get('language', 'en')
-        
-        logging.info(f"Processing audio data of length: {len(audio_data) if audio_data else 0}, language: {language}")
-        
-        if not audio_data:
-            logging.error("No audio data in request")
-            return jsonify({
-                'success': False,
-                'error': 'No audio data provided'
-            }), 400
-        
-        # Convert speech to text
-        text, error = voice_handler.speech_to_text(audio_data, language)
+            audio_data = data.get('audio_data')
+            language = data.get('language', 'en')
+            audio_bytes = None
+        elif request.mimetype == 'multipart/form-data':
+            # Compatibility mode: the recording is the 'audio' file field, parsed in memory
+            upload = request.files.get('audio')
+            language = request.form.get('language', 'en')
+            audio_bytes = read_upload(upload.stream) if upload else bytearray()
+        else:
+            # Raw binary body read straight from the stream, language passed in the query string
+            language = request.args.get('language', 'en')
+            audio_bytes = read_upload(request.stream)
+        
+        if audio_bytes is not None:
+            logging.info(f"Processing binary audio upload of {len(audio_bytes)} bytes, language: {language}")
+            if not audio_bytes:
+                logging.error("No audio data in request")
+                return jsonify({
+                    'success': False,
+                    'error': 'No audio data provided'
+                }), 400
+            
+            text, error = voice_handler.speech_to_text_bytes(audio_bytes, language)
+        else:
+            logging.info(f"Processing audio data of length: {len(audio_data) if audio_data else 0}, language: {language}")
+            
+            if not audio_data:
+                logging.error("No audio data in request")
+                return jsonify({
+                    'success': False,
+                    'error': 'No audio data provided'
+                }), 400
+            
+            # Convert speech to text
+            text, error = voice_handler.speech_to_text(audio_data, language)
         
         logging.info(f"Speech-to-text result - text: {text}, error: {error}")
         
@@ -162,6 +556,12 @@ def speech_to_text():
             'language': language
         })
         
+    except (UploadTooLarge, RequestEntityTooLarge):
+        return jsonify({
+            'success': False,
+            'error': 'Audio recording is too large'
+        }), 413
+        
     except Exception as e:
         logging.error(f"Speech to text endpoint error: {str(e)}", exc_info=True)
         return jsonify({
@@ -169,9 +569,14 @@ def speech_to_text():
             'error': f'Error processing speech input: {str(e)}'
         }), 500
 
-@app.route('/voice/text-to-speech', methods=['POST'])
+@app.route('/voice/text-to-speech', methods=['GET', 'POST'])
 def text_to_speech():
-    """Convert text to speech audio"""
+    """Convert text to speech audio
+    
+    Returns base64 audio in JSON by default. With a `format` of wav, mp3 or
+    ogg (body field or query string) or an audio/* Accept header, the audio
+    is returned directly with Content-Length, a strong ETag and Range support.
+    """
     try:
         if not voice_handler.is_available():
             return jsonify({
@@ -179,9 +584,11 @@ def text_to_speech():
                 'error': 'Voice functionality not available on this server'
             }), 503
         
-        data = request.get_json()
+        data = request.get_json(silent=True) if request.method == 'POST' else request.args
+        data = data or {}
         text = data.get('text', '').strip()
         language = data.get('language', 'en')
+        audio_format = requested_speech_format(data, request.args, request.headers.get('Accept', ''))
         
         if not text:
             return jsonify({
@@ -189,6 +596,9 @@ def text_to_speech():
                 'error': 'No text provided'
             }), 400
         
+        if audio_format:
+            return binary_speech_response(text, language, audio_format)
+        
         # Convert text to speech
         audio_data, error = voice_handler.text_to_speech(text, language)
         
@@ -211,25 +621,122 @@ def text_to_speech():
             'error': 'Error generating speech output'
         }), 500
 
+def requested_speech_format(data, args, accept_header):
+    """Audio format a text-to-speech request asks for, or None for base64 JSON
+    
+    Shared with the ASGI routes so both servers answer a request the same way.
+    """
+    return data.get('format') or args.get('format') or requested_audio_format(accept_header)
+
+def requested_audio_format(accept_header):
+    """Audio format explicitly named in an Accept header, or None for wildcards and JSON"""
+    for part in accept_header.split(','):
+        mimetype, _, params = part.partition(';')
+        quality = params.strip().removeprefix('q=')
+        try:
+            if params.strip().startswith('q=') and float(quality) <= 0:
+                continue
+        except ValueError:
+            continue
+        for name, audio_mimetype in AUDIO_FORMATS.items():
+            if mimetype.strip().lower() == audio_mimetype:
+                return name
+    return None
+
+def binary_speech_response(text, language, audio_format):
+    """Serve synthesized speech as a cacheable, range-capable audio response"""
+    if audio_format not in AUDIO_FORMATS:
+        return jsonify({
+            'success': False,
+            'error': f'Unsupported audio format: {audio_format}'
+        }), 400
+    
+    # Answer revalidations without synthesizing anything
+    etag = voice_handler.speech_etag(text, language, audio_format)
+    if etag in request.if_none_match:
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        response.cache_control.private = True
+        response.cache_control.max_age = TTS_RESPONSE_MAX_AGE
+        return response
+    
+    try:
+        audio_bytes = voice_handler.synthesize_audio(text, language, audio_format)
+    except TTSPoolBusy:
+        return jsonify({
+            'success': False,
+            'error': 'Voice service is busy. Please try again in a moment.'
+        }), 503
+    
+    response = send_file(
+        BytesIO(audio_bytes),
+        mimetype=AUDIO_FORMATS[audio_format],
+        etag=etag,
+        conditional=True,
+        max_age=TTS_RESPONSE_MAX_AGE
+    )
+    # send_file marks the response public; the audio is only for this client
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.headers['Content-Language'] = language
+    return response
+
+@app.route('/voice/text-to-speech/stream', methods=['POST'])
+def text_to_speech_stream():
+    """Stream speech sentence by sentence as server-sent events
+    
+    Each `chunk` event carries one sentence and its base64 WAV audio, in
+    order, so playback can start after the first sentence is synthesized.
+    A final `done` event closes the stream.
+    """
+    try:
+        if not voice_handler.is_available():
+            return jsonify({
+                'success': False,
+                'error': 'Voice functionality not available on this server'
+            }), 503
+        
+        data = request.get_json(silent=True) or {}
+        text = data.get('text', '').strip()
+        language = data.get('language', 'en')
+        
+        if not text:
+            return jsonify({
+                'success': False,
+                'error': 'No text provided'
+            }), 400
+        
+        def events():
+            for index, chunk, audio_bytes, error in voice_handler.iter_speech_chunks(text, language):
+                payload = {'index': index, 'text': chunk}
+                if error:
+                    payload['error'] = error
+                else:
+                    payload['audio_data'] = base64.b64encode(audio_bytes).decode('ascii')
+                    payload['mimetype'] = 'audio/wav'
+                yield f"event: chunk\ndata: {json.dumps(payload)}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        
+        response = Response(stream_with_context(events()), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        # Let nginx pass each event through as soon as it is written
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+        
+    except Exception as e:
+        logging.error(f"Streaming text to speech error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Error generating speech output'
+        }), 500
+
 @app.route('/voice/status')
 def voice_status():
     """Get voice functionality status"""
     try:
-        status = {
-            'available': voice_handler.is_available(),
-            'speech_recognition': voice_handler.recognizer is not None,
-            'text_to_speech': voice_handler.tts_engine is not None,
-            'supported_languages': list(voice_handler.supported_languages.keys())
-        }
-        
-        if voice_handler.is_available():
-            test_results = voice_handler.test_voice_functionality()
-            status.update(test_results)
-            status['available_voices'] = voice_handler.get_available_voices()
-        
         return jsonify({
             'success': True,
-            'status': status
+            'status': voice_capabilities.status()
         })
         
     except Exception as e:
@@ -239,6 +746,39 @@ def voice_status():
             'error': 'Error checking voice status'
         }), 500
 
+@app.route('/admin/voice/self-test', methods=['POST'])
+def voice_self_test():
+    """Run the active voice self-test, which synthesizes audio (requires ADMIN_TOKEN)"""
+    admin_token = os.environ.get('ADMIN_TOKEN')
+    if not admin_token:
+        # Without a token the endpoint is disabled, so do not reveal that it exists
+        return jsonify({
+            'success': False,
+            'error': 'Not found'
+        }), 404
+    
+    supplied = request.headers.get('Authorization', '').encode('utf-8')
+    if not hmac.compare_digest(supplied, f'Bearer {admin_token}'.encode('utf-8')):
+        return jsonify({
+            'success': False,
+            'error': 'Not authorized'
+        }), 403
+    
+    try:
+        voice_capabilities.probe()
+        return jsonify({
+            'success': True,
+            'test_results': voice_capabilities.self_test(),
+            'status': voice_capabilities.status()
+        })
+        
+    except Exception as e:
+        logging.error(f"Voice self-test error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': f'Voice self-test failed: {str(e)}'
+        }), 500
+
 @app.route('/voice/test', methods=['POST'])
 def test_voice():
     """Test voice functionality with sample text"""
@@ -262,9 +802,15 @@ def test_voice():
                 'error': f'Text-to-speech test failed: {error}'
             }), 400
         
-        # Get voice system information
-        voice_info = voice_handler.get_available_voices()
-        test_results = voice_handler.test_voice_functionality()
+        # Voice system information comes from the cached capability probe;
+        # the synthesis above already exercised text-to-speech
+        status = voice_capabilities.status()
+        voice_info = status.get('available_voices', [])
+        test_results = {
+            'speech_recognition': status['speech_recognition'],
+            'text_to_speech': True,
+            'error': None
+        }
         
         return jsonify({
             'success': True,
@@ -0,0 +1,333 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from urllib.parse import parse_qs
+from app import (
+    app as flask_app, assistant, voice_handler, conversation_logger, chat_payload,
+    requested_speech_format, UploadTooLarge, VOICE_MAX_UPLOAD_BYTES
+)
+from metrics import (
+    REQUEST_COUNT, REQUEST_LATENCY, REQUESTS_IN_PROGRESS, REQUEST_QUEUE_TIME,
+    parse_request_start
+)
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError as e:
+    logging.warning(f"asgiref not installed, only async routes are served in ASGI mode: {e}")
+    WsgiToAsgi = None
+
+# Largest request body the async routes will buffer
+ASGI_MAX_BODY_BYTES = int(os.environ.get('ASGI_MAX_BODY_BYTES', str(10 * 1024 * 1024)))
+
+
+class AsyncServingApp:
+    """ASGI entry point: chat and voice routes run natively async, the rest via Flask
+
+    Run with e.g. `uvicorn asgi:app --workers 2` or
+    `gunicorn -k uvicorn.workers.UvicornWorker asgi:app`.
+    """
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi_app = WsgiToAsgi(flask_app) if WsgiToAsgi else None
+        self.routes = {
+            ('POST', '/chat'): self.chat,
+            ('POST', '/voice/speech-to-text'): self.speech_to_text,
+            ('POST', '/voice/text-to-speech'): self.text_to_speech
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+
+        if scope['type'] == 'http':
+            handler = self.routes.get((scope['method'], scope['path']))
+            if handler:
+                flask_body = await self._instrumented(handler, scope, receive, send)
+                if flask_body is None:
+                    return
+                # The route handed the request to Flask, which records its own metrics
+                receive = self._replay_body(flask_body, receive)
+
+        if self.wsgi_app:
+            await self.wsgi_app(scope, receive, send)
+            return
+
+        await self._send_json(send, {'success': False, 'error': 'Not found'}, 404)
+
+    async def _instrumented(self, handler, scope, receive, send):
+        """Run a native route, recording the request metrics Flask's hooks record for the others
+
+        Returns what the handler returns: None once it has responded, or the
+        request body when it leaves the response to Flask.
+        """
+        started_at = time.perf_counter()
+        queued = parse_request_start(self._header(scope, b'x-request-start'))
+        statuses = []
+
+        async def send_and_record(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+            await send(message)
+
+        flask_body = None
+        REQUESTS_IN_PROGRESS.inc()
+        try:
+            flask_body = await handler(scope, receive, send_and_record)
+            return flask_body
+        finally:
+            # Flask counts a request handed to it as in progress again while it serves it
+            REQUESTS_IN_PROGRESS.dec()
+            if flask_body is None:
+                if queued is not None:
+                    REQUEST_QUEUE_TIME.observe(queued)
+                status = str(statuses[0]) if statuses else '500'
+                REQUEST_COUNT.labels(scope['method'], scope['path'], status).inc()
+                REQUEST_LATENCY.labels(scope['method'], scope['path']).observe(time.perf_counter() - started_at)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _read_body(self, scope, receive, limit=ASGI_MAX_BODY_BYTES):
+        """Read the request body in chunks into one buffer, refusing bodies over limit"""
+        content_length = self._header(scope, b'content-length')
+        if content_length.isdigit() and int(content_length) > limit:
+            raise UploadTooLarge()
+
+        body = bytearray()
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunk = message.get('body', b'')
+            if len(body) + len(chunk) > limit:
+                raise UploadTooLarge()
+            body += chunk
+            more_body = message.get('more_body', False)
+        return body
+
+    async def _read_json(self, scope, receive):
+        """Read a JSON request body"""
+        return json.loads(bytes(await self._read_body(scope, receive)) or b'null')
+
+    def _replay_body(self, body, receive):
+        """A receive callable that yields an already read body again"""
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if replayed:
+                return await receive()
+            replayed = True
+            return {'type': 'http.request', 'body': bytes(body), 'more_body': False}
+
+        return replay
+
+    def _header(self, scope, name):
+        for header_name, value in scope.get('headers', []):
+            if header_name == name:
+                return value.decode('latin-1')
+        return ''
+
+    def _query(self, scope):
+        query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        return {name: values[0] for name, values in query.items()}
+
+    async def _send_too_large(self, send, error):
+        await self._send_json(send, {
+            'success': False,
+            'error': error
+        }, 413)
+
+    async def _send_json(self, send, payload, status=200, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        response_headers = [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('ascii'))
+        ]
+        response_headers.extend(headers or [])
+        await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    def _load_session(self, scope):
+        """Open the request's session through the Flask app's session interface"""
+        interface = self.flask_app.session_interface
+        request = self.flask_app.request_class({
+            'REQUEST_METHOD': scope['method'],
+            'PATH_INFO': scope['path'],
+            'HTTP_COOKIE': self._header(scope, b'cookie')
+        })
+        session = interface.open_session(self.flask_app, request)
+        if session is None:
+            session = interface.make_null_session(self.flask_app)
+        return session
+
+    def _session_headers(self, session):
+        """Save the session through the Flask app's session interface and return its Set-Cookie headers"""
+        response = self.flask_app.response_class()
+        self.flask_app.session_interface.save_session(self.flask_app, session, response)
+        return [(b'set-cookie', value.encode('latin-1')) for value in response.headers.getlist('Set-Cookie')]
+
+    async def chat(self, scope, receive, send):
+        """Async equivalent of app.chat"""
+        try:
+            data = await self._read_json(scope, receive) or {}
+            user_message = str(data.get('message', '')).strip()
+
+            if not user_message:
+                await self._send_json(send, {
+                    'success': False,
+                    'error': 'Message cannot be empty'
+                }, 400)
+                return
+
+            # The session interface may read from and queue writes to the database
+            session = await asyncio.to_thread(self._load_session, scope)
+            response = await assistant.process_message_async(user_message, session)
+            if conversation_logger:
+                await asyncio.to_thread(conversation_logger.log_turn, session, user_message, response)
+            headers = await asyncio.to_thread(self._session_headers, session)
+
+            await self._send_json(send, chat_payload(response), headers=headers)
+
+        except UploadTooLarge:
+            await self._send_too_large(send, 'Message is too large')
+
+        except Exception as e:
+            logging.error(f"Error in async chat endpoint: {str(e)}")
+            await self._send_json(send, {
+                'success': False,
+                'error': 'An error occurred while processing your message. Please try again.'
+            }, 500)
+
+    async def speech_to_text(self, scope, receive, send):
+        """Async equivalent of app.speech_to_text, without its multipart compatibility mode"""
+        try:
+            # The first check initializes the voice stack, which blocks
+            if not await asyncio.to_thread(voice_handler.is_available):
+                await self._send_json(send, {
+                    'success': False,
+                    'error': 'Voice functionality not available on this server'
+                }, 503)
+                return
+
+            content_type = self._header(scope, b'content-type').split(';')[0].strip().lower()
+            if content_type == 'multipart/form-data':
+                await self._send_json(send, {
+                    'success': False,
+                    'error': 'Multipart uploads are not supported; send the recording as the raw request body'
+                }, 415)
+                return
+            if content_type == 'application/octet-stream' or content_type.startswith('audio/'):
+                # Raw binary body, language passed in the query string
+                language = self._query(scope).get('language', 'en')
+                audio_bytes = await self._read_body(scope, receive, VOICE_MAX_UPLOAD_BYTES)
+                audio_data = None
+            else:
+                data = await self._read_json(scope, receive) or {}
+                audio_data = data.get('audio_data')
+                language = data.get('language', 'en')
+                audio_bytes = None
+
+            if not audio_data and not audio_bytes:
+                await self._send_json(send, {
+                    'success': False,
+                    'error': 'No audio data provided'
+                }, 400)
+                return
+
+            if audio_bytes:
+                text, error = await voice_handler.speech_to_text_bytes_async(audio_bytes, language)
+            else:
+                text, error = await voice_handler.speech_to_text_async(audio_data, language)
+
+            if error or not text:
+                await self._send_json(send, {
+                    'success': False,
+                    'error': error or 'No speech detected in audio'
+                }, 400)
+                return
+
+            await self._send_json(send, {
+                'success': True,
+                'text': text,
+                'language': language
+            })
+
+        except UploadTooLarge:
+            await self._send_too_large(send, 'Audio recording is too large')
+
+        except Exception as e:
+            logging.error(f"Async speech to text endpoint error: {str(e)}", exc_info=True)
+            await self._send_json(send, {
+                'success': False,
+                'error': f'Error processing speech input: {str(e)}'
+            }, 500)
+
+    async def text_to_speech(self, scope, receive, send):
+        """Async equivalent of app.text_to_speech
+
+        Requests for binary audio are left to Flask: the body is returned
+        for the caller to replay to it.
+        """
+        try:
+            # The first check initializes the voice stack, which blocks
+            if not await asyncio.to_thread(voice_handler.is_available):
+                await self._send_json(send, {
+                    'success': False,
+                    'error': 'Voice functionality not available on this server'
+                }, 503)
+                return
+
+            body = await self._read_body(scope, receive)
+            data = json.loads(bytes(body) or b'null') or {}
+            if self.wsgi_app and requested_speech_format(data, self._query(scope), self._header(scope, b'accept')):
+                # Binary audio with ETag and Range support is served by Flask
+                return body
+
+            text = str(data.get('text', '')).strip()
+            language = data.get('language', 'en')
+
+            if not text:
+                await self._send_json(send, {
+                    'success': False,
+                    'error': 'No text provided'
+                }, 400)
+                return
+
+            audio_data, error = await voice_handler.text_to_speech_async(text, language)
+
+            if error:
+                await self._send_json(send, {
+                    'success': False,
+                    'error': error
+                }, 400)
+                return
+
+            await self._send_json(send, {
+                'success': True,
+                'audio_data': audio_data,
+                'language': language
+            })
+
+        except UploadTooLarge:
+            await self._send_too_large(send, 'Text is too large')
+
+        except Exception as e:
+            logging.error(f"Async text to speech error: {str(e)}")
+            await self._send_json(send, {
+                'success': False,
+                'error': 'Error generating speech output'
+            }, 500)
+
+
+app = AsyncServingApp(flask_app)
@@ -1,21 +1,44 @@
 import os
 import re
+import asyncio
 import logging
-from googletrans import Translator, LANGUAGES
-from textblob import TextBlob
+import threading
 from meditation_scripts import MeditationScripts
 from crisis_detection import CrisisDetector
+from analysis_context import AnalysisContext
+from language_detection import LanguageDetector
+from keyword_index import KeywordIndex
+from sentiment_engine import SentimentEngine
+from metrics import timed_stage
+from resilience import RemoteDependency
 
 class MentalHealthAssistant:
     def __init__(self):
         """Initialize the mental health assistant"""
-        self.translator = Translator()
+        # The translator client is created on first use; googletrans is slow to import
+        self._translator = None
+        self._translator_lock = threading.Lock()
         self.meditation_scripts = MeditationScripts()
         self.crisis_detector = CrisisDetector()
+        self.language_detector = LanguageDetector()
+        # Deadline, circuit breaker and concurrency limit for remote language detection
+        self.translation_service = RemoteDependency.from_env('googletrans', 'TRANSLATION', timeout=3, max_concurrent=8)
+        self.keyword_index = KeywordIndex()
+        self.sentiment_engine = SentimentEngine()
         
         # Supported languages
         self.supported_languages = ['en', 'hi']
         
+        # Local detection is authoritative above this confidence; below it the
+        # remote detector is consulted only when explicitly enabled
+        self.language_confidence_threshold = float(os.environ.get('LANGUAGE_DETECTION_MIN_CONFIDENCE', '0.6'))
+        self.remote_language_fallback = os.environ.get('LANGUAGE_DETECTION_REMOTE_FALLBACK', '').lower() in ('1', 'true', 'yes')
+        # A language the user confirmed only changes on much stronger evidence
+        self.language_switch_threshold = float(os.environ.get('LANGUAGE_SWITCH_MIN_CONFIDENCE', '0.9'))
+        
+        # Per-call deadline for remote work awaited by the async request path
+        self.async_remote_timeout = float(os.environ.get('ASYNC_REMOTE_TIMEOUT', '5'))
+        
         # Empathetic responses
         self.empathetic_responses = {
             'en': {
@@ -64,10 +87,148 @@ class MentalHealthAssistant:
             }
         }
         
-    def detect_language(self, text):
-        """Detect the language of input text"""
+        # Proactive follow-up questions
+        self.follow_ups = {
+            'en': {
+                'stressed': "What's been the main source of your stress lately? Sometimes talking about it can help lighten the load.",
+                'sad': "I'm here to listen. Would you like to share what's been bringing you down, or would you prefer we focus on some uplifting activities?",
+                'anxious': "Anxiety can be overwhelming. Would you like to try a quick breathing exercise, or would you prefer to talk about what's making you feel anxious?",
+                'default': "I'd love to know more about you. What brings you joy in your daily life? Or is there something specific you'd like support with today?"
+            },
+            'hi': {
+                'stressed': "हाल ही में आपके तनाव का मुख्य कारण क्या रहा है? कभी-कभी इसके बारे में बात करने से मन हल्का हो जाता है।",
+                'sad': "मैं यहाँ सुनने के लिए हूँ। क्या आप साझा करना चाहेंगे कि आपको क्या परेशान कर रहा है, या आप चाहेंगे कि हम कुछ उत्साहजनक गतिविधियों पर ध्यान दें?",
+                'anxious': "चिंता भारी हो सकती है। क्या आप एक त्वरित सांस की एक्सरसाइज करना चाहेंगे, या आप इस बारे में बात करना पसंद करेंगे कि आपको क्या चिंतित कर रहा है?",
+                'default': "मैं आपके बारे में और जानना चाहूंगी। आपके दैनिक जीवन में आपको क्या खुशी देता है? या आज कोई खास बात है जिसके लिए आपको सहारे की जरूरत है?"
+            }
+        }
+        
+        # Meditation session options
+        self.meditation_options = {
+            'en': """Would you like to try a guided meditation? I can offer:
+
+🧘‍♀️ **Breathing Exercise** (5, 10, or 15 minutes)
+🌸 **Body Scan Meditation** (10 or 15 minutes)  
+🌙 **Mindfulness Practice** (5 or 10 minutes)
+
+Just tell me which type and duration you prefer, like "breathing exercise for 5 minutes" or "body scan for 10 minutes".""",
+            
+            'hi': """क्या आप गाइडेड मेडिटेशन करना चाहेंगे? मैं ये विकल्प दे सकता हूँ:
+
+🧘‍♀️ **सांस का अभ्यास** (5, 10, या 15 मिनट)
+🌸 **शरीर स्कैन मेडिटेशन** (10 या 15 मिनट)
+🌙 **माइंडफुलनेस अभ्यास** (5 या 10 मिनट)
+
+बस मुझे बताएं कि आप कौन सा प्रकार और कितनी देर का चाहते हैं, जैसे "5 मिनट का सांस अभ्यास" या "10 मिनट का बॉडी स्कैन"।"""
+        }
+        
+        # Stress relief tips
+        self.stress_relief_tips = {
+            'en': [
+                "💡 **Quick Tip**: Try the 5-4-3-2-1 grounding technique. Name 5 things you can see, 4 you can touch, 3 you can hear, 2 you can smell, and 1 you can taste.",
+                "💡 **Quick Tip**: Take 5 deep breaths. Breathe in for 4 counts, hold for 4, and breathe out for 6 counts.",
+                "💡 **Quick Tip**: Write down three things you're grateful for today, no matter how small.",
+                "💡 **Quick Tip**: Step outside if possible, and take a moment to feel the fresh air on your skin.",
+                "💡 **Quick Tip**: Place your hand on your heart and remind yourself: 'This feeling will pass, and I am stronger than I know.'"
+            ],
+            'hi': [
+                "💡 **त्वरित सुझाव**: 5-4-3-2-1 ग्राउंडिंग तकनीक आज़माएं। 5 चीज़ें जो आप देख सकते हैं, 4 जो छू सकते हैं, 3 जो सुन सकते हैं, 2 जो सूंघ सकते हैं, और 1 जो चख सकते हैं, उनके नाम बताएं।",
+                "💡 **त्वरित सुझाव**: 5 गहरी सांसें लें। 4 गिनती तक सांस अंदर लें, 4 तक रोकें, और 6 गिनती तक छोड़ें।",
+                "💡 **त्वरित सुझाव**: आज आप जिन तीन चीज़ों के लिए आभारी हैं, उन्हें लिखें, चाहे वे कितनी भी छोटी हों।",
+                "💡 **त्वरित सुझाव**: यदि संभव हो तो बाहर जाएं, और अपनी त्वचा पर ताज़ी हवा महसूस करने के लिए एक पल रुकें।",
+                "💡 **त्वरित सुझाव**: अपना हाथ अपने दिल पर रखें और अपने आप से कहें: 'यह भावना गुज़र जाएगी, और मैं जितना जानता हूँ उससे कहीं ज्यादा मज़बूत हूँ।'"
+            ]
+        }
+        
+        # Mental health resources and helplines
+        self.mental_health_resources = {
+            'en': {
+                'helplines': [
+                    {
+                        'name': 'National Suicide Prevention Lifeline (US)',
+                        'number': '988',
+                        'description': '24/7 free and confidential support'
+                    },
+                    {
+                        'name': 'Crisis Text Line (US)',
+                        'number': 'Text HOME to 741741',
+                        'description': '24/7 crisis support via text'
+                    },
+                    {
+                        'name': 'Vandrevala Foundation (India)',
+                        'number': '+91 9999 666 555',
+                        'description': '24/7 mental health helpline'
+                    }
+                ],
+                'disclaimer': '⚠️ **Important**: I am an AI assistant, not a mental health professional. If you are experiencing a mental health crisis, please contact emergency services or a mental health professional immediately.'
+            },
+            'hi': {
+                'helplines': [
+                    {
+                        'name': 'वंद्रेवाला फाउंडेशन (भारत)',
+                        'number': '+91 9999 666 555',
+                        'description': '24/7 मानसिक स्वास्थ्य हेल्पलाइन'
+                    },
+                    {
+                        'name': 'कनेक्ट इंडिया',
+                        'number': '+91 9152987821',
+                        'description': 'मानसिक स्वास्थ्य सहायता'
+                    },
+                    {
+                        'name': 'AASRA (आसरा)',
+                        'number': '+91 9820466726',
+                        'description': 'संकट में सहायता के लिए'
+                    }
+                ],
+                'disclaimer': '⚠️ **महत्वपूर्ण**: मैं एक AI सहायक हूँ, मानसिक स्वास्थ्य पेशेवर नहीं। यदि आप मानसिक स्वास्थ्य संकट का सामना कर रहे हैं, तो कृपया तुरंत आपातकालीन सेवाओं या मानसिक स्वास्थ्य पेशेवर से संपर्क करें।'
+            }
+        }
+        
+    @property
+    def translator(self):
+        if self._translator is None:
+            with self._translator_lock:
+                if self._translator is None:
+                    from googletrans import Translator
+                    self._translator = Translator(timeout=self.translation_service.timeout)
+        return self._translator
+    
+    def load_shared(self):
+        """Import the translation library; creates no client, so safe before fork"""
+        with timed_stage('startup', 'translator'):
+            import googletrans
+    
+    def warm_up(self):
+        """Load the translation stack ahead of the first message"""
+        self.load_shared()
+        _ = self.translator
+    
+    def detect_language(self, text, session=None, remote=True):
+        """Detect the language of input text
+        
+        In a session whose language was confirmed, that language is kept
+        unless the message is clearly in the other one.
+        """
+        language, confidence = self.language_detector.detect(text)
+        
+        confirmed_language = session.get('user_language') if session and session.get('language_confirmed') else None
+        if confirmed_language:
+            if language != confirmed_language and confidence < self.language_switch_threshold:
+                return confirmed_language
+            return language
+        
+        if confidence >= self.language_confidence_threshold:
+            return language
+        
+        if not (remote and self.remote_language_fallback):
+            return 'en'  # Default to English for ambiguous input
+        
+        return self._detect_language_remote(text)
+    
+    def _detect_language_remote(self, text):
+        """Detect the language of input text with the remote translator"""
         try:
-            detection = self.translator.detect(text)
+            detection = self.translation_service.call(self.translator.detect, text)
             detected_lang = detection.lang
             
             # Map detected language to supported languages
@@ -80,42 +241,34 @@ class MentalHealthAssistant:
             logging.error(f"Language detection error: {str(e)}")
             return 'en'  # Default to English on error
     
-    def translate_text(self, text, target_language):
-        """Translate text to target language"""
-        try:
-            if target_language == 'en':
-                return text  # Assume input is already in English or handle accordingly
-            
-            result = self.translator.translate(text, dest=target_language)
-            return result.text
-            
-        except Exception as e:
-            logging.error(f"Translation error: {str(e)}")
-            return text  # Return original text on error
+    def build_analysis_context(self, message, session=None):
+        """Detect language once and build the shared per-turn analysis context"""
+        with timed_stage('assistant', 'language_detection'):
+            detected_language = self.detect_language(message, session)
+        return AnalysisContext(message, detected_language)
     
-    def analyze_sentiment(self, text):
-        """Analyze sentiment and emotion of text"""
+    def analyze_sentiment(self, text, context=None, polarity=None):
+        """Analyze sentiment and emotion of text
+        
+        English and Hindi are both scored as written, so no translation is
+        needed; pass polarity when it was already computed in a batch.
+        """
         try:
-            # Convert to English for analysis if needed
-            english_text = text
-            if self.detect_language(text) == 'hi':
-                english_text = self.translator.translate(text, dest='en').text
-            
-            blob = TextBlob(english_text)
-            polarity = blob.sentiment.polarity
+            if context is None:
+                context = self.build_analysis_context(text)
             
-            # Simple keyword-based emotion detection
-            text_lower = english_text.lower()
-            
-            stress_keywords = ['stressed', 'stress', 'overwhelmed', 'pressure', 'burden', 'exhausted']
-            sad_keywords = ['sad', 'depressed', 'down', 'upset', 'hurt', 'broken', 'crying']
-            anxious_keywords = ['anxious', 'worried', 'nervous', 'panic', 'afraid', 'scared', 'fear']
+            with timed_stage('assistant', 'sentiment'):
+                if polarity is None:
+                    polarity = self.sentiment_engine.score(context.message)
+                
+                # Simple keyword-based emotion detection
+                hits = context.keyword_hits(self.keyword_index)
             
-            if any(keyword in text_lower for keyword in stress_keywords):
+            if 'stressed' in hits:
                 return 'stressed'
-            elif any(keyword in text_lower for keyword in sad_keywords):
+            elif 'sad' in hits:
                 return 'sad'
-            elif any(keyword in text_lower for keyword in anxious_keywords):
+            elif 'anxious' in hits:
                 return 'anxious'
             elif polarity < -0.1:
                 return 'sad'
@@ -138,95 +291,201 @@ class MentalHealthAssistant:
     def process_message(self, message, session):
         """Process user message and generate appropriate response"""
         try:
-            # Detect language
-            detected_language = self.detect_language(message)
-            
-            # Check if this is language confirmation
-            if not session.get('language_confirmed', False):
-                return self.handle_language_confirmation(message, detected_language, session)
+            crisis_response = self._crisis_fast_path(message, session)
+            if crisis_response:
+                return crisis_response
             
-            session['user_language'] = detected_language
+            # Detect language once and share the analysis across every stage
+            context = self.build_analysis_context(message, session)
             
-            # Check for crisis
-            crisis_response = self.crisis_detector.check_crisis(message, detected_language)
-            if crisis_response:
-                return {
-                    'message': crisis_response,
-                    'language': detected_language,
-                    'crisis_detected': True
-                }
+            screened_response = self._screen_message(context, session)
+            if screened_response:
+                return screened_response
             
             # Analyze sentiment
-            emotion = self.analyze_sentiment(message)
-            
-            # Check if user is asking for meditation
-            message_lower = message.lower()
-            meditation_keywords = ['meditat', 'breathe', 'breath', 'calm', 'relax', 'peace']
-            hindi_meditation_keywords = ['ध्यान', 'शांत', 'आराम', 'सांस', 'मेडिटेशन']
+            emotion = self.analyze_sentiment(message, context)
             
-            is_meditation_request = (
-                any(keyword in message_lower for keyword in meditation_keywords) or
-                any(keyword in message for keyword in hindi_meditation_keywords)
-            )
+            return self._compose_response(context, emotion)
             
-            if is_meditation_request:
-                meditation_offer = self.get_meditation_options(detected_language)
-                empathetic_response = self.get_empathetic_response(emotion, detected_language)
-                
-                combined_response = f"{empathetic_response}\n\n{meditation_offer}"
-                
-                return {
-                    'message': combined_response,
-                    'language': detected_language,
-                    'session_type': 'meditation_offer'
-                }
+        except Exception as e:
+            logging.error(f"Error processing message: {str(e)}")
+            return self._fallback_response(session)
+    
+    async def process_message_async(self, message, session):
+        """Async variant of process_message for the ASGI serving mode
+        
+        Remote calls run in the default executor and are awaited with a
+        deadline; on timeout the turn continues with local fallbacks.
+        """
+        try:
+            # Crisis screening is local and fast, so it runs on the event loop ahead of everything
+            crisis_response = self._crisis_fast_path(message, session)
+            if crisis_response:
+                return crisis_response
             
-            # Generate empathetic response with proactive follow-up
-            response = self.get_empathetic_response(emotion, detected_language)
+            context = await self._run_with_deadline(self.build_analysis_context, message, session)
+            if context is None:
+                context = AnalysisContext(message, 'en')
             
-            # Add stress relief suggestions
-            if emotion in ['stressed', 'anxious', 'sad']:
-                stress_relief = self.get_stress_relief_tip(detected_language)
-                response += f"\n\n{stress_relief}"
+            screened_response = self._screen_message(context, session)
+            if screened_response:
+                return screened_response
             
-            # Add proactive follow-up questions
-            follow_up = self.get_proactive_follow_up(emotion, detected_language)
-            response += f"\n\n{follow_up}"
+            # Local scoring takes microseconds, so it runs on the event loop
+            emotion = self.analyze_sentiment(message, context)
             
-            return {
-                'message': response,
-                'language': detected_language,
-                'emotion': emotion
-            }
+            return self._compose_response(context, emotion)
             
         except Exception as e:
             logging.error(f"Error processing message: {str(e)}")
+            return self._fallback_response(session)
+    
+    async def _run_with_deadline(self, func, *args):
+        """Run a blocking call in the executor; return None if it misses the deadline"""
+        try:
+            return await asyncio.wait_for(asyncio.to_thread(func, *args), self.async_remote_timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"{func.__name__} exceeded {self.async_remote_timeout}s deadline")
+            return None
+    
+    def process_messages(self, items):
+        """Process many (message, session) pairs, running each stage over the whole batch
+        
+        Results are returned in input order; each session dict is updated in
+        place exactly as process_message would update it.
+        """
+        results = [None] * len(items)
+        pending = []
+        
+        # Stage 1: crisis screening, language detection and language confirmation
+        for position, (message, session) in enumerate(items):
+            try:
+                crisis_response = self._crisis_fast_path(message, session)
+                if crisis_response:
+                    results[position] = crisis_response
+                    continue
+                
+                context = self.build_analysis_context(message, session)
+                screened_response = self._screen_message(context, session)
+                if screened_response:
+                    results[position] = screened_response
+                else:
+                    pending.append((position, context, session))
+            except Exception as e:
+                logging.error(f"Error processing batch message {position}: {str(e)}")
+                results[position] = self._fallback_response(session)
+        
+        # Stage 2: sentiment scoring for the whole batch, then response composition
+        polarities = self.sentiment_engine.score_batch([context.message for _, context, _ in pending])
+        for (position, context, session), polarity in zip(pending, polarities):
+            try:
+                emotion = self.analyze_sentiment(context.message, context, polarity)
+                results[position] = self._compose_response(context, emotion)
+            except Exception as e:
+                logging.error(f"Error processing batch message {position}: {str(e)}")
+                results[position] = self._fallback_response(session)
+        
+        return results
+    
+    def _crisis_fast_path(self, message, session):
+        """Return the crisis response for a crisis message, or None
+        
+        Runs on the raw message before language detection or
+        language confirmation, using only local matching, so a crisis reply
+        never waits on a remote service. The reply's language comes from the
+        local detector, and a confirmed session language is kept unless the
+        message is clearly in the other language.
+        """
+        with timed_stage('assistant', 'crisis_check'):
+            if not self.crisis_detector.prescreen(message):
+                return None
+            language = self.detect_language(message, session, remote=False)
+        
+        # The crisis reply stands in for the language confirmation, so the
+        # next message continues the conversation instead of greeting again
+        session['user_language'] = language
+        session['language_confirmed'] = True
+        
+        crisis_responses = self.crisis_detector.crisis_responses
+        return {
+            'message': crisis_responses.get(language, crisis_responses['en']),
+            'language': language,
+            'crisis_detected': True
+        }
+    
+    def _screen_message(self, context, session):
+        """Handle language confirmation; return a response or None"""
+        detected_language = context.language
+        
+        # Check if this is language confirmation
+        if not session.get('language_confirmed', False):
+            return self.handle_language_confirmation(context.message, detected_language, session, context)
+        
+        session['user_language'] = detected_language
+        
+        return None
+    
+    def _compose_response(self, context, emotion):
+        """Build the reply for a screened message with a known emotion"""
+        detected_language = context.language
+        
+        # Check if user is asking for meditation
+        is_meditation_request = 'meditation' in context.keyword_hits(self.keyword_index)
+        
+        if is_meditation_request:
+            meditation_offer = self.get_meditation_options(detected_language)
+            empathetic_response = self.get_empathetic_response(emotion, detected_language)
             
-            # Fallback response
-            fallback_responses = {
-                'en': "I'm here to help. Could you please tell me more about how you're feeling?",
-                'hi': "मैं यहाँ मदद करने के लिए हूँ। कृपया मुझे बताएं कि आप कैसा महसूस कर रहे हैं?"
-            }
+            combined_response = f"{empathetic_response}\n\n{meditation_offer}"
             
-            user_language = session.get('user_language', 'en')
             return {
-                'message': fallback_responses[user_language],
-                'language': user_language
+                'message': combined_response,
+                'language': detected_language,
+                'session_type': 'meditation_offer',
+                'emotion': emotion
             }
+        
+        # Generate empathetic response with proactive follow-up
+        response = self.get_empathetic_response(emotion, detected_language)
+        
+        # Add stress relief suggestions
+        if emotion in ['stressed', 'anxious', 'sad']:
+            stress_relief = self.get_stress_relief_tip(detected_language)
+            response += f"\n\n{stress_relief}"
+        
+        # Add proactive follow-up questions
+        follow_up = self.get_proactive_follow_up(emotion, detected_language)
+        response += f"\n\n{follow_up}"
+        
+        return {
+            'message': response,
+            'language': detected_language,
+            'emotion': emotion
+        }
     
-    def handle_language_confirmation(self, message, detected_language, session):
-        """Handle language confirmation from user"""
-        message_lower = message.lower()
+    def _fallback_response(self, session):
+        """Generic reply used when processing a message fails"""
+        fallback_responses = {
+            'en': "I'm here to help. Could you please tell me more about how you're feeling?",
+            'hi': "मैं यहाँ मदद करने के लिए हूँ। कृपया मुझे बताएं कि आप कैसा महसूस कर रहे हैं?"
+        }
         
-        # Check for language preference keywords
-        english_keywords = ['english', 'eng', 'en', 'अंग्रेजी']
-        hindi_keywords = ['hindi', 'hin', 'hi', 'हिंदी', 'हिन्दी']
+        user_language = session.get('user_language') or 'en'
+        return {
+            'message': fallback_responses.get(user_language, fallback_responses['en']),
+            'language': user_language
+        }
+    
+    def handle_language_confirmation(self, message, detected_language, session, context=None):
+        """Handle language confirmation from user"""
+        hits = context.keyword_hits(self.keyword_index) if context else self.keyword_index.scan(message)
         
         confirmed_language = None
         
-        if any(keyword in message_lower for keyword in english_keywords):
+        # Check for language preference keywords
+        if 'prefers_english' in hits:
             confirmed_language = 'en'
-        elif any(keyword in message_lower for keyword in hindi_keywords):
+        elif 'prefers_hindi' in hits:
             confirmed_language = 'hi'
         else:
             # Use detected language if no explicit preference
@@ -236,7 +495,7 @@ class MentalHealthAssistant:
         session['language_confirmed'] = True
         
         # Check if this is a voice conversation mode (detect from context)
-        is_voice_mode = any(phrase in message_lower for phrase in ['communicate in', 'would like to communicate', 'voice conversation'])
+        is_voice_mode = 'voice_mode' in hits
         
         # Generate confirmation response based on mode
         if is_voice_mode:
@@ -261,117 +520,55 @@ class MentalHealthAssistant:
     
     def get_proactive_follow_up(self, emotion, language):
         """Get proactive follow-up questions based on emotion"""
-        follow_ups = {
-            'en': {
-                'stressed': "What's been the main source of your stress lately? Sometimes talking about it can help lighten the load.",
-                'sad': "I'm here to listen. Would you like to share what's been bringing you down, or would you prefer we focus on some uplifting activities?",
-                'anxious': "Anxiety can be overwhelming. Would you like to try a quick breathing exercise, or would you prefer to talk about what's making you feel anxious?",
-                'default': "I'd love to know more about you. What brings you joy in your daily life? Or is there something specific you'd like support with today?"
-            },
-            'hi': {
-                'stressed': "हाल ही में आपके तनाव का मुख्य कारण क्या रहा है? कभी-कभी इसके बारे में बात करने से मन हल्का हो जाता है।",
-                'sad': "मैं यहाँ सुनने के लिए हूँ। क्या आप साझा करना चाहेंगे कि आपको क्या परेशान कर रहा है, या आप चाहेंगे कि हम कुछ उत्साहजनक गतिविधियों पर ध्यान दें?",
-                'anxious': "चिंता भारी हो सकती है। क्या आप एक त्वरित सांस की एक्सरसाइज करना चाहेंगे, या आप इस बारे में बात करना पसंद करेंगे कि आपको क्या चिंतित कर रहा है?",
-                'default': "मैं आपके बारे में और जानना चाहूंगी। आपके दैनिक जीवन में आपको क्या खुशी देता है? या आज कोई खास बात है जिसके लिए आपको सहारे की जरूरत है?"
-            }
-        }
-        
-        language_follow_ups = follow_ups.get(language, follow_ups['en'])
+        language_follow_ups = self.follow_ups.get(language, self.follow_ups['en'])
         return language_follow_ups.get(emotion, language_follow_ups['default'])
     
     def get_meditation_options(self, language):
         """Get meditation session options"""
-        options = {
-            'en': """Would you like to try a guided meditation? I can offer:
-
-🧘‍♀️ **Breathing Exercise** (5, 10, or 15 minutes)
-🌸 **Body Scan Meditation** (10 or 15 minutes)  
-🌙 **Mindfulness Practice** (5 or 10 minutes)
-
-Just tell me which type and duration you prefer, like "breathing exercise for 5 minutes" or "body scan for 10 minutes".""",
-            
-            'hi': """क्या आप गाइडेड मेडिटेशन करना चाहेंगे? मैं ये विकल्प दे सकता हूँ:
-
-🧘‍♀️ **सांस का अभ्यास** (5, 10, या 15 मिनट)
-🌸 **शरीर स्कैन मेडिटेशन** (10 या 15 मिनट)
-🌙 **माइंडफुलनेस अभ्यास** (5 या 10 मिनट)
-
-बस मुझे बताएं कि आप कौन सा प्रकार और कितनी देर का चाहते हैं, जैसे "5 मिनट का सांस अभ्यास" या "10 मिनट का बॉडी स्कैन"।"""
-        }
-        
-        return options.get(language, options['en'])
+        return self.meditation_options.get(language, self.meditation_options['en'])
     
     def get_stress_relief_tip(self, language):
         """Get a stress relief tip"""
         import random
         
-        tips = {
-            'en': [
-                "💡 **Quick Tip**: Try the 5-4-3-2-1 grounding technique. Name 5 things you can see, 4 you can touch, 3 you can hear, 2 you can smell, and 1 you can taste.",
-                "💡 **Quick Tip**: Take 5 deep breaths. Breathe in for 4 counts, hold for 4, and breathe out for 6 counts.",
-                "💡 **Quick Tip**: Write down three things you're grateful for today, no matter how small.",
-                "💡 **Quick Tip**: Step outside if possible, and take a moment to feel the fresh air on your skin.",
-                "💡 **Quick Tip**: Place your hand on your heart and remind yourself: 'This feeling will pass, and I am stronger than I know.'"
-            ],
-            'hi': [
-                "💡 **त्वरित सुझाव**: 5-4-3-2-1 ग्राउंडिंग तकनीक आज़माएं। 5 चीज़ें जो आप देख सकते हैं, 4 जो छू सकते हैं, 3 जो सुन सकते हैं, 2 जो सूंघ सकते हैं, और 1 जो चख सकते हैं, उनके नाम बताएं।",
-                "💡 **त्वरित सुझाव**: 5 गहरी सांसें लें। 4 गिनती तक सांस अंदर लें, 4 तक रोकें, और 6 गिनती तक छोड़ें।",
-                "💡 **त्वरित सुझाव**: आज आप जिन तीन चीज़ों के लिए आभारी हैं, उन्हें लिखें, चाहे वे कितनी भी छोटी हों।",
-                "💡 **त्वरित सुझाव**: यदि संभव हो तो बाहर जाएं, और अपनी त्वचा पर ताज़ी हवा महसूस करने के लिए एक पल रुकें।",
-                "💡 **त्वरित सुझाव**: अपना हाथ अपने दिल पर रखें और अपने आप से कहें: 'यह भावना गुज़र जाएगी, और मैं जितना जानता हूँ उससे कहीं ज्यादा मज़बूत हूँ।'"
-            ]
-        }
-        
-        language_tips = tips.get(language, tips['en'])
+        language_tips = self.stress_relief_tips.get(language, self.stress_relief_tips['en'])
         return random.choice(language_tips)
     
+    def iter_canned_responses(self):
+        """Yield (text, language) for every reply assembled only from fixed strings
+        
+        Crisis responses come first, so a pre-warm that is cut short has
+        still rendered the replies that matter most.
+        """
+        for language, response in self.crisis_detector.crisis_responses.items():
+            yield response, language
+        
+        for language, responses in self.empathetic_responses.items():
+            meditation_offer = self.get_meditation_options(language)
+            tips = self.stress_relief_tips.get(language, self.stress_relief_tips['en'])
+            
+            for emotion, lines in responses.items():
+                follow_up = self.get_proactive_follow_up(emotion, language)
+                
+                # Every combination _compose_response can produce
+                for line in lines:
+                    yield f"{line}\n\n{meditation_offer}", language
+                    if emotion in ['stressed', 'anxious', 'sad']:
+                        for tip in tips:
+                            yield f"{line}\n\n{tip}\n\n{follow_up}", language
+                    else:
+                        yield f"{line}\n\n{follow_up}", language
+        
+        for languages in self.meditation_scripts.scripts.values():
+            for language, durations in languages.items():
+                for steps in durations.values():
+                    for step in steps:
+                        yield step, language
+    
     def start_meditation_session(self, session_type, duration, language):
         """Start a guided meditation session"""
         return self.meditation_scripts.get_meditation_script(session_type, duration, language)
     
     def get_mental_health_resources(self, language):
         """Get mental health resources and helplines"""
-        resources = {
-            'en': {
-                'helplines': [
-                    {
-                        'name': 'National Suicide Prevention Lifeline (US)',
-                        'number': '988',
-                        'description': '24/7 free and confidential support'
-                    },
-                    {
-                        'name': 'Crisis Text Line (US)',
-                        'number': 'Text HOME to 741741',
-                        'description': '24/7 crisis support via text'
-                    },
-                    {
-                        'name': 'Vandrevala Foundation (India)',
-                        'number': '+91 9999 666 555',
-                        'description': '24/7 mental health helpline'
-                    }
-                ],
-                'disclaimer': '⚠️ **Important**: I am an AI assistant, not a mental health professional. If you are experiencing a mental health crisis, please contact emergency services or a mental health professional immediately.'
-            },
-            'hi': {
-                'helplines': [
-                    {
-                        'name': 'वंद्रेवाला फाउंडेशन (भारत)',
-                        'number': '+91 9999 666 555',
-                        'description': '24/7 मानसिक स्वास्थ्य हेल्पलाइन'
-                    },
-                    {
-                        'name': 'कनेक्ट इंडिया',
-                        'number': '+91 9152987821',
-                        'description': 'मानसिक स्वास्थ्य सहायता'
-                    },
-                    {
-                        'name': 'AASRA (आसरा)',
-                        'number': '+91 9820466726',
-                        'description': 'संकट में सहायता के लिए'
-                    }
-                ],
-                'disclaimer': '⚠️ **महत्वपूर्ण**: मैं एक AI सहायक हूँ, मानसिक स्वास्थ्य पेशेवर नहीं। यदि आप मानसिक स्वास्थ्य संकट का सामना कर रहे हैं, तो कृपया तुरंत आपातकालीन सेवाओं या मानसिक स्वास्थ्य पेशेवर से संपर्क करें।'
-            }
-        }
-        
-        return resources.get(language, resources['en'])
+        return self.mental_health_resources.get(language, self.mental_health_resources['en'])
@@ -0,0 +1,231 @@
+import os
+import sys
+import hashlib
+import logging
+import tempfile
+import threading
+from metrics import record_cache_lookup
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class AudioCache:
+    """Content-addressed on-disk cache of synthesized audio with LRU eviction
+
+    Entries are keyed by a hash of (text, language, voice, rate, format) and stored as
+    files under a two-level directory fan-out. Reads refresh the file's mtime,
+    which doubles as the LRU clock shared by every worker using the directory.
+
+    Writes keep a running estimate of the cache size. Once it passes
+    max_bytes, a background thread walks the directory and evicts down to
+    low_water of the budget, so eviction neither runs on the request path
+    nor again on the very next write.
+    """
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024, extension='audio', low_water=0.9):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.target_bytes = int(max_bytes * low_water)
+        self.extension = extension
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._approximate_bytes = None
+        self._bytes_written = 0
+        self._evicting = False
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(text, language, voice, rate, audio_format='wav'):
+        """Content hash identifying one rendering of text"""
+        material = '\x1f'.join([language or '', voice or '', str(rate), audio_format, text])
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.{self.extension}")
+
+    def get(self, key):
+        """Return cached audio bytes or None"""
+        path = self.path_for(key)
+        try:
+            with open(path, 'rb') as audio_file:
+                data = audio_file.read()
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            record_cache_lookup('audio', False)
+            return None
+        except OSError as e:
+            logging.warning(f"Audio cache read failed: {e}")
+            self.misses += 1
+            record_cache_lookup('audio', False)
+            return None
+
+        self.hits += 1
+        record_cache_lookup('audio', True)
+        return data
+
+    def contains(self, key):
+        return os.path.exists(self.path_for(key))
+
+    def put(self, key, data):
+        """Store audio bytes atomically and evict old entries if over budget"""
+        path = self.path_for(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as temp_file:
+                temp_file.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logging.warning(f"Audio cache write failed: {e}")
+            return
+
+        with self._lock:
+            self._bytes_written += len(data)
+            if self._approximate_bytes is not None:
+                self._approximate_bytes += len(data)
+                if self._approximate_bytes <= self.max_bytes:
+                    return
+            if self._evicting:
+                return
+            self._evicting = True
+
+        # The size is not known until the first walk, which also runs in the background
+        threading.Thread(target=self._evict, name='audio-cache-evict', daemon=True).start()
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(f".{self.extension}"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield stat.st_mtime, stat.st_size, path
+
+    def _evict(self):
+        """Delete least recently used entries until the cache is down to its low-water mark"""
+        try:
+            with self._lock:
+                written_before = self._bytes_written
+
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+
+            if total > self.max_bytes:
+                for _, size, path in entries:
+                    if total <= self.target_bytes:
+                        break
+                    try:
+                        os.unlink(path)
+                        total -= size
+                    except FileNotFoundError:
+                        total -= size
+                    except OSError as e:
+                        logging.warning(f"Audio cache eviction failed for {path}: {e}")
+
+            with self._lock:
+                # Writes that landed while the directory was being walked may be missing from it
+                self._approximate_bytes = total + self._bytes_written - written_before
+        except Exception as e:
+            logging.error(f"Audio cache eviction failed: {e}")
+        finally:
+            with self._lock:
+                self._evicting = False
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0
+        }
+
+
+def create_audio_cache():
+    """Build the audio cache configured through the environment, or None if disabled"""
+    directory = os.environ.get('AUDIO_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'serenity-audio-cache'))
+    if not directory or directory.lower() == 'off':
+        return None
+
+    max_bytes = int(os.environ.get('AUDIO_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+    low_water = float(os.environ.get('AUDIO_CACHE_LOW_WATER', '0.9'))
+    try:
+        return AudioCache(directory, max_bytes, low_water=low_water)
+    except OSError as e:
+        logging.error(f"Could not create audio cache at {directory}: {e}")
+        return None
+
+
+def prewarm(voice_handler, assistant):
+    """Render every fixed assistant string into the audio cache ahead of time
+
+    Each string is rendered whole, for the text-to-speech endpoint, and as
+    the sentence chunks the streaming endpoint synthesizes one by one.
+    """
+    from voice_handler import split_for_speech
+
+    rendered = 0
+    failed = 0
+    seen = set()
+
+    for text, language in assistant.iter_canned_responses():
+        for piece in [text] + split_for_speech(text):
+            if (piece, language) in seen:
+                continue
+            seen.add((piece, language))
+
+            if voice_handler.has_cached_speech(piece, language):
+                continue
+
+            _, error = voice_handler.text_to_speech(piece, language)
+            if error:
+                failed += 1
+                logging.warning(f"Pre-warm synthesis failed: {error}")
+            else:
+                rendered += 1
+
+    logging.info(f"Audio cache pre-warm finished: {rendered} rendered, {failed} failed, {len(seen)} total")
+    return rendered, failed
+
+
+def prewarm_once(voice_handler, assistant):
+    """Pre-warm the audio cache unless another process sharing its directory is already doing it
+
+    Every worker of a pod starts at the same time; a lock file in the cache
+    directory lets one of them render while the others skip. Workers started
+    later find the audio already cached and render nothing.
+    """
+    cache = voice_handler.audio_cache
+    if not cache:
+        return None
+
+    if fcntl is None:
+        return prewarm(voice_handler, assistant)
+
+    with open(os.path.join(cache.directory, '.prewarm.lock'), 'w') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            logging.info("Audio cache pre-warm is already running in another process")
+            return None
+        return prewarm(voice_handler, assistant)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    from assistant import MentalHealthAssistant
+    from voice_handler import VoiceHandler
+
+    handler = VoiceHandler()
+    if not handler.audio_cache or not handler.tts_available:
+        logging.error("Audio cache or text-to-speech is not available")
+        sys.exit(1)
+
+    prewarm(handler, MentalHealthAssistant())
@@ -0,0 +1,56 @@
+import json
+import hashlib
+
+
+class CatalogEntry:
+    """A pre-serialized JSON response body and its strong ETag"""
+
+    __slots__ = ('body', 'etag')
+
+    def __init__(self, payload):
+        self.body = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+
+
+class ContentCatalog:
+    """Immutable meditation and resources responses, serialized once at startup
+
+    Every (type, duration, language) meditation script and every language's
+    resources are rendered to bytes up front, so serving them is a dict
+    lookup. The content only changes between deploys, and the ETag is a
+    hash of the bytes, so caches stay valid exactly as long as the content.
+    """
+
+    def __init__(self, assistant):
+        self.languages = tuple(assistant.supported_languages)
+        self.meditations = {}
+        self.resources = {}
+
+        scripts = assistant.meditation_scripts.scripts
+        for session_type, languages in scripts.items():
+            for language, durations in languages.items():
+                for duration, steps in durations.items():
+                    self.meditations[(session_type, duration, language)] = CatalogEntry({
+                        'success': True,
+                        'meditation_script': steps,
+                        'language': language,
+                        'duration': duration,
+                        'session_type': session_type
+                    })
+
+        for language in self.languages:
+            self.resources[language] = CatalogEntry({
+                'success': True,
+                'resources': assistant.get_mental_health_resources(language),
+                'language': language
+            })
+
+    def resolve_language(self, language):
+        return language if language in self.languages else 'en'
+
+    def meditation(self, session_type, duration, language):
+        """The entry for a meditation script, or None if there is no exact match"""
+        return self.meditations.get((session_type.lower(), str(duration), self.resolve_language(language)))
+
+    def resources_for(self, language):
+        return self.resources[self.resolve_language(language)]
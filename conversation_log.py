@@ -0,0 +1,114 @@
+import os
+import json
+import logging
+import threading
+from metrics import CONVERSATION_LOG_SPILLED
+
+try:
+    from sqlalchemy import column, insert, table
+except ImportError:
+    insert = None
+
+# A Core insert rather than text(), so SQLAlchemy sends a whole batch of
+# rows as one multi-row INSERT instead of one statement per row
+INSERT_LOG = insert(table(
+    'conversation_logs',
+    column('session_id'),
+    column('message_type'),
+    column('message_content'),
+    column('language'),
+    column('emotion_detected'),
+    column('crisis_detected')
+)) if insert is not None else None
+
+
+class ConversationLogger:
+    """Write-behind logging of chat turns into conversation_logs
+
+    Rows are queued on the shared BatchWriter and bulk-inserted by its
+    background thread, so logging never waits on the database. Log rows
+    may only fill part of the writer's queue, leaving room for meditation
+    tracking writes; rows that do not fit are appended to a local spill file when
+    one is configured and dropped otherwise.
+    """
+
+    def __init__(self, writer, session_interface=None, max_pending=None, spill_path=None, spill_max_bytes=None):
+        self.writer = writer
+        self.session_interface = session_interface
+        self.max_pending = max_pending if max_pending is not None else int(os.environ.get('CONVERSATION_LOG_MAX_PENDING', '5000'))
+        self.spill_path = spill_path if spill_path is not None else os.environ.get('CONVERSATION_LOG_SPILL_PATH', '')
+        self.spill_max_bytes = spill_max_bytes if spill_max_bytes is not None else int(os.environ.get('CONVERSATION_LOG_SPILL_MAX_BYTES', str(64 * 1024 * 1024)))
+        self._spill_lock = threading.Lock()
+
+    def log_turn(self, session, user_message, response):
+        """Queue the user's message and the assistant's reply"""
+        session_id = getattr(session, 'sid', None)
+        if session_id and hasattr(self.session_interface, 'persist'):
+            # The log rows reference user_sessions, so write the session row first;
+            # without it the turn is still logged, just not linked to the session
+            if not self.session_interface.persist(session):
+                session_id = None
+
+        language = response.get('language', 'en')
+        rows = [
+            {
+                'session_id': session_id,
+                'message_type': 'user',
+                'message_content': user_message,
+                'language': language,
+                'emotion_detected': None,
+                'crisis_detected': False
+            },
+            {
+                'session_id': session_id,
+                'message_type': 'assistant',
+                'message_content': response['message'],
+                'language': language,
+                'emotion_detected': response.get('emotion'),
+                'crisis_detected': bool(response.get('crisis_detected', False))
+            }
+        ]
+
+        for row in rows:
+            if not self.writer.submit(INSERT_LOG, row, limit=self.max_pending):
+                self._spill(row)
+
+    def _spill(self, row):
+        if not self.spill_path:
+            return
+
+        line = json.dumps(row, ensure_ascii=False) + '\n'
+        with self._spill_lock:
+            try:
+                if os.path.exists(self.spill_path) and os.path.getsize(self.spill_path) >= self.spill_max_bytes:
+                    return
+                with open(self.spill_path, 'a', encoding='utf-8') as spill_file:
+                    spill_file.write(line)
+                CONVERSATION_LOG_SPILLED.inc()
+            except OSError as e:
+                logging.warning(f"Conversation log spill failed: {e}")
+
+    def replay_spill(self):
+        """Queue spilled rows for insertion again; return how many were queued"""
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return 0
+
+        # Rows that still do not fit are spilled to a fresh file while replaying
+        replay_path = f"{self.spill_path}.replay"
+        with self._spill_lock:
+            os.replace(self.spill_path, replay_path)
+
+        queued = 0
+        with open(replay_path, encoding='utf-8') as replay_file:
+            for line in replay_file:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue
+                if self.writer.submit(INSERT_LOG, row, limit=self.max_pending):
+                    queued += 1
+                else:
+                    self._spill(row)
+
+        os.unlink(replay_path)
+        return queued
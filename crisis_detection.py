@@ -1,27 +1,36 @@
-import re
+from phrase_matcher import PhraseMatcher, normalize_for_matching
 
 class CrisisDetector:
     def __init__(self):
         """Initialize crisis detection patterns and responses"""
         
-        # Crisis keywords and phrases
+        # Crisis phrases grouped by category. English phrases must match whole
+        # words; Hindi phrases are stems and may carry inflected endings.
         self.crisis_patterns = {
-            'en': [
-                r'\b(kill myself|end my life|suicide|suicidal)\b',
-                r'\b(want to die|wish I was dead|better off dead)\b',
-                r'\b(can\'t go on|can\'t take it|give up|hopeless)\b',
-                r'\b(hurt myself|self harm|cut myself)\b',
-                r'\b(no point|worthless|useless|burden)\b'
-            ],
-            'hi': [
-                r'\b(मरना चाहता|जान देना|आत्महत्या|खुदकुशी)\b',
-                r'\b(मरना बेहतर|जीना नहीं|जीवन समाप्त)\b',
-                r'\b(नहीं रह सकता|सहन नहीं|हार मान|निराशा)\b',
-                r'\b(खुद को नुकसान|आत्म हानि|काटना)\b',
-                r'\b(कोई फायदा नहीं|बेकार|निरर्थक|बोझ)\b'
-            ]
+            'en': {
+                'suicidal_ideation': [
+                    "kill myself", "end my life", "suicide", "suicidal",
+                    "want to die", "wish I was dead", "better off dead"
+                ],
+                'hopelessness': ["can't go on", "can't take it", "give up", "hopeless"],
+                'self_harm': ["hurt myself", "self harm", "cut myself"],
+                'worthlessness': ["no point", "worthless", "useless", "burden"]
+            },
+            'hi': {
+                'suicidal_ideation': [
+                    "मरना चाहता", "जान देना", "आत्महत्या", "खुदकुशी",
+                    "मरना बेहतर", "जीना नहीं", "जीवन समाप्त"
+                ],
+                'hopelessness': ["नहीं रह सकता", "सहन नहीं", "हार मान", "निराशा"],
+                'self_harm': ["खुद को नुकसान", "आत्म हानि", "काटना"],
+                'worthlessness': ["कोई फायदा नहीं", "बेकार", "निरर्थक", "बोझ"]
+            }
         }
         
+        # Every language's phrases in one automaton, compiled once, for
+        # screening before the message's language is known
+        self.prescreen_matcher = self._compile_matcher(list(self.crisis_patterns))
+        
         # Crisis responses with helplines
         self.crisis_responses = {
             'en': """🚨 **I'm concerned about what you've shared with me.**
@@ -61,26 +70,20 @@ Would you like me to guide you through a calming breathing exercise while you co
 क्या आप चाहेंगे कि मैं आपको एक शांत करने वाली सांस की तकनीक के माध्यम से मार्गदर्शन करूं जबकि आप पेशेवर सहायता लेने पर विचार करते हैं?"""
         }
     
-    def check_crisis(self, text, language):
-        """Check if text contains crisis indicators"""
+    def _compile_matcher(self, languages):
+        """Compile the crisis phrases of the given languages into one automaton"""
+        matcher = PhraseMatcher()
+        for language in languages:
+            prefix = language != 'en'
+            for category, phrases in self.crisis_patterns[language].items():
+                for phrase in phrases:
+                    matcher.add(phrase, category, prefix=prefix)
+        return matcher.build()
+    
+    def prescreen(self, text):
+        """Return every crisis category matched in text by any language's phrases, in a single scan"""
         try:
-            text_lower = text.lower()
-            
-            # Check patterns for the detected language
-            patterns = self.crisis_patterns.get(language, self.crisis_patterns['en'])
-            
-            for pattern in patterns:
-                if re.search(pattern, text_lower, re.IGNORECASE):
-                    return self.crisis_responses.get(language, self.crisis_responses['en'])
-            
-            # Also check English patterns if language is Hindi (code-switching)
-            if language == 'hi':
-                for pattern in self.crisis_patterns['en']:
-                    if re.search(pattern, text_lower, re.IGNORECASE):
-                        return self.crisis_responses.get(language, self.crisis_responses['en'])
-            
-            return None
-            
+            normalized = normalize_for_matching(text)
+            return sorted(self.prescreen_matcher.find_labels(normalized, normalized=True))
         except Exception:
-            # If there's any error in crisis detection, err on the side of caution
-            return None
+            return []
@@ -0,0 +1,48 @@
+import os
+import logging
+
+try:
+    from sqlalchemy import create_engine, text
+except ImportError as e:
+    logging.warning(f"SQLAlchemy not installed, database features are disabled: {e}")
+    create_engine = None
+    text = None
+
+
+def create_database_engine(url=None):
+    """Build the pooled PostgreSQL engine configured through the environment, or None
+
+    The pool is bounded per worker process, connections are pinged before
+    use so a rescheduled database does not surface as request errors, and
+    every statement runs under a server-side timeout.
+    """
+    url = url or os.environ.get('DATABASE_URL')
+    if not url or create_engine is None:
+        return None
+
+    # Heroku-style URLs are not accepted by SQLAlchemy
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+
+    statement_timeout_ms = int(os.environ.get('DATABASE_STATEMENT_TIMEOUT_MS', '2000'))
+    connect_args = {}
+    if url.startswith('postgresql'):
+        connect_args = {
+            'connect_timeout': int(os.environ.get('DATABASE_CONNECT_TIMEOUT', '5')),
+            'options': f"-c statement_timeout={statement_timeout_ms}",
+            'application_name': 'serenity-assistant'
+        }
+
+    try:
+        return create_engine(
+            url,
+            pool_size=int(os.environ.get('DATABASE_POOL_SIZE', '5')),
+            max_overflow=int(os.environ.get('DATABASE_MAX_OVERFLOW', '2')),
+            pool_timeout=float(os.environ.get('DATABASE_POOL_TIMEOUT', '5')),
+            pool_recycle=int(os.environ.get('DATABASE_POOL_RECYCLE', '1800')),
+            pool_pre_ping=True,
+            connect_args=connect_args
+        )
+    except Exception as e:
+        logging.error(f"Could not create database engine: {e}")
+        return None
@@ -0,0 +1,54 @@
+import gc
+import importlib.util
+import os
+import random
+import shutil
+import tempfile
+
+# gunicorn loads ./gunicorn.conf.py automatically; command line flags still win.
+
+# Worker processes write metric samples here so /metrics can aggregate them.
+# Must be set before any worker imports prometheus_client.
+multiproc_dir = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'serenity-metrics')
+)
+
+# Preload mode: the app, with its response tables, compiled matchers and
+# content catalog, is built once in the master and shared copy-on-write by
+# the workers. Per-worker clients and threads start in post_fork.
+preload_app = os.environ.get('GUNICORN_PRELOAD', '').lower() in ('1', 'true', 'yes')
+if preload_app:
+    os.environ['SERENITY_PRELOAD'] = '1'
+
+
+def on_starting(server):
+    """Refuse to start without metrics and start with an empty metrics directory"""
+    if importlib.util.find_spec('prometheus_client') is None:
+        if os.environ.get('METRICS_REQUIRED', 'true').lower() in ('1', 'true', 'yes'):
+            raise RuntimeError("prometheus_client is not installed; rebuild the image or set METRICS_REQUIRED=0")
+        server.log.error("prometheus_client is not installed, /metrics is disabled")
+    shutil.rmtree(multiproc_dir, ignore_errors=True)
+    os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def when_ready(server):
+    """Freeze the preloaded heap before the first worker is forked"""
+    if preload_app:
+        # Frozen objects are never traversed by the collector, so workers'
+        # collections do not write to, and unshare, the inherited pages
+        gc.collect()
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    """Give a preloaded worker its own random state, clients and threads"""
+    if preload_app:
+        random.seed()
+        import app
+        app.start_worker_services()
+
+
+def child_exit(server, worker):
+    """Drop the live gauges of a worker that exited or was recycled"""
+    import metrics
+    metrics.mark_process_dead(worker.pid)
@@ -38,11 +38,27 @@ CREATE TABLE IF NOT EXISTS meditation_sessions (
     language VARCHAR(10) DEFAULT 'en',
     completed BOOLEAN DEFAULT FALSE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    completed_at TIMESTAMP
+    completed_at TIMESTAMP,
+    abandoned_at TIMESTAMP
+);
+
+-- Databases created before abandonment tracking lack the column
+ALTER TABLE meditation_sessions ADD COLUMN IF NOT EXISTS abandoned_at TIMESTAMP;
+
+-- Meditation counters, maintained incrementally as sessions start and end
+CREATE TABLE IF NOT EXISTS meditation_stats (
+    meditation_type VARCHAR(50) NOT NULL,
+    duration INTEGER NOT NULL,
+    language VARCHAR(10) NOT NULL,
+    started BIGINT NOT NULL DEFAULT 0,
+    completed BIGINT NOT NULL DEFAULT 0,
+    abandoned BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (meditation_type, duration, language)
 );
 
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_user_sessions_session_id ON user_sessions(session_id);
+CREATE INDEX IF NOT EXISTS idx_user_sessions_updated_at ON user_sessions(updated_at);
 CREATE INDEX IF NOT EXISTS idx_conversation_logs_session_id ON conversation_logs(session_id);
 CREATE INDEX IF NOT EXISTS idx_conversation_logs_created_at ON conversation_logs(created_at);
 CREATE INDEX IF NOT EXISTS idx_meditation_sessions_session_id ON meditation_sessions(session_id);
@@ -0,0 +1,68 @@
+from phrase_matcher import PhraseMatcher, normalize_for_matching
+
+# Declarative keyword table: category -> keywords. A trailing '*' marks a stem
+# that may be followed by more letters ("meditat*" matches "meditation");
+# every other keyword must match a whole word.
+KEYWORD_TABLE = {
+    'stressed': [
+        'stress*', 'overwhelm*', 'pressure*', 'burden*', 'exhausted',
+        'तनाव*', 'दबाव*', 'tension', 'tanav'
+    ],
+    'sad': [
+        'sad', 'sadness', 'depress*', 'down', 'upset', 'hurt*', 'broken', 'cry*',
+        'उदास*', 'दुख*', 'दुःख*', 'udaas', 'udas', 'dukh*'
+    ],
+    'anxious': [
+        'anxious', 'anxiety', 'worr*', 'nervous', 'panic*', 'afraid', 'scared', 'fear*',
+        'चिंता*', 'चिंतित', 'घबरा*', 'डर*', 'बेचैन*', 'chinta', 'ghabra*', 'bechain'
+    ],
+    'meditation': [
+        'meditat*', 'breath*', 'calm*', 'relax*', 'peace*',
+        'ध्यान*', 'शांत*', 'आराम*', 'सांस*', 'मेडिटेशन*'
+    ],
+    'prefers_english': ['english', 'अंग्रेजी'],
+    'prefers_hindi': ['hindi', 'हिंदी', 'हिन्दी'],
+    'voice_mode': ['communicate in', 'would like to communicate', 'voice conversation']
+}
+
+# Language codes only count as a preference when they are the whole message;
+# inside a sentence "hi" is a greeting, not a request for Hindi
+WHOLE_MESSAGE_KEYWORDS = {
+    'en': 'prefers_english',
+    'eng': 'prefers_english',
+    'hi': 'prefers_hindi',
+    'hin': 'prefers_hindi'
+}
+
+MESSAGE_PUNCTUATION = ' .,!?;:\'"'
+
+
+class KeywordIndex:
+    """Precompiled index that finds every keyword category in one scan"""
+
+    def __init__(self, table=None, whole_message=None):
+        """Compile the keyword table into a single phrase automaton"""
+        self.table = table or KEYWORD_TABLE
+        self.whole_message = whole_message if whole_message is not None else WHOLE_MESSAGE_KEYWORDS
+        self.matcher = PhraseMatcher()
+
+        for category, keywords in self.table.items():
+            for keyword in keywords:
+                prefix = keyword.endswith('*')
+                keyword = keyword.rstrip('*')
+                self.matcher.add(keyword, (category, keyword), prefix=prefix)
+
+        self.matcher.build()
+
+    def scan(self, text):
+        """Return {category: [matched keywords]} for text"""
+        normalized = normalize_for_matching(text)
+        hits = {}
+        for _, _, (category, keyword) in self.matcher.iter_matches(normalized, normalized=True):
+            hits.setdefault(category, []).append(keyword)
+
+        keyword = normalized.strip(MESSAGE_PUNCTUATION)
+        category = self.whole_message.get(keyword)
+        if category:
+            hits.setdefault(category, []).append(keyword)
+        return hits
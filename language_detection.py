@@ -0,0 +1,180 @@
+import math
+from collections import Counter
+
+# Seed corpora for the romanized Hindi ("Hinglish") character n-gram model.
+# They only need to separate English from Hindi written in Latin script.
+ENGLISH_SEED = [
+    "i feel stressed and anxious today",
+    "i am not able to sleep at night",
+    "can you help me calm down please",
+    "i want to try a breathing exercise",
+    "my work is overwhelming and i feel tired",
+    "i have been feeling sad and lonely lately",
+    "thank you for listening to me",
+    "what should i do when i panic",
+    "i am worried about my exams and my family",
+    "everything feels hopeless right now",
+    "i would like to communicate in english",
+    "how are you doing today",
+    "nothing is going right and i am upset",
+    "could you guide me through a meditation",
+    "i think i need to relax for a while",
+    "my friends do not understand what i am going through",
+]
+
+HINGLISH_SEED = [
+    "mujhe bahut tension ho rahi hai",
+    "main bahut pareshan hoon aaj",
+    "mujhe raat ko neend nahi aati",
+    "kya aap meri madad kar sakte ho",
+    "mera mann bilkul nahi lag raha",
+    "main thak gaya hoon yaar",
+    "mujhe dar lag raha hai",
+    "kuch accha nahi lag raha hai",
+    "mera dil bahut udaas hai",
+    "main hindi mein baat karna chahta hoon",
+    "aap kaise ho aaj kal",
+    "ghar mein sab theek nahi chal raha",
+    "mujhe saans lene wala abhyas karna hai",
+    "main akela mehsoos kar raha hoon",
+    "kya karoon samajh nahi aa raha",
+    "mujhe shanti chahiye thodi der ke liye",
+]
+
+# Common words that settle a Latin-script word's language on their own. The
+# seed corpora above are far too small for the n-gram model to judge short
+# English input, so known words outvote it. Words used in both languages
+# ("me", "par", "to") are left out of the Hindi list.
+ENGLISH_WORDS = frozenset("""
+    a about after again all also always am an and any anymore anyone anything are as
+    at away back bad be because been before being better bit both but by can cannot
+    could day days did do does doing done down each even ever every everything feel
+    feeling feelings feels felt few for from get getting go going good got had has
+    have having he hello help her here hey hi him his home how i if im in into is it
+    its just keep know last life like little lot make many may maybe me mind more
+    morning most much must my myself need never new night no not nothing now of off
+    ok okay on one only or other our out over people please really right said same
+    say see she should since sleep so some someone something still such sure take
+    talk tell than thank thanks that the their them then there these they thing
+    things think this those through time to today tomorrow too try trying up us
+    very want wanted was way we week well went were what when where which while who
+    why will wish with without work worse would yes yesterday yet you your
+    alone angry anxiety anxious afraid awful breathe breathing burden calm cry crying
+    dead depressed depression die empty exam exams exhausted family fear friend
+    friends happy harm hate help helpless hope hopeless hurt kill lonely lost
+    meditation nervous overwhelmed pain panic relax sad scared self sick stress
+    stressed struggling suicide suicidal tension terrible therapist tired upset
+    useless worried worry worthless
+""".split())
+
+HINDI_WORDS = frozenset("""
+    aaj aap aapka aapki aapko abhi accha acha achha achhi aisa aise ajeeb akela akeli
+    bahut bahot baat bas bata batao bhi bilkul bohot chahiye chahta chahti chal dard
+    dil dar dukh dukhi ek gaya gayi ghar ham hamesha hai hain hoon hota hoti hu hua
+    hum hun jaise jab jaldi jo kaam kabhi kaise kar karna karo karoon karta karti
+    kaun kehna khush kitna koi kuch kya kyun kyunki laga lagta lagti lag log main
+    mai maine mann mera meri mere mujhe mujhko nahi nahin neend pareshan pata raat
+    raha rahi rahe sab sakta sakti samajh sath sabse socha soch tab thak theek thik
+    thoda thodi tum tumhe udaas udas unko usko vo woh yaar yahan ye yeh zindagi
+""".split())
+
+# A Latin-script message is English unless the words say otherwise
+LATIN_PRIOR = {'en': 1.5, 'hi': 0.5}
+UNKNOWN_WORD_WEIGHT = 0.5
+
+NGRAM_SIZE = 3
+
+
+def _is_devanagari(char):
+    return 'ऀ' <= char <= 'ॿ'
+
+
+def _is_latin(char):
+    return char.isascii() and char.isalpha()
+
+
+class LanguageDetector:
+    """Local, zero-network detector choosing between English and Hindi"""
+
+    def __init__(self, ngram_size=NGRAM_SIZE):
+        """Train the n-gram models from the seed corpora and word lists"""
+        self.ngram_size = ngram_size
+        self.models = {
+            'en': self._train(ENGLISH_SEED + sorted(ENGLISH_WORDS)),
+            'hi': self._train(HINGLISH_SEED + sorted(HINDI_WORDS))
+        }
+
+    def _ngrams(self, text):
+        """Yield character n-grams of each word, padded with word boundaries"""
+        for word in text.split():
+            padded = f" {word} "
+            for i in range(max(len(padded) - self.ngram_size + 1, 1)):
+                yield padded[i:i + self.ngram_size]
+
+    def _train(self, sentences):
+        counts = Counter()
+        for sentence in sentences:
+            counts.update(self._ngrams(sentence))
+        total = sum(counts.values())
+        # Add-one smoothing over the observed vocabulary plus one unknown slot
+        denominator = total + len(counts) + 1
+        return {
+            'log_probs': {gram: math.log((count + 1) / denominator) for gram, count in counts.items()},
+            'unknown': math.log(1 / denominator)
+        }
+
+    def _word_votes(self, word):
+        """(english, hindi) votes cast by one lowercase Latin-script word"""
+        if word in ENGLISH_WORDS:
+            return 1.0, 0.0
+        if word in HINDI_WORDS:
+            return 0.0, 1.0
+
+        # Unknown words get a weaker, n-gram based vote
+        scores = {}
+        for language, model in self.models.items():
+            log_probs = model['log_probs']
+            unknown = model['unknown']
+            scores[language] = sum(log_probs.get(gram, unknown) for gram in self._ngrams(word))
+        if scores['hi'] > scores['en']:
+            return 0.0, UNKNOWN_WORD_WEIGHT
+        return UNKNOWN_WORD_WEIGHT, 0.0
+
+    def _romanized_hindi_probability(self, latin_text):
+        """Probability that Latin-script text is romanized Hindi
+
+        Words vote for a language, and the votes are smoothed by a prior
+        leaning towards English, so a single word can never be Hindi with
+        the confidence a whole Hinglish sentence earns.
+        """
+        english = LATIN_PRIOR['en']
+        hindi = LATIN_PRIOR['hi']
+        for word in latin_text.split():
+            english_vote, hindi_vote = self._word_votes(word)
+            english += english_vote
+            hindi += hindi_vote
+        return hindi / (english + hindi)
+
+    def detect(self, text):
+        """Return (language, confidence) for text using script ratios and word votes"""
+        devanagari = 0
+        latin = 0
+        for char in text:
+            if _is_devanagari(char):
+                devanagari += 1
+            elif _is_latin(char):
+                latin += 1
+
+        letters = devanagari + latin
+        if not letters:
+            return 'en', 0.0
+
+        devanagari_ratio = devanagari / letters
+        if devanagari_ratio >= 0.5:
+            return 'hi', devanagari_ratio
+
+        latin_text = ''.join(char.lower() if _is_latin(char) else ' ' for char in text)
+        hindi_probability = self._romanized_hindi_probability(latin_text)
+        if hindi_probability > 0.5:
+            return 'hi', hindi_probability
+        return 'en', 1.0 - hindi_probability
@@ -134,6 +134,32 @@ class MeditationScripts:
                 }
             }
         }
+        
+        # Served when no script matches the requested type and duration
+        self.fallback_scripts = {
+            'en': [
+                "Let's begin with a simple breathing exercise.",
+                "Find a comfortable position and close your eyes.",
+                "Take a deep breath in through your nose for 4 counts.",
+                "Hold for 2 counts.",
+                "Exhale through your mouth for 6 counts.",
+                "Repeat this pattern at your own pace.",
+                "When ready, slowly open your eyes."
+            ],
+            'hi': [
+                "आइए एक सरल सांस अभ्यास के साथ शुरुआत करते हैं।",
+                "एक आरामदायक स्थिति खोजें और अपनी आंखें बंद करें।",
+                "4 गिनती के लिए अपनी नाक से गहरी सांस लें।",
+                "2 गिनती के लिए रोकें।",
+                "6 गिनती के लिए अपने मुंह से सांस छोड़ें।",
+                "अपनी गति से इस पैटर्न को दोहराएं।",
+                "जब तैयार हों, तो धीरे-धीरे अपनी आंखें खोलें।"
+            ]
+        }
+    
+    def has_script(self, session_type, duration, language):
+        """Check whether a script exists for exactly this type, duration and language"""
+        return str(duration) in self.scripts.get(session_type, {}).get(language, {})
     
     def get_meditation_script(self, session_type, duration, language):
         """Get meditation script based on type, duration, and language"""
@@ -156,29 +182,8 @@ class MeditationScripts:
                     }
             
             # Fallback to default
-            fallback_scripts = {
-                'en': [
-                    "Let's begin with a simple breathing exercise.",
-                    "Find a comfortable position and close your eyes.",
-                    "Take a deep breath in through your nose for 4 counts.",
-                    "Hold for 2 counts.",
-                    "Exhale through your mouth for 6 counts.",
-                    "Repeat this pattern at your own pace.",
-                    "When ready, slowly open your eyes."
-                ],
-                'hi': [
-                    "आइए एक सरल सांस अभ्यास के साथ शुरुआत करते हैं।",
-                    "एक आरामदायक स्थिति खोजें और अपनी आंखें बंद करें।",
-                    "4 गिनती के लिए अपनी नाक से गहरी सांस लें।",
-                    "2 गिनती के लिए रोकें।",
-                    "6 गिनती के लिए अपने मुंह से सांस छोड़ें।",
-                    "अपनी गति से इस पैटर्न को दोहराएं।",
-                    "जब तैयार हों, तो धीरे-धीरे अपनी आंखें खोलें।"
-                ]
-            }
-            
             return {
-                'script': fallback_scripts.get(language, fallback_scripts['en']),
+                'script': self.fallback_scripts.get(language, self.fallback_scripts['en']),
                 'language': language,
                 'session_type': 'breathing',
                 'duration': '5'
@@ -0,0 +1,142 @@
+import os
+import time
+import uuid
+import logging
+import threading
+
+try:
+    from sqlalchemy import text
+except ImportError:
+    text = None
+
+# Each statement records the session change and bumps the matching counter in
+# meditation_stats in one round trip; the state guards make a repeated
+# complete or abandon a no-op, so counters are incremented at most once
+START_SQL = """
+    WITH started AS (
+        INSERT INTO meditation_sessions (id, session_id, meditation_type, duration, language)
+        VALUES (CAST(:id AS UUID), :session_id, :meditation_type, :duration, :language)
+        RETURNING meditation_type, duration, language
+    )
+    INSERT INTO meditation_stats (meditation_type, duration, language, started)
+    SELECT meditation_type, duration, language, 1 FROM started
+    ON CONFLICT (meditation_type, duration, language)
+    DO UPDATE SET started = meditation_stats.started + EXCLUDED.started
+"""
+
+COMPLETE_SQL = """
+    WITH finished AS (
+        UPDATE meditation_sessions
+        SET completed = TRUE, completed_at = CURRENT_TIMESTAMP
+        WHERE id = CAST(:id AS UUID)
+          AND session_id IS NOT DISTINCT FROM :session_id
+          AND NOT completed AND abandoned_at IS NULL
+        RETURNING meditation_type, duration, language
+    )
+    INSERT INTO meditation_stats (meditation_type, duration, language, completed)
+    SELECT meditation_type, duration, language, 1 FROM finished
+    ON CONFLICT (meditation_type, duration, language)
+    DO UPDATE SET completed = meditation_stats.completed + EXCLUDED.completed
+"""
+
+ABANDON_SQL = """
+    WITH abandoned AS (
+        UPDATE meditation_sessions
+        SET abandoned_at = CURRENT_TIMESTAMP
+        WHERE id = CAST(:id AS UUID)
+          AND session_id IS NOT DISTINCT FROM :session_id
+          AND NOT completed AND abandoned_at IS NULL
+        RETURNING meditation_type, duration, language
+    )
+    INSERT INTO meditation_stats (meditation_type, duration, language, abandoned)
+    SELECT meditation_type, duration, language, 1 FROM abandoned
+    ON CONFLICT (meditation_type, duration, language)
+    DO UPDATE SET abandoned = meditation_stats.abandoned + EXCLUDED.abandoned
+"""
+
+STATS_SQL = """
+    SELECT meditation_type, duration, language, started, completed, abandoned
+    FROM meditation_stats
+    ORDER BY meditation_type, duration, language
+"""
+
+
+class MeditationTracker:
+    """Records meditation session starts, completions and abandonments
+
+    Changes go through the shared write-behind queue, and aggregate counts
+    are maintained incrementally in meditation_stats, so serving stats is
+    a read of one small table, cached in memory for stats_ttl seconds.
+    """
+
+    def __init__(self, engine, writer, session_interface=None, stats_ttl=None):
+        self.engine = engine
+        self.writer = writer
+        self.session_interface = session_interface
+        self.stats_ttl = stats_ttl if stats_ttl is not None else float(os.environ.get('MEDITATION_STATS_TTL', '60'))
+        self._stats = None
+        self._stats_at = 0
+        self._lock = threading.Lock()
+
+    def _session_id(self, session):
+        session_id = getattr(session, 'sid', None)
+        if session_id and hasattr(self.session_interface, 'persist'):
+            # meditation_sessions references user_sessions, so write the session row first
+            if not self.session_interface.persist(session):
+                return None
+        return session_id
+
+    def start(self, session, meditation_type, duration, language):
+        """Record a started meditation; return its id, or None if it could not be queued"""
+        meditation_id = str(uuid.uuid4())
+        queued = self.writer.submit(START_SQL, {
+            'id': meditation_id,
+            'session_id': self._session_id(session),
+            'meditation_type': meditation_type,
+            'duration': int(duration),
+            'language': language
+        })
+        return meditation_id if queued else None
+
+    def complete(self, session, meditation_id):
+        return self.writer.submit(COMPLETE_SQL, {
+            'id': meditation_id,
+            'session_id': self._session_id(session)
+        })
+
+    def abandon(self, session, meditation_id):
+        return self.writer.submit(ABANDON_SQL, {
+            'id': meditation_id,
+            'session_id': self._session_id(session)
+        })
+
+    def stats(self):
+        """Per type, duration and language counters, or None if they cannot be read"""
+        with self._lock:
+            if self._stats is not None and time.monotonic() - self._stats_at < self.stats_ttl:
+                return self._stats
+
+        try:
+            with self.engine.connect() as connection:
+                rows = connection.execute(text(STATS_SQL)).all()
+        except Exception as e:
+            logging.error(f"Meditation stats query failed: {e}")
+            with self._lock:
+                return self._stats  # Serve stale counters rather than nothing
+
+        stats = []
+        for meditation_type, duration, language, started, completed, abandoned in rows:
+            stats.append({
+                'meditation_type': meditation_type,
+                'duration': duration,
+                'language': language,
+                'started': started,
+                'completed': completed,
+                'abandoned': abandoned,
+                'completion_rate': completed / started if started else 0.0
+            })
+
+        with self._lock:
+            self._stats = stats
+            self._stats_at = time.monotonic()
+        return stats
@@ -0,0 +1,231 @@
+import os
+import time
+import logging
+from contextlib import contextmanager
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram,
+        REGISTRY, generate_latest, multiprocess
+    )
+except ImportError as e:
+    # Under gunicorn (see gunicorn.conf.py) this is a broken deployment, not a dev setup
+    log = logging.error if os.environ.get('PROMETHEUS_MULTIPROC_DIR') else logging.warning
+    log(f"prometheus_client not installed, metrics are disabled: {e}")
+    CONTENT_TYPE_LATEST = 'text/plain; version=0.0.4; charset=utf-8'
+    Counter = Gauge = Histogram = None
+
+
+class _NoopMetric:
+    """Stand-in used when prometheus_client is unavailable"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+    def set(self, value):
+        pass
+
+    def observe(self, value):
+        pass
+
+
+def metrics_enabled():
+    return Counter is not None
+
+
+def _metric(factory, *args, **kwargs):
+    if factory is None:
+        return _NoopMetric()
+    return factory(*args, **kwargs)
+
+
+# Buckets spanning local work (sub-millisecond) to remote calls (tens of seconds)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+REQUEST_COUNT = _metric(
+    Counter, 'serenity_http_requests_total', 'HTTP requests served',
+    ['method', 'route', 'status']
+)
+REQUEST_LATENCY = _metric(
+    Histogram, 'serenity_http_request_duration_seconds', 'HTTP request latency',
+    ['method', 'route'], buckets=LATENCY_BUCKETS
+)
+STAGE_LATENCY = _metric(
+    Histogram, 'serenity_stage_duration_seconds', 'Time spent in a processing stage',
+    ['component', 'stage'], buckets=LATENCY_BUCKETS
+)
+CACHE_LOOKUPS = _metric(
+    Counter, 'serenity_cache_lookups_total', 'Cache lookups by result',
+    ['cache', 'result']
+)
+REMOTE_CALLS_IN_FLIGHT = _metric(
+    Gauge, 'serenity_remote_calls_in_flight', 'Outbound calls currently waiting on a remote service',
+    ['dependency'], multiprocess_mode='livesum'
+)
+
+# Saturation signals for autoscaling: with sync workers, requests in progress
+# summed over live processes is the number of busy workers
+REQUESTS_IN_PROGRESS = _metric(
+    Gauge, 'serenity_http_requests_in_progress', 'Requests currently being handled',
+    multiprocess_mode='livesum'
+)
+WORKERS = _metric(
+    Gauge, 'serenity_workers', 'Live request-serving worker processes',
+    multiprocess_mode='livesum'
+)
+REQUEST_QUEUE_TIME = _metric(
+    Histogram, 'serenity_http_request_queue_seconds', 'Time between the proxy accepting a request and a worker starting it',
+    buckets=LATENCY_BUCKETS
+)
+VOICE_JOBS_PENDING = _metric(
+    Gauge, 'serenity_voice_jobs_pending', 'Speech recognition and synthesis jobs queued or running',
+    ['kind'], multiprocess_mode='livesum'
+)
+
+# Circuit breakers: 0 closed, 1 half open, 2 open; the worst worker is reported
+CIRCUIT_STATE = _metric(
+    Gauge, 'serenity_circuit_state', 'Circuit breaker state of a remote dependency (0 closed, 1 half open, 2 open)',
+    ['dependency'], multiprocess_mode='livemax'
+)
+REMOTE_CALL_FALLBACKS = _metric(
+    Counter, 'serenity_remote_call_fallbacks_total', 'Remote calls answered by a local fallback instead',
+    ['dependency', 'reason']
+)
+
+WRITE_BEHIND_PENDING = _metric(
+    Gauge, 'serenity_write_behind_pending', 'Database writes queued behind the response path',
+    multiprocess_mode='livesum'
+)
+WRITE_BEHIND_DROPPED = _metric(
+    Counter, 'serenity_write_behind_dropped_total', 'Database writes turned away by the write-behind queue or rejected by the database',
+    ['reason']
+)
+CONVERSATION_LOG_SPILLED = _metric(
+    Counter, 'serenity_conversation_log_spilled_total', 'Conversation log rows spilled to disk because the write queue was full'
+)
+
+
+@contextmanager
+def timed_stage(component, stage):
+    """Record how long the wrapped block takes as a stage latency"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.labels(component, stage).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def remote_call(dependency):
+    """Count the wrapped block as an in-flight call to a remote dependency"""
+    gauge = REMOTE_CALLS_IN_FLIGHT.labels(dependency)
+    gauge.inc()
+    try:
+        yield
+    finally:
+        gauge.dec()
+
+
+@contextmanager
+def voice_job(kind):
+    """Count the wrapped block as a pending speech job of the given kind (stt or tts)"""
+    gauge = VOICE_JOBS_PENDING.labels(kind)
+    gauge.inc()
+    try:
+        yield
+    finally:
+        gauge.dec()
+
+
+def record_cache_lookup(cache, hit):
+    CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def render_latest():
+    """Prometheus text exposition, aggregated across gunicorn workers when configured"""
+    if Counter is None:
+        return b''
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+
+    return generate_latest(REGISTRY)
+
+
+def parse_request_start(header, now=None):
+    """Seconds since the proxy stamped X-Request-Start, or None if absent or malformed
+
+    Accepts nginx's `t=${msec}` (seconds with millisecond resolution) as
+    well as integer milliseconds or microseconds since the epoch.
+    """
+    if not header:
+        return None
+
+    try:
+        started_at = float(header.strip().lstrip('t='))
+    except ValueError:
+        return None
+
+    if started_at > 1e14:
+        started_at /= 1e6
+    elif started_at > 1e11:
+        started_at /= 1e3
+
+    now = now if now is not None else time.time()
+    return max(0.0, now - started_at)
+
+
+def mark_worker_started():
+    """Count the current process as a request-serving worker"""
+    WORKERS.set(1)
+
+
+def mark_process_dead(pid):
+    """Drop a dead worker's live gauges from the multiprocess store"""
+    if Counter is not None and os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
+
+
+def init_app(app):
+    """Instrument every Flask route and expose /metrics"""
+    from flask import Response, g, request
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started_at = time.perf_counter()
+        REQUESTS_IN_PROGRESS.inc()
+
+        queued = parse_request_start(request.headers.get('X-Request-Start'))
+        if queued is not None:
+            REQUEST_QUEUE_TIME.observe(queued)
+
+    @app.after_request
+    def record_request(response):
+        started_at = g.get('request_started_at')
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_COUNT.labels(request.method, route, str(response.status_code)).inc()
+        if started_at is not None:
+            REQUEST_LATENCY.labels(request.method, route).observe(time.perf_counter() - started_at)
+        return response
+
+    @app.teardown_request
+    def finish_request(exc):
+        # Runs even when a handler raised, so the in-progress gauge cannot leak
+        if g.pop('request_started_at', None) is not None:
+            REQUESTS_IN_PROGRESS.dec()
+
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus metrics"""
+        if not metrics_enabled():
+            # Fail the scrape instead of reporting an empty, healthy-looking target
+            return Response('prometheus_client is not installed\n', status=503, mimetype='text/plain')
+        return Response(render_latest(), mimetype=CONTENT_TYPE_LATEST)
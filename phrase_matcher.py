@@ -0,0 +1,100 @@
+from collections import deque
+
+APOSTROPHES = str.maketrans({'’': "'", '‘': "'", '`': "'"})
+
+
+def normalize_for_matching(text):
+    """Casefold text and unify apostrophes so phrases match typed variants"""
+    return ' '.join(text.translate(APOSTROPHES).casefold().split())
+
+
+def is_word_char(char):
+    """Word characters, including Devanagari vowel signs that \\w does not cover"""
+    if char.isalnum() or char == '_':
+        return True
+    return 'ऀ' <= char <= 'ॿ' and char not in '।॥'
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton over literal phrases with word-boundary checks
+
+    Every phrase carries a label; scanning a text is a single pass over its
+    characters no matter how many phrases were added.
+    """
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self._built = False
+
+    def add(self, phrase, label, prefix=False):
+        """Add a phrase; prefix phrases may be followed by more word characters"""
+        phrase = normalize_for_matching(phrase)
+        if not phrase:
+            return
+
+        state = 0
+        for char in phrase:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+
+        self._output[state].append((len(phrase), label, prefix))
+        self._built = False
+
+    def build(self):
+        """Compute failure links; called automatically before the first scan"""
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                candidate = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = candidate if candidate != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+        self._built = True
+        return self
+
+    def iter_matches(self, text, normalized=False):
+        """Yield (start, end, label) for every whole-word phrase occurrence"""
+        if not self._built:
+            self.build()
+        if not normalized:
+            text = normalize_for_matching(text)
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        length = len(text)
+        state = 0
+
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            for phrase_length, label, prefix in output[state]:
+                start = index - phrase_length + 1
+                end = index + 1
+                if start > 0 and is_word_char(text[start - 1]):
+                    continue
+                if not prefix and end < length and is_word_char(text[end]):
+                    continue
+                yield start, end, label
+
+    def find_labels(self, text, normalized=False):
+        """Return the set of labels matched anywhere in text"""
+        return {label for _, _, label in self.iter_matches(text, normalized)}
@@ -0,0 +1,147 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from metrics import CIRCUIT_STATE, REMOTE_CALL_FALLBACKS, remote_call
+
+# Values reported by serenity_circuit_state
+CIRCUIT_STATES = {'closed': 0, 'half_open': 1, 'open': 2}
+
+
+class DependencyUnavailable(Exception):
+    """Raised instead of a remote result when the caller should fall back locally"""
+
+
+class CircuitBreaker:
+    """Stops calling a dependency after repeated failures, then probes it again
+
+    After failure_threshold consecutive failures the circuit opens and every
+    call is refused for reset_timeout seconds. A single trial call is then
+    let through: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, name, failure_threshold, reset_timeout):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self._failures = 0
+        self._opened_at = 0
+        self._probing = False
+        self._lock = threading.Lock()
+        CIRCUIT_STATE.labels(name).set(CIRCUIT_STATES['closed'])
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open':
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._set_state('half_open')
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            if self.state != 'closed':
+                logging.info(f"Circuit for {self.name} closed")
+                self._set_state('closed')
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self.state == 'half_open' or (self.state == 'closed' and self._failures >= self.failure_threshold):
+                logging.warning(f"Circuit for {self.name} opened after {self._failures} failures")
+                self._opened_at = time.monotonic()
+                self._set_state('open')
+
+    def _set_state(self, state):
+        self.state = state
+        CIRCUIT_STATE.labels(self.name).set(CIRCUIT_STATES[state])
+
+
+class RemoteDependency:
+    """Deadline, circuit breaker and bulkhead around calls to one remote service
+
+    Calls run on the dependency's own small thread pool, so a caller waits
+    at most timeout seconds however long the service takes to answer. At
+    most max_concurrent calls may be outstanding, including ones whose
+    caller already gave up; beyond that calls are refused at once, so one
+    slow dependency cannot tie up the threads every other route needs.
+    """
+
+    def __init__(self, name, timeout, max_concurrent, failure_threshold=5, reset_timeout=30):
+        self.name = name
+        self.timeout = timeout
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix=name)
+
+    @classmethod
+    def from_env(cls, name, prefix, timeout, max_concurrent):
+        """Build a dependency whose limits can be overridden by <prefix>_TIMEOUT and <prefix>_MAX_CONCURRENCY"""
+        return cls(
+            name,
+            float(os.environ.get(f'{prefix}_TIMEOUT', str(timeout))),
+            int(os.environ.get(f'{prefix}_MAX_CONCURRENCY', str(max_concurrent))),
+            failure_threshold=int(os.environ.get('CIRCUIT_FAILURE_THRESHOLD', '5')),
+            reset_timeout=float(os.environ.get('CIRCUIT_RESET_TIMEOUT', '30'))
+        )
+
+    def call(self, func, *args, expected=(), **kwargs):
+        """Return func(*args, **kwargs) or raise DependencyUnavailable
+
+        Exceptions in expected are answers from a healthy service (such as
+        "could not understand the audio") and are re-raised without counting
+        against the circuit; any other exception is re-raised as is.
+        """
+        if not self._slots.acquire(blocking=False):
+            self._fell_back('bulkhead_full')
+            raise DependencyUnavailable(f"{self.name} is at its concurrency limit")
+
+        if not self.breaker.allow():
+            self._slots.release()
+            self._fell_back('circuit_open')
+            raise DependencyUnavailable(f"{self.name} circuit is open")
+
+        try:
+            future = self._executor.submit(self._run, func, args, kwargs)
+        except Exception:
+            self._slots.release()
+            self.breaker.record_failure()
+            raise
+
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            self.breaker.record_failure()
+            self._fell_back('timeout')
+            raise DependencyUnavailable(f"{self.name} did not answer within {self.timeout}s")
+        except expected:
+            self.breaker.record_success()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            self._fell_back('error')
+            raise
+
+        self.breaker.record_success()
+        return result
+
+    def _run(self, func, args, kwargs):
+        try:
+            with remote_call(self.name):
+                return func(*args, **kwargs)
+        finally:
+            # Released only when the call really ends, even after its caller timed out
+            self._slots.release()
+
+    def _fell_back(self, reason):
+        REMOTE_CALL_FALLBACKS.labels(self.name, reason).inc()
@@ -0,0 +1,256 @@
+import re
+import time
+import logging
+import unicodedata
+from array import array
+from phrase_matcher import APOSTROPHES
+from analysis_context import TOKEN_PATTERN
+
+# Polarity lexicon, from -1 (most negative) to 1 (most positive). Hindi is
+# listed in Devanagari and in the common romanized spellings, so messages
+# are scored as written, without translating them first.
+POLARITY_TABLE = {
+    'en': {
+        'good': 0.7, 'great': 0.8, 'happy': 0.8, 'glad': 0.5, 'better': 0.5, 'best': 1.0,
+        'calm': 0.3, 'relaxed': 0.4, 'peaceful': 0.5, 'grateful': 0.6, 'thankful': 0.5,
+        'love': 0.5, 'loved': 0.5, 'hopeful': 0.5, 'fine': 0.4, 'okay': 0.2, 'ok': 0.2,
+        'wonderful': 0.9, 'amazing': 0.6, 'excited': 0.4, 'joy': 0.8, 'nice': 0.6,
+        'proud': 0.5, 'safe': 0.4, 'positive': 0.3, 'beautiful': 0.85, 'enjoy': 0.4,
+        'enjoyed': 0.4, 'fun': 0.3, 'cheerful': 0.6, 'confident': 0.5, 'motivated': 0.4,
+        'rested': 0.3, 'strong': 0.4,
+        'bad': -0.7, 'terrible': -1.0, 'awful': -1.0, 'horrible': -1.0, 'sad': -0.5,
+        'unhappy': -0.6, 'depressed': -0.6, 'lonely': -0.5, 'alone': -0.3, 'tired': -0.4,
+        'exhausted': -0.5, 'angry': -0.6, 'hate': -0.8, 'hurt': -0.5, 'pain': -0.5,
+        'painful': -0.6, 'worse': -0.6, 'worst': -1.0, 'miserable': -0.8, 'hopeless': -0.8,
+        'helpless': -0.6, 'worthless': -0.8, 'useless': -0.5, 'empty': -0.4, 'scared': -0.5,
+        'afraid': -0.5, 'worried': -0.4, 'anxious': -0.4, 'nervous': -0.3, 'stressed': -0.5,
+        'upset': -0.5, 'cry': -0.4, 'crying': -0.5, 'lost': -0.3, 'broken': -0.6,
+        'sick': -0.7, 'failed': -0.5, 'failure': -0.6, 'guilty': -0.5, 'ashamed': -0.6,
+        'frustrated': -0.6, 'overwhelmed': -0.5, 'difficult': -0.4, 'hard': -0.3,
+        'struggling': -0.5, 'weak': -0.4, 'bored': -0.4, 'annoyed': -0.5, 'disappointed': -0.6
+    },
+    'hi': {
+        'अच्छा': 0.7, 'अच्छी': 0.7, 'अच्छे': 0.7, 'खुश': 0.8, 'खुशी': 0.8, 'बढ़िया': 0.8,
+        'शानदार': 0.9, 'शांत': 0.4, 'सुकून': 0.6, 'आराम': 0.4, 'ठीक': 0.3, 'बेहतर': 0.5,
+        'प्यार': 0.5, 'आनंद': 0.8, 'धन्यवाद': 0.4, 'शुक्रिया': 0.4, 'सुंदर': 0.7, 'उम्मीद': 0.4,
+        'बुरा': -0.7, 'बुरी': -0.7, 'बुरे': -0.7, 'दुखी': -0.6, 'दुख': -0.5, 'उदास': -0.6,
+        'परेशान': -0.5, 'तनाव': -0.5, 'चिंता': -0.4, 'चिंतित': -0.5, 'डर': -0.5, 'अकेला': -0.5,
+        'अकेली': -0.5, 'थका': -0.4, 'थकी': -0.4, 'गुस्सा': -0.6, 'नफरत': -0.8, 'दर्द': -0.5,
+        'निराश': -0.7, 'निराशा': -0.7, 'बेकार': -0.6, 'खराब': -0.6, 'मुश्किल': -0.4,
+        'रोना': -0.5, 'घबराहट': -0.5, 'बेचैन': -0.5,
+        'accha': 0.7, 'achha': 0.7, 'acha': 0.7, 'achhi': 0.7, 'acchi': 0.7, 'khush': 0.8,
+        'khushi': 0.8, 'badhiya': 0.8, 'badiya': 0.8, 'theek': 0.3, 'thik': 0.3, 'sukoon': 0.6,
+        'shanti': 0.4, 'pyaar': 0.5, 'mast': 0.6, 'shukriya': 0.4, 'behtar': 0.5,
+        'bura': -0.7, 'buri': -0.7, 'bure': -0.7, 'dukhi': -0.6, 'dukh': -0.5, 'udaas': -0.6,
+        'udas': -0.6, 'pareshan': -0.5, 'tension': -0.5, 'chinta': -0.4, 'akela': -0.5,
+        'akeli': -0.5, 'thaka': -0.4, 'thaki': -0.4, 'gussa': -0.6, 'nafrat': -0.8,
+        'dard': -0.5, 'nirash': -0.7, 'bekaar': -0.6, 'bekar': -0.6, 'kharab': -0.6,
+        'mushkil': -0.4, 'rona': -0.5, 'ghabrahat': -0.5, 'bechain': -0.5
+    }
+}
+
+# Intensifiers scale the next sentiment word
+INTENSIFIER_TABLE = {
+    'very': 1.3, 'really': 1.3, 'so': 1.3, 'too': 1.3, 'extremely': 1.5, 'incredibly': 1.5,
+    'totally': 1.3, 'completely': 1.3, 'absolutely': 1.4, 'quite': 1.1, 'super': 1.3,
+    'deeply': 1.4, 'bit': 0.7, 'slightly': 0.6, 'somewhat': 0.7, 'kinda': 0.7,
+    'बहुत': 1.3, 'बेहद': 1.5, 'ज्यादा': 1.2, 'ज़्यादा': 1.2, 'काफी': 1.2, 'थोड़ा': 0.7,
+    'bahut': 1.3, 'bohot': 1.3, 'bahot': 1.3, 'behad': 1.5, 'zyada': 1.2, 'jyada': 1.2,
+    'kaafi': 1.2, 'thoda': 0.7, 'bilkul': 1.3
+}
+
+# English negators precede the word they negate; Hindi ones follow it
+# ("खुश नहीं", "accha nahi") and are ignored anywhere else ("na jaane kyun").
+# A negated word's polarity is scaled by NEGATION.
+PREFIX_NEGATORS = ['not', 'no', 'never', 'nothing', 'without']
+POSTFIX_NEGATORS = ['नहीं', 'नही', 'ना', 'न', 'मत', 'nahi', 'nahin', 'nai', 'na', 'mat']
+
+NEGATION = -0.5
+# Tokens a postfix negator may follow its sentiment word by ("accha lag nahi raha")
+POSTFIX_WINDOW = 3
+
+# A negator or intensifier reaches across these words ("not feeling good") but
+# any other word ends its reach, so "can't stop crying" and "never felt this
+# happy" are not read as negating "crying" and "happy"
+LINKING_WORDS = [
+    'am', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'feel', 'feels', 'feeling',
+    'felt', 'get', 'getting', 'got', 'seem', 'seems', 'seemed', 'look', 'looks', 'that',
+    'हूँ', 'हूं', 'है', 'हैं', 'था', 'थी', 'ही', 'भी', 'hoon', 'hun', 'hai', 'hain', 'tha', 'thi', 'hi', 'bhi'
+]
+
+# Punctuation ending a clause also ends the reach of negators and intensifiers
+CLAUSE_BREAKS = '.,;:!?।'
+
+SENTIMENT, MODIFIER, POSTFIX_NEGATOR, CLAUSE_BREAK, LINKING = 0, 1, 2, 3, 4
+
+CONTRACTED_NOT = re.compile(r"n't\b")
+SCORING_TOKEN_PATTERN = re.compile(TOKEN_PATTERN.pattern + '|[' + re.escape(CLAUSE_BREAKS) + ']')
+
+
+def _normalize_token(token):
+    # Devanagari nukta letters have precomposed and combining forms
+    return unicodedata.normalize('NFC', token.casefold())
+
+
+class SentimentEngine:
+    """Lexicon-based polarity scorer for English, Hindi and romanized Hindi
+
+    The lexicon is compiled once into a token -> index table over two flat
+    arrays (entry kind and value), so scoring a message is one pass over its
+    tokens with dict lookups and no per-call allocation beyond tokenizing.
+    Like TextBlob, the score is the mean polarity of the sentiment words
+    found, after negation and intensifiers are applied, in [-1, 1].
+    """
+
+    def __init__(self, polarity_table=None, intensifiers=None):
+        """Compile the lexicon tables into the index and value arrays"""
+        self.vocabulary = {}
+        self.kinds = array('B')
+        self.values = array('d')
+
+        for words in (polarity_table or POLARITY_TABLE).values():
+            for word, polarity in words.items():
+                self._add(word, SENTIMENT, polarity)
+        for word, factor in (intensifiers or INTENSIFIER_TABLE).items():
+            self._add(word, MODIFIER, factor)
+        for word in PREFIX_NEGATORS:
+            self._add(word, MODIFIER, NEGATION)
+        for word in POSTFIX_NEGATORS:
+            self._add(word, POSTFIX_NEGATOR, NEGATION)
+        for mark in CLAUSE_BREAKS:
+            self._add(mark, CLAUSE_BREAK, 0.0)
+        for word in LINKING_WORDS:
+            self._add(word, LINKING, 0.0)
+
+    def _add(self, word, kind, value):
+        word = _normalize_token(word)
+        index = self.vocabulary.get(word)
+        if index is None:
+            self.vocabulary[word] = len(self.kinds)
+            self.kinds.append(kind)
+            self.values.append(value)
+        else:
+            self.kinds[index] = kind
+            self.values[index] = value
+
+    def tokenize(self, text):
+        text = CONTRACTED_NOT.sub(' not', text.translate(APOSTROPHES).casefold())
+        return SCORING_TOKEN_PATTERN.findall(unicodedata.normalize('NFC', text))
+
+    def score(self, text):
+        """Polarity of text in [-1, 1]; 0.0 when no sentiment word is found"""
+        vocabulary = self.vocabulary
+        kinds = self.kinds
+        values = self.values
+
+        total = 0.0
+        count = 0
+        multiplier = 1.0  # Pending effect of the negators and intensifiers just read
+        last = None  # Contribution of the latest sentiment word, while a postfix negator may apply
+        since_last = 0
+
+        for token in self.tokenize(text):
+            since_last += 1
+            index = vocabulary.get(token)
+            if index is None:
+                multiplier = 1.0
+                continue
+
+            kind = kinds[index]
+            if kind == SENTIMENT:
+                last = values[index] * multiplier
+                total += last
+                count += 1
+                since_last = 0
+                multiplier = 1.0
+            elif kind == MODIFIER:
+                multiplier *= values[index]
+            elif kind == POSTFIX_NEGATOR:
+                if last is not None and since_last <= POSTFIX_WINDOW:
+                    total += last * NEGATION - last
+                    last = None
+            elif kind == CLAUSE_BREAK:
+                multiplier = 1.0
+                last = None
+
+        if not count:
+            return 0.0
+        return max(-1.0, min(1.0, total / count))
+
+    def score_batch(self, texts):
+        """Polarity of each text, in input order, as an array of doubles"""
+        return array('d', map(self.score, texts))
+
+
+# Labelled sample for the benchmark: (message, language, expected to read as negative)
+BENCHMARK_SAMPLES = [
+    ("I feel really happy today", 'en', False),
+    ("Today was a good day at work", 'en', False),
+    ("I am so grateful for my friends", 'en', False),
+    ("I feel calm and relaxed after the walk", 'en', False),
+    ("Things are getting better slowly", 'en', False),
+    ("I am not happy with how things are going", 'en', True),
+    ("I feel very sad and lonely", 'en', True),
+    ("Everything is terrible and I hate it", 'en', True),
+    ("I'm exhausted and overwhelmed by exams", 'en', True),
+    ("I don't feel good at all", 'en', True),
+    ("Nothing is going right, I feel awful", 'en', True),
+    ("I am not bad, just a bit tired", 'en', False),
+    ("What time is the meditation session", 'en', False),
+    ("मैं आज बहुत खुश हूँ", 'hi', False),
+    ("आज का दिन अच्छा था", 'hi', False),
+    ("मुझे सुकून मिल रहा है", 'hi', False),
+    ("मैं बहुत उदास हूँ", 'hi', True),
+    ("मैं खुश नहीं हूँ", 'hi', True),
+    ("सब कुछ बहुत बुरा लग रहा है", 'hi', True),
+    ("मुझे बहुत तनाव और चिंता है", 'hi', True),
+    ("main aaj bahut khush hoon", 'hi', False),
+    ("sab theek hai, accha lag raha hai", 'hi', False),
+    ("mera mann bahut udaas hai", 'hi', True),
+    ("kuch accha nahi lag raha", 'hi', True),
+    ("mujhe bahut tension ho rahi hai", 'hi', True),
+]
+
+
+def _accuracy(scores, labels):
+    return sum((score < -0.1) == negative for score, negative in zip(scores, labels)) / len(labels)
+
+
+def _throughput(func, texts, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            func(text)
+    return rounds * len(texts) / (time.perf_counter() - started)
+
+
+if __name__ == '__main__':
+    # Accuracy and throughput against TextBlob: python sentiment_engine.py [rounds]
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    texts = [text for text, _, _ in BENCHMARK_SAMPLES]
+    labels = [negative for _, _, negative in BENCHMARK_SAMPLES]
+    english = [index for index, (_, language, _) in enumerate(BENCHMARK_SAMPLES) if language == 'en']
+
+    engine = SentimentEngine()
+    scores = engine.score_batch(texts)
+    logging.info(f"SentimentEngine: accuracy {_accuracy(scores, labels):.0%} overall, "
+                 f"{_accuracy([scores[i] for i in english], [labels[i] for i in english]):.0%} on English, "
+                 f"{_throughput(engine.score, texts, rounds):,.0f} messages/s")
+
+    try:
+        from textblob import TextBlob
+    except ImportError:
+        logging.warning("textblob not installed, skipping the comparison")
+        sys.exit(0)
+
+    def textblob_polarity(text):
+        return TextBlob(text).sentiment.polarity
+
+    # TextBlob only understands English; in the app Hindi was translated first
+    blob_scores = [textblob_polarity(text) for text in texts]
+    logging.info(f"TextBlob: accuracy {_accuracy(blob_scores, labels):.0%} overall (untranslated), "
+                 f"{_accuracy([blob_scores[i] for i in english], [labels[i] for i in english]):.0%} on English, "
+                 f"{_throughput(textblob_polarity, texts, max(1, rounds // 10)):,.0f} messages/s")
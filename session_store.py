@@ -0,0 +1,201 @@
+import json
+import uuid
+import logging
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+try:
+    from sqlalchemy import text
+except ImportError:
+    text = None
+
+LOAD_SESSION_SQL = """
+    SELECT conversation_data FROM user_sessions
+    WHERE session_id = :session_id
+      AND updated_at > CURRENT_TIMESTAMP - (:max_age * INTERVAL '1 second')
+"""
+
+SAVE_SESSION_SQL = """
+    INSERT INTO user_sessions (session_id, user_language, conversation_data)
+    VALUES (:session_id, :user_language, CAST(:conversation_data AS JSONB))
+    ON CONFLICT (session_id) DO UPDATE
+    SET user_language = EXCLUDED.user_language,
+        conversation_data = EXCLUDED.conversation_data
+"""
+
+# Expired sessions are deleted in batches; rows already being written are left for the next run
+EXPIRED_SESSIONS_SQL = """
+    SELECT session_id FROM user_sessions
+    WHERE updated_at < CURRENT_TIMESTAMP - (:max_age * INTERVAL '1 second')
+    LIMIT :batch_size
+    FOR UPDATE SKIP LOCKED
+"""
+
+# Analytics rows outlive the session they came from, so they keep everything but the reference
+DETACH_SESSION_SQL = (
+    "UPDATE conversation_logs SET session_id = NULL WHERE session_id = ANY(:session_ids)",
+    "UPDATE meditation_sessions SET session_id = NULL WHERE session_id = ANY(:session_ids)"
+)
+
+DELETE_SESSIONS_SQL = "DELETE FROM user_sessions WHERE session_id = ANY(:session_ids)"
+
+PRUNE_BATCH_SIZE = 1000
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """Session whose data lives in user_sessions; the cookie only carries its signed id
+
+    A session whose row could not be read is not writable, so a database
+    hiccup can never replace the stored conversation with an empty one.
+    """
+
+    def __init__(self, initial=None, sid=None, new=False, writable=True):
+        def on_update(session):
+            session.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.writable = writable
+        self.modified = False
+        self.persisted = False
+
+
+class SessionLoadError(Exception):
+    """The session row could not be read"""
+
+
+class DatabaseSessionInterface(SessionInterface):
+    """Flask session interface storing sessions in PostgreSQL
+
+    Every request reads its session row and changed sessions are upserted
+    before the response is sent. There is deliberately no per-worker cache
+    and no write-behind for these rows: with several workers and pods, either
+    would let a request see an older copy of the session and write it back
+    over a newer one.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt='serenity-session-id', key_derivation='hmac')
+
+    def open_session(self, app, request):
+        sid = None
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode('ascii')
+            except BadSignature:
+                sid = None
+
+        if sid:
+            try:
+                data = self._load(sid, app)
+            except SessionLoadError:
+                # Serve this request without its history and leave the row alone
+                return ServerSideSession(sid=sid, writable=False)
+            if data is not None:
+                return ServerSideSession(data, sid)
+
+        return ServerSideSession(sid=sid or uuid.uuid4().hex, new=True)
+
+    def save_session(self, app, session, response):
+        if not session.writable:
+            return
+
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if session.modified and not session.new:
+                self._store(session.sid, {})
+                response.delete_cookie(name, domain=domain, path=path)
+                response.vary.add('Cookie')
+            return
+
+        response.vary.add('Cookie')
+
+        if session.modified:
+            self._store(session.sid, dict(session))
+
+        if session.new or self.should_set_cookie(app, session):
+            response.set_cookie(
+                name,
+                self._signer(app).sign(session.sid).decode('ascii'),
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app)
+            )
+
+    def persist(self, session):
+        """Write the session row now, ahead of rows that reference it; return whether it exists"""
+        if not session.writable:
+            return False
+        if session.modified or (session.new and not session.persisted):
+            if not self._store(session.sid, dict(session)):
+                return False
+            session.modified = False
+        session.persisted = True
+        return True
+
+    def prune(self, max_age, batch_size=PRUNE_BATCH_SIZE):
+        """Delete sessions idle for longer than max_age seconds; return how many were deleted"""
+        deleted = 0
+        while True:
+            try:
+                with self.engine.begin() as connection:
+                    session_ids = [row[0] for row in connection.execute(text(EXPIRED_SESSIONS_SQL), {
+                        'max_age': int(max_age),
+                        'batch_size': batch_size
+                    })]
+                    if session_ids:
+                        for statement in DETACH_SESSION_SQL:
+                            connection.execute(text(statement), {'session_ids': session_ids})
+                        connection.execute(text(DELETE_SESSIONS_SQL), {'session_ids': session_ids})
+            except Exception as e:
+                logging.error(f"Session pruning failed after deleting {deleted} sessions: {e}")
+                return deleted
+
+            deleted += len(session_ids)
+            if len(session_ids) < batch_size:
+                return deleted
+
+    def _load(self, sid, app):
+        """Return the session's data, or None if it is unknown or expired"""
+        try:
+            with self.engine.connect() as connection:
+                row = connection.execute(text(LOAD_SESSION_SQL), {
+                    'session_id': sid,
+                    'max_age': int(app.permanent_session_lifetime.total_seconds())
+                }).first()
+        except Exception as e:
+            logging.error(f"Session load failed: {e}")
+            raise SessionLoadError(sid) from e
+
+        if row is None:
+            return None
+
+        data = row[0]
+        if isinstance(data, str):
+            data = json.loads(data)
+        return data
+
+    def _store(self, sid, data):
+        try:
+            with self.engine.begin() as connection:
+                connection.execute(text(SAVE_SESSION_SQL), {
+                    'session_id': sid,
+                    'user_language': data.get('user_language', 'en'),
+                    'conversation_data': json.dumps(data)
+                })
+            return True
+        except Exception as e:
+            logging.error(f"Session write failed: {e}")
+            return False
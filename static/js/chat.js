@@ -30,6 +30,7 @@ class SerenityChat {
         this.audioChunks = [];
         this.voiceAvailable = false;
         this.currentLanguage = 'en';
+        this.conversationLanguage = 'en'; // Language the server last replied in
         this.continuousMode = false;
         this.speakerMode = true; // Default to enabled for conversational experience
         
@@ -58,6 +59,15 @@ class SerenityChat {
         // Meditation next step
         this.nextMeditationStep.addEventListener('click', () => this.nextMeditationStepHandler());
 
+        // Closing the meditation before its last step counts as abandoning it
+        document.getElementById('meditationModal').addEventListener('hidden.bs.modal', () => {
+            if (this.currentMeditationSession && !this.currentMeditationSession.completed) {
+                this.trackMeditation('abandon');
+                this.currentMeditationSession = null;
+                this.currentStep = 0;
+            }
+        });
+
         // Language selector change
         document.querySelectorAll('input[name="language"], input[name="mobileLanguage"]').forEach(radio => {
             radio.addEventListener('change', (e) => this.handleLanguageChange(e));
@@ -115,6 +125,8 @@ class SerenityChat {
             const data = await response.json();
 
             if (data.success) {
+                this.conversationLanguage = data.language;
+
                 // Add assistant response
                 this.addMessage(data.response, 'assistant', {
                     language: data.language,
@@ -230,13 +242,14 @@ class SerenityChat {
 
     async startMeditation(sessionType, duration) {
         try {
-            const response = await fetch(`/meditation/${sessionType}/${duration}`);
+            const response = await fetch(`/meditation/${sessionType}/${duration}?lang=${this.conversationLanguage}`);
             const data = await response.json();
 
             if (data.success) {
                 this.currentMeditationSession = data;
                 this.currentStep = 0;
                 this.showMeditationModal();
+                this.trackMeditation('start');
             }
         } catch (error) {
             console.error('Meditation start error:', error);
@@ -244,6 +257,37 @@ class SerenityChat {
         }
     }
 
+    async trackMeditation(action) {
+        // Tracking is best effort and never interrupts the meditation itself
+        const meditation = this.currentMeditationSession;
+        if (!meditation) return;
+
+        try {
+            if (action === 'start') {
+                const response = await fetch('/meditation/sessions', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({
+                        session_type: meditation.session_type,
+                        duration: meditation.duration,
+                        language: meditation.language
+                    })
+                });
+                const data = await response.json();
+                if (data.success) {
+                    meditation.meditation_id = data.meditation_id;
+                }
+            } else if (meditation.meditation_id) {
+                await fetch(`/meditation/sessions/${meditation.meditation_id}/${action}`, {
+                    method: 'POST',
+                    keepalive: true
+                });
+            }
+        } catch (error) {
+            console.warn('Meditation tracking error:', error);
+        }
+    }
+
     showMeditationModal() {
         if (!this.currentMeditationSession) return;
 
@@ -303,6 +347,9 @@ class SerenityChat {
     }
 
     completeMeditation() {
+        this.currentMeditationSession.completed = true;
+        this.trackMeditation('complete');
+
         this.meditationContent.innerHTML = `
             <div class="text-center">
                 <i class="fas fa-check-circle text-success fa-3x mb-3"></i>
@@ -325,7 +372,7 @@ class SerenityChat {
 
     async showResources() {
         try {
-            const response = await fetch('/resources');
+            const response = await fetch(`/resources?lang=${this.conversationLanguage}`);
             const data = await response.json();
 
             if (data.success) {
@@ -434,13 +481,7 @@ class SerenityChat {
     async initializeVoiceFeatures() {
         try {
             // Check voice functionality status
-            const response = await fetch('/voice/status');
-            const data = await response.json();
-
-            if (data.success) {
-                this.voiceAvailable = data.status.available;
-                this.updateVoiceUI(data.status);
-            }
+            await this.refreshVoiceStatus();
 
             // Request microphone permission
             if (navigator.mediaDevices && navigator.mediaDevices.getUserMedia) {
@@ -457,11 +498,34 @@ class SerenityChat {
         }
     }
 
+    async refreshVoiceStatus() {
+        const response = await fetch('/voice/status');
+        const data = await response.json();
+
+        if (data.success) {
+            this.voiceAvailable = data.status.available;
+            this.updateVoiceUI(data.status);
+
+            // The server is still loading its voice stack; check again shortly
+            if (data.status.initializing) {
+                setTimeout(() => {
+                    this.refreshVoiceStatus().catch(error => {
+                        console.error('Voice status error:', error);
+                        this.updateVoiceUI({ available: false });
+                    });
+                }, 3000);
+            }
+        }
+    }
+
     updateVoiceUI(status) {
         if (this.voiceStatus) {
             if (status.available) {
                 this.voiceStatus.innerHTML = '🎤 Voice Ready';
                 this.voiceStatus.className = 'badge bg-success ms-2';
+            } else if (status.initializing) {
+                this.voiceStatus.innerHTML = '🎤 Voice Starting';
+                this.voiceStatus.className = 'badge bg-secondary ms-2';
             } else {
                 this.voiceStatus.innerHTML = '🎤 Voice Unavailable';
                 this.voiceStatus.className = 'badge bg-warning ms-2';
@@ -673,33 +737,18 @@ class SerenityChat {
                 throw new Error('Audio conversion failed. Please try recording again.');
             }
 
-            // Convert audio blob to base64 with better error handling
-            const audioBuffer = await wavBlob.arrayBuffer();
-            
-            // Create base64 in chunks to avoid memory issues
-            const uint8Array = new Uint8Array(audioBuffer);
-            let binary = '';
-            const chunkSize = 1024;
-            for (let i = 0; i < uint8Array.length; i += chunkSize) {
-                const chunk = uint8Array.slice(i, i + chunkSize);
-                binary += String.fromCharCode.apply(null, chunk);
-            }
-            const audioBase64 = btoa(binary);
-
-            console.log('Audio converted to base64, length:', audioBase64.length);
+            console.log('Uploading audio as binary, size:', wavBlob.size);
 
             this.showTypingIndicator();
 
-            // Send to speech-to-text endpoint with better error handling
-            const response = await fetch('/voice/speech-to-text', {
+            // Send the recording as a raw binary body; no base64 copy is needed
+            const language = encodeURIComponent(this.currentLanguage || 'en');
+            const response = await fetch(`/voice/speech-to-text?language=${language}`, {
                 method: 'POST',
                 headers: {
-                    'Content-Type': 'application/json',
+                    'Content-Type': 'application/octet-stream',
                 },
-                body: JSON.stringify({
-                    audio_data: audioBase64,
-                    language: this.currentLanguage || 'en'
-                })
+                body: wavBlob
             });
 
             let data;
@@ -864,6 +913,7 @@ class SerenityChat {
             const data = await response.json();
 
             if (data.success) {
+                this.conversationLanguage = data.language;
                 this.addMessage(data.response, 'assistant', {
                     language: data.language,
                     sessionType: data.session_type,
@@ -965,23 +1015,33 @@ class SerenityChat {
             return;
         }
 
+        // Prefer sentence-by-sentence streaming so playback starts early
+        try {
+            const played = await this.speakTextStreaming(text, language);
+            if (played > 0) {
+                return;
+            }
+        } catch (error) {
+            console.warn('Streaming text-to-speech failed, falling back:', error);
+        }
+
         try {
             const response = await fetch('/voice/text-to-speech', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
+                    'Accept': 'audio/wav',
                 },
                 body: JSON.stringify({
                     text: text,
-                    language: language
+                    language: language,
+                    format: 'wav'
                 })
             });
 
-            const data = await response.json();
-
-            if (data.success && data.audio_data) {
-                // Convert base64 to audio and play
-                const audioBlob = this.base64ToBlob(data.audio_data, 'audio/wav');
+            if (response.ok) {
+                // The server returns the audio itself, no base64 decoding needed
+                const audioBlob = await response.blob();
                 const audioUrl = URL.createObjectURL(audioBlob);
                 const audio = new Audio(audioUrl);
 
@@ -996,6 +1056,89 @@ class SerenityChat {
         }
     }
 
+    async speakTextStreaming(text, language = 'en') {
+        const response = await fetch('/voice/text-to-speech/stream', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'text/event-stream',
+            },
+            body: JSON.stringify({
+                text: text,
+                language: language
+            })
+        });
+
+        if (!response.ok || !response.body) {
+            throw new Error(`Streaming text-to-speech unavailable (${response.status})`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let played = 0;
+        let playback = Promise.resolve();
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) {
+                break;
+            }
+
+            buffer += decoder.decode(value, { stream: true });
+
+            // Server-sent events are separated by a blank line
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const event = this.parseServerSentEvent(buffer.slice(0, boundary));
+                buffer = buffer.slice(boundary + 2);
+
+                if (event.type === 'chunk' && event.data.audio_data) {
+                    const audioBlob = this.base64ToBlob(event.data.audio_data, event.data.mimetype || 'audio/wav');
+                    played += 1;
+                    // Queue each sentence behind the previous one
+                    playback = playback.then(() => this.playAudioBlob(audioBlob));
+                }
+            }
+        }
+
+        await playback;
+        return played;
+    }
+
+    parseServerSentEvent(rawEvent) {
+        let type = 'message';
+        const dataLines = [];
+
+        for (const line of rawEvent.split('\n')) {
+            if (line.startsWith('event:')) {
+                type = line.slice(6).trim();
+            } else if (line.startsWith('data:')) {
+                dataLines.push(line.slice(5).trim());
+            }
+        }
+
+        return {
+            type: type,
+            data: dataLines.length ? JSON.parse(dataLines.join('\n')) : {}
+        };
+    }
+
+    playAudioBlob(audioBlob) {
+        return new Promise((resolve) => {
+            const audioUrl = URL.createObjectURL(audioBlob);
+            const audio = new Audio(audioUrl);
+            const finish = () => {
+                URL.revokeObjectURL(audioUrl);
+                resolve();
+            };
+
+            audio.onended = finish;
+            audio.onerror = finish;
+            audio.play().catch(finish);
+        });
+    }
+
     base64ToBlob(base64Data, contentType) {
         const byteCharacters = atob(base64Data);
         const byteNumbers = new Array(byteCharacters.length);
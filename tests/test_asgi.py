@@ -0,0 +1,103 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+pytest.importorskip('asgiref')
+prometheus_client = pytest.importorskip('prometheus_client')
+
+import asgi
+
+
+def request(path, payload, headers=()):
+    body = json.dumps(payload).encode('utf-8')
+    scope = {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': 'POST',
+        'scheme': 'http',
+        'path': path,
+        'root_path': '',
+        'query_string': b'',
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 1234),
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('ascii')),
+            *headers
+        ]
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi.app(scope, receive, send))
+    return sent[0]['status'], json.loads(sent[1]['body'])
+
+
+def sample(name, labels):
+    return prometheus_client.REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_native_routes_are_counted_and_timed():
+    count = {'method': 'POST', 'route': '/chat', 'status': '200'}
+    latency = {'method': 'POST', 'route': '/chat'}
+    count_before = sample('serenity_http_requests_total', count)
+    latency_before = sample('serenity_http_request_duration_seconds_count', latency)
+
+    status, payload = request('/chat', {'message': 'hello'})
+
+    assert status == 200 and payload['success']
+    assert sample('serenity_http_requests_total', count) == count_before + 1
+    assert sample('serenity_http_request_duration_seconds_count', latency) == latency_before + 1
+
+
+def test_rejected_native_request_is_counted_with_its_status():
+    count = {'method': 'POST', 'route': '/chat', 'status': '400'}
+    before = sample('serenity_http_requests_total', count)
+
+    status, _ = request('/chat', {'message': ''})
+
+    assert status == 400
+    assert sample('serenity_http_requests_total', count) == before + 1
+
+
+def test_request_handed_to_flask_is_counted_once(monkeypatch):
+    monkeypatch.setattr(asgi.voice_handler, 'is_available', lambda: True)
+    count = {'method': 'POST', 'route': '/voice/text-to-speech', 'status': '400'}
+    before = sample('serenity_http_requests_total', count)
+
+    status, payload = request('/voice/text-to-speech', {'text': 'hello', 'format': 'flac'})
+
+    assert status == 400
+    assert 'Unsupported audio format' in payload['error']
+    assert sample('serenity_http_requests_total', count) == before + 1
+
+
+def test_native_requests_are_in_progress_while_handled(monkeypatch):
+    gauge = 'serenity_http_requests_in_progress'
+    queued = 'serenity_http_request_queue_seconds_count'
+    baseline = sample(gauge, {})
+    queued_before = sample(queued, {})
+    chat = asgi.app.routes[('POST', '/chat')]
+    during = []
+
+    async def observed_chat(scope, receive, send):
+        during.append(sample(gauge, {}))
+        return await chat(scope, receive, send)
+
+    monkeypatch.setitem(asgi.app.routes, ('POST', '/chat'), observed_chat)
+    stamp = f"t={time.time() - 0.25:.3f}".encode('ascii')
+
+    status, _ = request('/chat', {'message': 'hello'}, headers=[(b'x-request-start', stamp)])
+
+    assert status == 200
+    assert during == [baseline + 1]
+    assert sample(gauge, {}) == baseline
+    assert sample(queued, {}) == queued_before + 1
@@ -0,0 +1,93 @@
+import fcntl
+import os
+import threading
+
+from audio_cache import AudioCache, prewarm, prewarm_once
+from voice_handler import split_for_speech
+
+
+def wait_for_eviction(cache):
+    for thread in threading.enumerate():
+        if thread.name == 'audio-cache-evict':
+            thread.join(5)
+
+
+def test_eviction_trims_to_low_water_mark(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=1000, low_water=0.5)
+    for i in range(10):
+        key = AudioCache.make_key(f"text {i}", 'en', None, 150)
+        cache.put(key, b'x' * 100)
+        os.utime(cache.path_for(key), (i, i))
+        wait_for_eviction(cache)
+
+    cache.put(AudioCache.make_key('one too many', 'en', None, 150), b'x' * 100)
+    wait_for_eviction(cache)
+
+    remaining = sorted(os.path.getsize(path) for _, _, path in cache._entries())
+    assert sum(remaining) <= 500
+    assert cache._approximate_bytes == sum(remaining)
+    assert cache.contains(AudioCache.make_key('one too many', 'en', None, 150))
+    assert not cache.contains(AudioCache.make_key('text 0', 'en', None, 150))
+
+
+def test_writes_under_budget_do_not_walk_the_directory(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=1000)
+    cache.put(AudioCache.make_key('first', 'en', None, 150), b'x' * 100)
+    wait_for_eviction(cache)
+    assert cache._approximate_bytes == 100
+
+    walks = []
+    cache._entries = lambda: walks.append(1) or iter(())
+    cache.put(AudioCache.make_key('second', 'en', None, 150), b'x' * 100)
+    wait_for_eviction(cache)
+
+    assert walks == []
+    assert cache._approximate_bytes == 200
+
+
+class RecordingVoiceHandler:
+    def __init__(self, audio_cache=None):
+        self.audio_cache = audio_cache
+        self.rendered = []
+
+    def has_cached_speech(self, text, language):
+        return False
+
+    def text_to_speech(self, text, language):
+        self.rendered.append((text, language))
+        return 'audio', None
+
+
+class CannedAssistant:
+    def __init__(self, responses):
+        self.responses = responses
+
+    def iter_canned_responses(self):
+        return iter(self.responses)
+
+
+def test_prewarm_renders_whole_replies_and_their_streaming_chunks():
+    reply = "I'm concerned about what you've shared with me. You matter, and people can help you through this."
+    handler = RecordingVoiceHandler()
+
+    rendered, failed = prewarm(handler, CannedAssistant([(reply, 'en'), (reply, 'en')]))
+
+    chunks = split_for_speech(reply)
+    assert len(chunks) > 1
+    assert handler.rendered == [(reply, 'en')] + [(chunk, 'en') for chunk in chunks]
+    assert (rendered, failed) == (len(chunks) + 1, 0)
+
+
+def test_only_one_process_prewarms_a_cache_directory(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    canned = CannedAssistant([("Take a slow breath.", 'en')])
+
+    with open(tmp_path / '.prewarm.lock', 'w') as held:
+        # Another worker is already pre-warming
+        fcntl.flock(held, fcntl.LOCK_EX)
+        skipped = RecordingVoiceHandler(cache)
+        assert prewarm_once(skipped, canned) is None
+        assert skipped.rendered == []
+
+    handler = RecordingVoiceHandler(cache)
+    assert prewarm_once(handler, canned) == (1, 0)
@@ -0,0 +1,78 @@
+import copy
+import random
+
+import pytest
+
+import app as app_module
+from assistant import MentalHealthAssistant
+
+
+def confirmed(language):
+    return {'user_language': language, 'language_confirmed': True}
+
+
+ITEMS = [
+    ("I feel so anxious about my exams", confirmed('en')),
+    ("hello", {}),
+    ("मुझे बहुत दुख है", confirmed('hi')),
+    ("I want to die", confirmed('en')),
+    ("hindi", {}),
+    ("I am really happy today", confirmed('en'))
+]
+
+
+@pytest.fixture(scope='module')
+def assistant():
+    return MentalHealthAssistant()
+
+
+def test_batch_matches_single_messages_in_input_order(assistant, monkeypatch):
+    # Replies are picked at random from a list; always pick the first one
+    monkeypatch.setattr(random, 'choice', lambda options: options[0])
+    singles = copy.deepcopy(ITEMS)
+    batch = copy.deepcopy(ITEMS)
+
+    expected = [assistant.process_message(message, session) for message, session in singles]
+    results = assistant.process_messages(batch)
+
+    assert results == expected
+    assert [session for _, session in batch] == [session for _, session in singles]
+    assert [result.get('emotion') for result in results] == ['anxious', None, 'sad', None, None, 'default']
+    assert results[3]['crisis_detected']
+
+
+class RecordingLogger:
+    def __init__(self):
+        self.turns = []
+
+    def log_turn(self, session, message, response):
+        self.turns.append(message)
+
+
+@pytest.fixture
+def logger(monkeypatch):
+    logger = RecordingLogger()
+    monkeypatch.setattr(app_module, 'conversation_logger', logger)
+    return logger
+
+
+def post_batch():
+    return app_module.app.test_client().post('/chat/batch', json={
+        'messages': ["I feel anxious", {'message': ''}, {'message': 'I am happy', 'session': confirmed('en')}]
+    })
+
+
+def test_batch_turns_are_not_logged_by_default(logger):
+    response = post_batch()
+
+    results = response.get_json()['results']
+    assert [result['success'] for result in results] == [True, False, True]
+    assert logger.turns == []
+
+
+def test_batch_logging_can_be_enabled(logger, monkeypatch):
+    monkeypatch.setattr(app_module, 'CHAT_BATCH_LOGGING', True)
+
+    post_batch()
+
+    assert logger.turns == ["I feel anxious", "I am happy"]
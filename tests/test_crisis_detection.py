@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from assistant import MentalHealthAssistant
+
+HINDI_CRISIS = "मैं आत्महत्या करना चाहता हूँ"
+
+
+@pytest.fixture(scope='module')
+def assistant():
+    return MentalHealthAssistant()
+
+
+def english_session():
+    return {'user_language': 'en', 'language_confirmed': True}
+
+
+def test_crisis_in_unconfirmed_session_confirms_the_language(assistant):
+    session = {}
+
+    response = assistant.process_message("I want to kill myself", session)
+
+    assert response['crisis_detected']
+    assert response['language'] == 'en'
+    assert response['message'] == assistant.crisis_detector.crisis_responses['en']
+    assert session == {'user_language': 'en', 'language_confirmed': True}
+
+    # The next message continues the conversation rather than greeting the user again
+    follow_up = assistant.process_message("please help me", session)
+    assert follow_up.get('session_type') != 'language_confirmed'
+    assert not follow_up['message'].startswith('Perfect!')
+
+
+def test_hindi_crisis_in_english_session_is_answered_in_hindi(assistant):
+    session = english_session()
+
+    response = assistant.process_message(HINDI_CRISIS, session)
+
+    assert response['crisis_detected']
+    assert response['language'] == 'hi'
+    assert response['message'] == assistant.crisis_detector.crisis_responses['hi']
+    assert session['user_language'] == 'hi'
+
+
+def test_ordinary_message_is_not_a_crisis(assistant):
+    response = assistant.process_message("I feel a bit tired today", english_session())
+
+    assert not response.get('crisis_detected')
+
+
+def test_batch_flags_only_the_crisis_items(assistant):
+    sessions = [english_session(), {}, english_session()]
+    items = list(zip(["I had a calm day", "I can’t go on anymore", HINDI_CRISIS], sessions))
+
+    results = assistant.process_messages(items)
+
+    assert [bool(result.get('crisis_detected')) for result in results] == [False, True, True]
+    assert [result['language'] for result in results[1:]] == ['en', 'hi']
+    assert sessions[1] == {'user_language': 'en', 'language_confirmed': True}
+
+
+def test_async_path_answers_crisis_first(assistant):
+    session = {}
+
+    response = asyncio.run(assistant.process_message_async("I feel hopeless and want to die", session))
+
+    assert response['crisis_detected']
+    assert response['message'] == assistant.crisis_detector.crisis_responses['en']
+    assert session['language_confirmed']
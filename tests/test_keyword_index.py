@@ -0,0 +1,36 @@
+import pytest
+
+from assistant import MentalHealthAssistant
+from keyword_index import KeywordIndex
+
+
+@pytest.fixture(scope='module')
+def index():
+    return KeywordIndex()
+
+
+@pytest.mark.parametrize('text', ["Hi, I feel stressed", "hi there", "Oh hi! Not much"])
+def test_greeting_is_not_a_hindi_preference(index, text):
+    assert 'prefers_hindi' not in index.scan(text)
+
+
+@pytest.mark.parametrize('text, category', [
+    ("hi", 'prefers_hindi'),
+    ("Hin.", 'prefers_hindi'),
+    ("EN", 'prefers_english'),
+    ("eng!", 'prefers_english'),
+    ("Hindi please", 'prefers_hindi'),
+    ("I would like to communicate in English", 'prefers_english'),
+    ("हिंदी में बात करें", 'prefers_hindi')
+])
+def test_language_preferences(index, text, category):
+    assert category in index.scan(text)
+
+
+def test_greeting_with_feelings_keeps_english_session():
+    session = {}
+
+    response = MentalHealthAssistant().process_message("Hi, I feel stressed", session)
+
+    assert response['language'] == 'en'
+    assert session['user_language'] == 'en'
@@ -0,0 +1,58 @@
+import pytest
+
+from assistant import MentalHealthAssistant
+from language_detection import LanguageDetector
+
+
+@pytest.fixture(scope='module')
+def detector():
+    return LanguageDetector()
+
+
+@pytest.fixture(scope='module')
+def assistant():
+    return MentalHealthAssistant()
+
+
+@pytest.mark.parametrize('text', [
+    'depression', 'self-harm', 'Hi there', 'thanks', 'hello', 'help', 'okay',
+    "I can't sleep at night", 'I feel stressed about my exams'
+])
+def test_short_english_is_english(detector, text):
+    language, _ = detector.detect(text)
+    assert language == 'en'
+
+
+@pytest.mark.parametrize('text', [
+    'mujhe bahut tension ho rahi hai', 'main theek hoon', 'mera dil udaas hai yaar',
+    'main hindi mein baat karna chahta hoon', 'मैं ठीक हूँ'
+])
+def test_hindi_is_hindi(detector, text):
+    language, confidence = detector.detect(text)
+    assert language == 'hi'
+    assert confidence >= 0.6
+
+
+@pytest.mark.parametrize('word', ['pareshan', 'xyzzy', 'kya'])
+def test_single_word_is_never_confident_hindi(detector, word):
+    language, confidence = detector.detect(word)
+    assert language == 'en' or confidence < 0.6
+
+
+@pytest.mark.parametrize('text', ['depression', 'thanks', 'Hi there', 'mujhe bahut tension ho rahi hai'])
+def test_confirmed_english_session_keeps_english(assistant, text):
+    session = {'language_confirmed': True, 'user_language': 'en'}
+    response = assistant.process_message(text, session)
+    assert response['language'] == 'en'
+    assert session['user_language'] == 'en'
+
+
+def test_confirmed_hindi_session_keeps_hindi_for_english_word(assistant):
+    session = {'language_confirmed': True, 'user_language': 'hi'}
+    assert assistant.process_message('thanks', session)['language'] == 'hi'
+
+
+def test_confirmed_session_switches_on_clear_evidence(assistant):
+    session = {'language_confirmed': True, 'user_language': 'en'}
+    assert assistant.process_message('मैं आज बहुत उदास हूँ', session)['language'] == 'hi'
+    assert session['user_language'] == 'hi'
@@ -0,0 +1,131 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+import app as app_module
+from meditation_tracking import ABANDON_SQL, COMPLETE_SQL, START_SQL, MeditationTracker
+
+
+class RecordingWriter:
+    def __init__(self, accept=True):
+        self.accept = accept
+        self.submitted = []
+
+    def submit(self, statement, params, key=None, limit=None):
+        self.submitted.append((statement, params))
+        return self.accept
+
+
+class SessionInterface:
+    def __init__(self, persisted):
+        self.persisted = persisted
+        self.persist_calls = 0
+
+    def persist(self, session):
+        self.persist_calls += 1
+        return self.persisted
+
+
+class StatsEngine:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+
+    def connect(self):
+        engine = self
+
+        class Connection:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                return False
+
+            def execute(self, statement):
+                engine.queries += 1
+                if isinstance(engine.rows, Exception):
+                    raise engine.rows
+                return SimpleNamespace(all=lambda: engine.rows)
+
+        return Connection()
+
+
+def test_start_persists_the_session_before_queueing():
+    writer = RecordingWriter()
+    sessions = SessionInterface(persisted=True)
+    tracker = MeditationTracker(None, writer, sessions)
+
+    meditation_id = tracker.start(SimpleNamespace(sid='abc'), 'breathing', '5', 'en')
+
+    assert uuid.UUID(meditation_id)
+    assert sessions.persist_calls == 1
+    assert writer.submitted == [(START_SQL, {
+        'id': meditation_id,
+        'session_id': 'abc',
+        'meditation_type': 'breathing',
+        'duration': 5,
+        'language': 'en'
+    })]
+
+
+def test_unpersisted_session_is_not_referenced():
+    writer = RecordingWriter()
+    tracker = MeditationTracker(None, writer, SessionInterface(persisted=False))
+
+    tracker.complete(SimpleNamespace(sid='abc'), 'id-1')
+    tracker.abandon(SimpleNamespace(sid='abc'), 'id-2')
+
+    assert writer.submitted == [
+        (COMPLETE_SQL, {'id': 'id-1', 'session_id': None}),
+        (ABANDON_SQL, {'id': 'id-2', 'session_id': None})
+    ]
+
+
+def test_start_returns_none_when_the_queue_is_full():
+    tracker = MeditationTracker(None, RecordingWriter(accept=False))
+
+    assert tracker.start({}, 'breathing', '5', 'en') is None
+
+
+def test_stats_are_cached_and_served_stale_on_failure():
+    engine = StatsEngine([('breathing', 5, 'en', 4, 3, 1), ('body_scan', 10, 'hi', 0, 0, 0)])
+    tracker = MeditationTracker(engine, RecordingWriter(), stats_ttl=60)
+
+    stats = tracker.stats()
+    assert stats[0]['completion_rate'] == 0.75
+    assert stats[1]['completion_rate'] == 0.0
+    assert tracker.stats() is stats
+    assert engine.queries == 1
+
+    tracker.stats_ttl = 0
+    engine.rows = RuntimeError('database is down')
+    assert tracker.stats() is stats
+
+
+@pytest.fixture
+def client(monkeypatch):
+    writer = RecordingWriter()
+    monkeypatch.setattr(app_module, 'meditation_tracker', MeditationTracker(None, writer))
+    client = app_module.app.test_client()
+    client.writer = writer
+    return client
+
+
+@pytest.mark.parametrize('language', [['en'], {'code': 'en'}, 7])
+def test_start_route_rejects_a_language_that_is_not_a_string(client, language):
+    response = client.post('/meditation/sessions', json={
+        'session_type': 'breathing', 'duration': '5', 'language': language
+    })
+
+    assert response.status_code == 400
+    assert client.writer.submitted == []
+
+
+def test_start_route_queues_a_known_script(client):
+    response = client.post('/meditation/sessions', json={
+        'session_type': 'breathing', 'duration': '5', 'language': 'en'
+    })
+
+    assert response.status_code == 202
+    assert uuid.UUID(response.get_json()['meditation_id'])
@@ -0,0 +1,69 @@
+from crisis_detection import CrisisDetector
+from phrase_matcher import PhraseMatcher
+
+
+def matcher(*phrases, prefix=False):
+    built = PhraseMatcher()
+    for phrase, label in phrases:
+        built.add(phrase, label, prefix=prefix)
+    return built.build()
+
+
+def test_english_phrases_match_whole_words_only():
+    words = matcher(("burden", 'worthlessness'))
+
+    assert words.find_labels("I am a burden to everyone") == {'worthlessness'}
+    assert words.find_labels("Burden.") == {'worthlessness'}
+    assert words.find_labels("I feel burdened at work") == set()
+    assert words.find_labels("unburden yourself") == set()
+
+
+def test_hindi_stems_match_across_vowel_signs():
+    stems = matcher(("बोझ", 'worthlessness'), ("मरना चाहता", 'suicidal_ideation'), prefix=True)
+
+    # Inflected endings that start with a vowel sign still count as the stem
+    assert stems.find_labels("मैं सब पर बोझा हूँ") == {'worthlessness'}
+    assert stems.find_labels("मैं मरना चाहती हूँ") == set()
+    assert stems.find_labels("मैं मरना चाहता हूँ।") == {'suicidal_ideation'}
+    # A vowel sign before the stem makes it part of another word
+    assert stems.find_labels("कोबोझ") == set()
+
+
+def test_curly_apostrophes_match_straight_ones():
+    hopeless = matcher(("can't go on", 'hopelessness'))
+
+    assert hopeless.find_labels("I can’t go on") == {'hopelessness'}
+    assert hopeless.find_labels("I CAN‘T GO ON") == {'hopelessness'}
+    assert hopeless.find_labels("I can't  go\non") == {'hopelessness'}
+
+
+def test_overlapping_phrases_are_all_reported():
+    overlapping = matcher(("self harm", 'self_harm'), ("harm", 'harm'), ("elf", 'elf'), ("f h", 'gap'))
+
+    matches = sorted(overlapping.iter_matches("thoughts of self harm"))
+
+    # harm is only reachable through the failure link from "self harm"
+    assert (12, 21, 'self_harm') in matches
+    assert (17, 21, 'harm') in matches
+    # Substrings inside other words are rejected by the boundary check
+    assert all(label not in ('elf', 'gap') for _, _, label in matches)
+
+
+def test_failure_links_recover_after_a_partial_match():
+    words = matcher(("want to die", 'suicidal_ideation'), ("to die for", 'praise'))
+
+    assert words.find_labels("I want to want to die") == {'suicidal_ideation'}
+    assert words.find_labels("a cake to die for") == {'praise'}
+
+
+def test_prescreen_finds_every_category_in_one_scan():
+    detector = CrisisDetector()
+
+    categories = detector.prescreen(
+        "I feel hopeless and worthless, I want to hurt myself and I want to die"
+    )
+
+    assert categories == ['hopelessness', 'self_harm', 'suicidal_ideation', 'worthlessness']
+    assert detector.prescreen("आत्महत्या, निराशा, काटना, बोझ") == [
+        'hopelessness', 'self_harm', 'suicidal_ideation', 'worthlessness'
+    ]
@@ -0,0 +1,98 @@
+import pytest
+
+from sentiment_engine import BENCHMARK_SAMPLES, SentimentEngine
+
+# Held out from BENCHMARK_SAMPLES, which the lexicon was written against:
+# (message, expected to read as negative)
+HELD_OUT_SAMPLES = [
+    ("I can't stop crying", True),
+    ("na jaane kyun bura lag raha hai", True),
+    ("never felt this happy", False),
+    ("I had a wonderful time with my family", False),
+    ("My sister and I had fun at the park", False),
+    ("I'm proud of how I handled it", False),
+    ("work was fine, nothing special", False),
+    ("I feel safe here", False),
+    ("thanks, that breathing exercise was nice", False),
+    ("can we try a meditation", False),
+    ("I slept well and feel rested", False),
+    ("I'm not sure what to do", False),
+    ("I feel so lonely these days", True),
+    ("everything feels hopeless", True),
+    ("I failed my exam and feel worthless", True),
+    ("I am really angry at myself", True),
+    ("I'm tired of feeling this way", True),
+    ("my chest hurts when I panic", True),
+    ("I feel like a failure", True),
+    ("It has been a terrible week", True),
+    ("I'm not okay", True),
+    ("I'm scared about tomorrow", True),
+    ("nobody cares, I feel empty", True),
+    ("I am not feeling good today", True),
+    ("aaj ka din bahut accha tha", False),
+    ("mujhe sukoon mil raha hai", False),
+    ("main khush hoon yaar", False),
+    ("sab kuch kharab ho gaya", True),
+    ("mann bahut bechain hai", True),
+    ("main bahut thaka hua hoon", True),
+    ("mujhe accha nahi lag raha", True),
+    ("koi baat nahi, main theek hoon", False),
+    ("आज मैं बहुत खुश हूँ", False),
+    ("मुझे बहुत दर्द हो रहा है", True),
+    ("मैं अकेला महसूस करता हूँ", True),
+    ("मुझे अच्छा नहीं लग रहा", True),
+    ("सब ठीक है", False),
+    ("मेरा दिन खराब था", True),
+]
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return SentimentEngine()
+
+
+def is_negative(engine, text):
+    return engine.score(text) < -0.1
+
+
+@pytest.mark.parametrize('text, negative', [
+    ("I can't stop crying", True),
+    ("na jaane kyun bura lag raha hai", True),
+    ("never felt this happy", False),
+    ("I don't feel good at all", True),
+    ("khush nahi hoon", True),
+    ("accha lag nahi raha", True),
+    ("I am not bad, just a bit tired", False),
+])
+def test_negation_scope(engine, text, negative):
+    assert is_negative(engine, text) == negative
+
+
+def test_stray_postfix_negator_is_ignored(engine):
+    assert engine.score('na jaane kyun bura lag raha hai') == engine.score('jaane kyun bura lag raha hai')
+
+
+def test_clause_break_ends_negation(engine):
+    assert engine.score('not now. happy') > 0
+
+
+def test_no_sentiment_words_scores_zero(engine):
+    assert engine.score('what time is the session') == 0.0
+
+
+def test_scores_are_bounded(engine):
+    assert engine.score('extremely extremely extremely terrible') == -1.0
+
+
+def test_batch_matches_single(engine):
+    texts = [text for text, _ in HELD_OUT_SAMPLES]
+    assert list(engine.score_batch(texts)) == [engine.score(text) for text in texts]
+
+
+def test_benchmark_samples(engine):
+    assert all(is_negative(engine, text) == negative for text, _, negative in BENCHMARK_SAMPLES)
+
+
+def test_held_out_accuracy(engine):
+    correct = sum(is_negative(engine, text) == negative for text, negative in HELD_OUT_SAMPLES)
+    assert correct / len(HELD_OUT_SAMPLES) >= 0.85
@@ -0,0 +1,183 @@
+import pytest
+from flask import Flask, session
+
+from conversation_log import ConversationLogger
+from session_store import (
+    DELETE_SESSIONS_SQL, DETACH_SESSION_SQL, EXPIRED_SESSIONS_SQL, LOAD_SESSION_SQL,
+    SAVE_SESSION_SQL, DatabaseSessionInterface, ServerSideSession
+)
+
+
+class RecordingEngine:
+    """Stands in for a SQLAlchemy engine, recording every statement in order"""
+
+    def __init__(self, rows=None, fail_loads=False, fail_writes=False):
+        self.rows = rows
+        self.fail_loads = fail_loads
+        self.fail_writes = fail_writes
+        self.expired = []
+        self.events = []
+
+    def connect(self):
+        return Connection(self, writes=False)
+
+    def begin(self):
+        return Connection(self, writes=True)
+
+    def statements(self, sql):
+        return [params for statement, params in self.events if statement == sql]
+
+
+class Connection:
+    def __init__(self, engine, writes):
+        self.engine = engine
+        self.writes = writes
+
+    def __enter__(self):
+        if (self.engine.fail_writes if self.writes else self.engine.fail_loads):
+            raise RuntimeError('database is down')
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.engine.events.append((sql, params))
+        if sql == EXPIRED_SESSIONS_SQL:
+            return [(sid,) for sid in self.engine.expired.pop(0)]
+        return Result(self.engine.rows)
+
+
+class Result:
+    def __init__(self, row):
+        self.row = row
+
+    def first(self):
+        return self.row
+
+
+def make_app(engine):
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.session_interface = DatabaseSessionInterface(engine)
+
+    @app.route('/greet')
+    def greet():
+        session['user_language'] = 'hi'
+        return 'ok'
+
+    return app
+
+
+def signed_cookie(app, sid):
+    with app.app_context():
+        return app.session_interface._signer(app).sign(sid).decode('ascii')
+
+
+def test_session_that_failed_to_load_is_never_written():
+    engine = RecordingEngine(fail_loads=True)
+    app = make_app(engine)
+    client = app.test_client()
+    client.set_cookie('session', signed_cookie(app, 'abc'))
+
+    response = client.get('/greet')
+
+    assert response.status_code == 200
+    assert 'Set-Cookie' not in response.headers
+    assert engine.statements(SAVE_SESSION_SQL) == []
+
+
+def test_loaded_session_is_updated_in_place():
+    engine = RecordingEngine(rows=({'user_language': 'en'},))
+    app = make_app(engine)
+    client = app.test_client()
+    client.set_cookie('session', signed_cookie(app, 'abc'))
+
+    client.get('/greet')
+
+    assert engine.statements(LOAD_SESSION_SQL)[0]['session_id'] == 'abc'
+    assert [params['session_id'] for params in engine.statements(SAVE_SESSION_SQL)] == ['abc']
+    assert engine.statements(SAVE_SESSION_SQL)[0]['user_language'] == 'hi'
+
+
+def test_persist_writes_a_session_once_until_it_changes():
+    engine = RecordingEngine()
+    interface = DatabaseSessionInterface(engine)
+    new_session = ServerSideSession(sid='abc', new=True)
+
+    assert interface.persist(new_session)
+    assert interface.persist(new_session)
+    assert len(engine.statements(SAVE_SESSION_SQL)) == 1
+
+    new_session['user_language'] = 'hi'
+    assert interface.persist(new_session)
+    assert len(engine.statements(SAVE_SESSION_SQL)) == 2
+
+
+def test_persist_reports_failed_and_unwritable_sessions():
+    engine = RecordingEngine(fail_writes=True)
+    interface = DatabaseSessionInterface(engine)
+
+    failed = ServerSideSession(sid='abc', new=True)
+    assert not interface.persist(failed)
+    assert not failed.persisted
+
+    engine.fail_writes = False
+    assert interface.persist(failed)
+
+    unwritable = ServerSideSession({'user_language': 'en'}, sid='def', writable=False)
+    unwritable.modified = True
+    assert not interface.persist(unwritable)
+    assert [params['session_id'] for params in engine.statements(SAVE_SESSION_SQL)] == ['abc']
+
+
+class EngineWriter:
+    """Write-behind stand-in that records queued rows in the engine's event log"""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def submit(self, statement, params, key=None, limit=None):
+        self.engine.events.append((statement, params))
+        return True
+
+
+def test_session_row_is_written_before_the_rows_that_reference_it():
+    engine = RecordingEngine()
+    logger = ConversationLogger(EngineWriter(engine), DatabaseSessionInterface(engine), spill_path='')
+
+    logger.log_turn(ServerSideSession(sid='abc', new=True), 'hello', {'message': 'hi there'})
+
+    statements = [statement for statement, _ in engine.events]
+    assert statements[0] == SAVE_SESSION_SQL
+    assert [params['session_id'] for _, params in engine.events[1:]] == ['abc', 'abc']
+
+
+def test_prune_detaches_analytics_rows_and_deletes_in_batches():
+    engine = RecordingEngine()
+    engine.expired = [['a', 'b'], ['c']]
+
+    assert DatabaseSessionInterface(engine).prune(3600, batch_size=2) == 3
+
+    batch = [EXPIRED_SESSIONS_SQL, *DETACH_SESSION_SQL, DELETE_SESSIONS_SQL]
+    assert [statement for statement, _ in engine.events] == batch + batch
+    assert engine.events[0][1] == {'max_age': 3600, 'batch_size': 2}
+    assert engine.events[3][1] == {'session_ids': ['a', 'b']}
+    assert engine.events[7][1] == {'session_ids': ['c']}
+
+
+def test_prune_stops_when_the_database_fails():
+    engine = RecordingEngine(fail_writes=True)
+
+    assert DatabaseSessionInterface(engine).prune(3600) == 0
+
+
+@pytest.mark.parametrize('expired', [[[]], [['a', 'b'], []]])
+def test_prune_stops_after_a_short_batch(expired):
+    engine = RecordingEngine()
+    engine.expired = expired
+    total = sum(map(len, expired))
+
+    assert DatabaseSessionInterface(engine).prune(3600, batch_size=2) == total
+    assert engine.expired == []
@@ -0,0 +1,66 @@
+import pytest
+
+import app as app_module
+from warmup import IMPORT_BUDGET_MS, Warmup, measure_import_time
+
+
+def test_importing_the_app_stays_within_budget():
+    elapsed_ms = measure_import_time() * 1000
+
+    assert elapsed_ms < IMPORT_BUDGET_MS, f"importing the app took {elapsed_ms:.0f} ms"
+
+
+def test_warmup_reports_each_step_and_survives_failures():
+    def broken():
+        raise RuntimeError('no voice libraries')
+
+    warmup = Warmup([('assistant', lambda: None), ('voice', broken)])
+    assert warmup.report() == {
+        'ready': False, 'components': {'assistant': 'pending', 'voice': 'pending'}
+    }
+
+    warmup.start()
+    warmup._thread.join(5)
+
+    report = warmup.report()
+    assert report['ready']
+    assert report['components'] == {'assistant': 'ready', 'voice': 'failed'}
+    assert report['warmup_seconds'] >= 0
+
+
+def test_skipped_warmup_is_ready_with_lazy_components():
+    warmup = Warmup([('assistant', lambda: None)])
+
+    warmup.skip()
+
+    assert warmup.report() == {'ready': True, 'components': {'assistant': 'lazy'}}
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def test_healthz_answers_before_warmup_finishes(client, monkeypatch):
+    monkeypatch.setattr(app_module, 'warmup', Warmup([('voice', lambda: None)]))
+
+    response = client.get('/healthz')
+
+    assert response.status_code == 200
+    assert response.get_json() == {'status': 'ok'}
+
+
+def test_readyz_waits_for_warmup(client, monkeypatch):
+    warmup = Warmup([('voice', lambda: None)])
+    monkeypatch.setattr(app_module, 'warmup', warmup)
+
+    pending = client.get('/readyz')
+    assert pending.status_code == 503
+    assert pending.get_json()['components'] == {'voice': 'pending'}
+
+    warmup.start()
+    warmup._thread.join(5)
+
+    ready = client.get('/readyz')
+    assert ready.status_code == 200
+    assert ready.get_json()['components'] == {'voice': 'ready'}
@@ -0,0 +1,96 @@
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from tts_pool import TTSWorkerPool, select_voice_ids, voice_for_language
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def idle_pool(**kwargs):
+    pool = TTSWorkerPool(size=1, max_pending=2, submit_timeout=1, **kwargs)
+    # No engine is needed, so skip the worker initializer
+    pool._get_executor()._initializer = None
+    return pool
+
+
+def worker_state():
+    return 'app' in sys.modules, sorted(thread.name for thread in threading.enumerate())
+
+
+def test_timed_out_job_is_killed_and_pool_recycled():
+    pool = idle_pool(synthesis_timeout=0.5)
+    executor = pool._executor
+    pool._call(time.sleep, 0)
+    worker = next(iter(executor._processes.values()))
+
+    with pytest.raises(TimeoutError):
+        pool._call(time.sleep, 30)
+
+    worker.join(5)
+    assert not worker.is_alive()
+    assert pool._executor is None
+    assert pool.pending == 0
+
+
+def test_languages_without_a_voice_fall_back_to_the_default():
+    voices = [
+        SimpleNamespace(id='en-us', name='English (America)'),
+        SimpleNamespace(id='fr-fr', name='French')
+    ]
+    voice_ids = select_voice_ids(voices)
+
+    assert voice_for_language(voice_ids, 'en') == 'en-us'
+    assert voice_for_language(voice_ids, 'hi') == 'en-us'
+    assert voice_for_language(voice_ids, 'ta') == 'en-us'
+
+
+def test_pool_worker_does_not_import_app():
+    pool = idle_pool(synthesis_timeout=30)
+    try:
+        imports_app, _ = pool._call(worker_state)
+    finally:
+        pool.shutdown()
+
+    assert not imports_app
+
+
+def test_pool_worker_of_a_script_importing_app_starts_no_services(tmp_path):
+    # Run as a script, the main module and with it app are imported again in every pool worker
+    script = tmp_path / 'serve.py'
+    script.write_text(textwrap.dedent("""
+        import threading
+
+        import app
+        from tts_pool import TTSWorkerPool
+
+
+        def worker_threads():
+            return sorted(thread.name for thread in threading.enumerate())
+
+
+        if __name__ == '__main__':
+            pool = TTSWorkerPool(size=1, max_pending=1, submit_timeout=1, synthesis_timeout=60)
+            pool._get_executor()._initializer = None
+            print(pool._call(worker_threads))
+            pool.shutdown()
+    """))
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT), WARMUP_ON_START='0')
+    env.pop('DATABASE_URL', None)
+
+    result = subprocess.run(
+        [sys.executable, str(script)], cwd=tmp_path, env=env,
+        capture_output=True, text=True, timeout=120
+    )
+
+    assert result.returncode == 0, result.stderr
+    threads = result.stdout.strip().splitlines()[-1]
+    assert 'voice-capability-probe' not in threads
+    assert 'warmup' not in threads
@@ -0,0 +1,53 @@
+import threading
+
+from voice_capabilities import VoiceCapabilityRegistry
+
+
+class SlowVoiceHandler:
+    def __init__(self):
+        self.initialized = False
+        self.release = threading.Event()
+        self.initializations = 0
+        self.supported_languages = {'en': 'en-US', 'hi': 'hi-IN'}
+        self.recognizer = object()
+        self.tts_available = True
+
+    def ensure_initialized(self):
+        self.initializations += 1
+        self.release.wait(5)
+        self.initialized = True
+
+    def is_available(self):
+        assert self.initialized, 'probed before the voice stack was initialized'
+        return True
+
+    def get_available_voices(self):
+        return []
+
+
+def test_status_reports_initializing_without_blocking_the_request():
+    handler = SlowVoiceHandler()
+    registry = VoiceCapabilityRegistry(handler, interval=60)
+
+    first = registry.status()
+    second = registry.status()
+
+    assert first['initializing'] and not first['available']
+    assert first['supported_languages'] == ['en', 'hi']
+    assert second['initializing']
+
+    handler.release.set()
+    registry._initializer.join(5)
+
+    ready = registry.status()
+    assert ready['available'] and 'initializing' not in ready
+    assert handler.initializations == 1
+
+
+def test_status_probes_once_the_voice_stack_is_initialized():
+    handler = SlowVoiceHandler()
+    handler.initialized = True
+    registry = VoiceCapabilityRegistry(handler, interval=60)
+
+    assert registry.status()['available']
+    assert registry._initializer is None
@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+sqlalchemy = pytest.importorskip('sqlalchemy')
+
+from sqlalchemy import create_engine, event, text
+
+from conversation_log import INSERT_LOG
+from write_behind import BatchWriter
+
+UPSERT_SQL = "INSERT OR REPLACE INTO parents (id, name) VALUES (:id, :name)"
+CHILD_SQL = "INSERT INTO children (parent_id) VALUES (:parent_id)"
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://')
+    with engine.begin() as connection:
+        connection.execute(text("""
+            CREATE TABLE conversation_logs (
+                session_id TEXT, message_type TEXT, message_content TEXT,
+                language TEXT, emotion_detected TEXT, crisis_detected BOOLEAN
+            )
+        """))
+    return engine
+
+
+def idle_writer(engine):
+    # Claim the writer thread for this process so nothing flushes behind the test's back
+    writer = BatchWriter(engine, batch_size=10, flush_interval=0)
+    writer._pid = os.getpid()
+    return writer
+
+
+def log_row(content):
+    return {
+        'session_id': None,
+        'message_type': 'user',
+        'message_content': content,
+        'language': 'en',
+        'emotion_detected': None,
+        'crisis_detected': False
+    }
+
+
+def test_log_rows_are_written_as_one_multi_row_insert(engine):
+    # SQLite only batches inserts that use RETURNING; PostgreSQL batches all of them
+    engine.dialect.use_insertmanyvalues_wo_returning = True
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda conn, cursor, statement, *args: statements.append(statement))
+
+    writer = idle_writer(engine)
+    writer._write([[INSERT_LOG, log_row(f"message {i}"), None] for i in range(5)])
+
+    assert len(statements) == 1
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM conversation_logs")).scalar() == 5
+
+
+def test_requeue_keeps_parent_ahead_of_its_children(engine):
+    writer = idle_writer(engine)
+    writer.submit(UPSERT_SQL, {'id': 1, 'name': 'old'}, key=1)
+    writer.submit(CHILD_SQL, {'parent_id': 1})
+    batch = writer._take_batch()
+
+    # The parent is resubmitted while its batch is failing
+    writer.submit(UPSERT_SQL, {'id': 1, 'name': 'new'}, key=1)
+    writer.submit(CHILD_SQL, {'parent_id': 1})
+    writer._requeue(batch)
+
+    assert [(statement, params) for statement, params, _ in writer._pending] == [
+        (UPSERT_SQL, {'id': 1, 'name': 'new'}),
+        (CHILD_SQL, {'parent_id': 1}),
+        (CHILD_SQL, {'parent_id': 1})
+    ]
+
+    # Later submissions still coalesce into the requeued row
+    writer.submit(UPSERT_SQL, {'id': 1, 'name': 'newest'}, key=1)
+    assert writer.pending() == 3
+    assert writer._pending[0][1] == {'id': 1, 'name': 'newest'}
@@ -0,0 +1,184 @@
+import os
+import logging
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+# Engine settings shared by the pool workers and the in-process fallback
+TTS_RATE = 150
+TTS_VOLUME = 0.8
+
+# Per-process engine state inside a pool worker
+_engine = None
+_voice_ids = {}
+_current_language = None
+
+
+def select_voice_ids(voices):
+    """Pick one voice id per supported language from the engine's voice list"""
+    voice_ids = {}
+
+    for voice in voices or []:
+        name = voice.name.lower()
+        if 'female' in name or 'zira' in name:
+            voice_ids.setdefault('default', voice.id)
+        if 'hindi' in name or 'hi-' in voice.id:
+            voice_ids.setdefault('hi', voice.id)
+        if 'english' in name or 'en-' in voice.id:
+            voice_ids.setdefault('en', voice.id)
+
+    # Hindi falls back to the English voice, as the single-engine handler did
+    if 'hi' not in voice_ids and 'en' in voice_ids:
+        voice_ids['hi'] = voice_ids['en']
+
+    # Without a preferred default voice, languages without their own fall back to English
+    if 'default' not in voice_ids and 'en' in voice_ids:
+        voice_ids['default'] = voice_ids['en']
+
+    return voice_ids
+
+
+def voice_for_language(voice_ids, language):
+    """Pre-selected voice id for language, falling back to the default voice"""
+    return voice_ids.get(language) or voice_ids.get('default')
+
+
+def describe_voices(voices):
+    """Summarize an engine's voice list for the voice status API"""
+    return [
+        {
+            'id': voice.id,
+            'name': voice.name,
+            'language': getattr(voice, 'languages', ['unknown']),
+            'gender': getattr(voice, 'gender', 'unknown')
+        }
+        for voice in voices or []
+    ]
+
+
+def _init_worker():
+    """Create this worker's engine and pre-select its per-language voices"""
+    global _engine, _voice_ids
+    import pyttsx3
+    _engine = pyttsx3.init()
+    _engine.setProperty('rate', TTS_RATE)
+    _engine.setProperty('volume', TTS_VOLUME)
+    _voice_ids = select_voice_ids(_engine.getProperty('voices'))
+    if 'default' in _voice_ids:
+        _engine.setProperty('voice', _voice_ids['default'])
+
+
+def _synthesize(text, language):
+    """Render text to WAV bytes with this worker's engine"""
+    global _current_language
+
+    if language != _current_language:
+        voice_id = voice_for_language(_voice_ids, language)
+        if voice_id:
+            _engine.setProperty('voice', voice_id)
+        _current_language = language
+
+    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
+        temp_file_path = temp_file.name
+
+    try:
+        _engine.save_to_file(text, temp_file_path)
+        _engine.runAndWait()
+        with open(temp_file_path, 'rb') as audio_file:
+            return audio_file.read()
+    finally:
+        os.unlink(temp_file_path)
+
+
+def _describe():
+    """Voice ids and voice list of this worker's engine"""
+    return _voice_ids, describe_voices(_engine.getProperty('voices'))
+
+
+class TTSPoolBusy(Exception):
+    """Raised when the synthesis queue is full"""
+
+
+class TTSWorkerPool:
+    """Pool of TTS worker processes, one pyttsx3 engine each, behind a bounded queue"""
+
+    def __init__(self, size=None, max_pending=None, submit_timeout=None, synthesis_timeout=None):
+        self.size = size if size is not None else int(os.environ.get('TTS_POOL_SIZE', '2'))
+        self.max_pending = max_pending if max_pending is not None else int(os.environ.get('TTS_POOL_MAX_PENDING', '16'))
+        self.submit_timeout = submit_timeout if submit_timeout is not None else float(os.environ.get('TTS_POOL_SUBMIT_TIMEOUT', '2'))
+        self.synthesis_timeout = synthesis_timeout if synthesis_timeout is not None else float(os.environ.get('TTS_POOL_SYNTHESIS_TIMEOUT', '60'))
+
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+        self.pending = 0
+
+    def _get_executor(self):
+        # Started lazily so a preloading master never owns engine processes
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.size,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker
+                )
+            return self._executor
+
+    def _reset_executor(self, executor=None, kill=False):
+        """Drop the current executor, unless it was already replaced since executor was taken
+
+        With kill, its worker processes are terminated too, which is the only
+        way to stop a synthesis that is already running.
+        """
+        with self._lock:
+            if self._executor is None or (executor is not None and self._executor is not executor):
+                return
+            executor = self._executor
+            self._executor = None
+
+        processes = list((getattr(executor, '_processes', None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        if kill:
+            for process in processes:
+                process.terminate()
+
+    def synthesize(self, text, language='en'):
+        """Render text to WAV bytes in a pool worker
+
+        Raises TTSPoolBusy when max_pending requests are already queued.
+        """
+        return self._call(_synthesize, text, language)
+
+    def describe(self):
+        """Return (voice ids, voice list) of the workers' engine, starting a worker if needed"""
+        return self._call(_describe)
+
+    def _call(self, func, *args):
+        if not self._slots.acquire(timeout=self.submit_timeout):
+            raise TTSPoolBusy('Speech synthesis is busy')
+
+        with self._lock:
+            self.pending += 1
+        executor = None
+        try:
+            executor = self._get_executor()
+            return executor.submit(func, *args).result(timeout=self.synthesis_timeout)
+        except BrokenProcessPool:
+            logging.error("TTS worker pool crashed, restarting it")
+            self._reset_executor(executor)
+            raise
+        except FutureTimeoutError:
+            # A running job cannot be cancelled, so kill the stuck worker by recycling the pool
+            logging.error(f"Speech synthesis exceeded {self.synthesis_timeout}s, recycling the TTS worker pool")
+            self._reset_executor(executor, kill=True)
+            raise TimeoutError(f"Speech synthesis exceeded {self.synthesis_timeout}s")
+        finally:
+            with self._lock:
+                self.pending -= 1
+            self._slots.release()
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        self._reset_executor()
@@ -0,0 +1,136 @@
+import os
+import time
+import logging
+import threading
+
+# How often the probe thread checks whether the voice stack has been initialized yet
+INITIALIZATION_POLL_INTERVAL = 5
+
+
+class VoiceCapabilityRegistry:
+    """Cached view of what the voice stack can do, refreshed in the background
+
+    Passive probes only inspect the recognizer, TTS engine and voice list, so
+    serving /voice/status never synthesizes audio. Active self-tests that do
+    synthesize are run on demand and their last result is kept alongside.
+    """
+
+    def __init__(self, voice_handler, interval=None):
+        self.voice_handler = voice_handler
+        self.interval = interval if interval is not None else float(os.environ.get('VOICE_PROBE_INTERVAL', '300'))
+        self._status = None
+        self._self_test = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._initializer = None
+
+    def probe(self):
+        """Inspect the voice stack without synthesizing audio and cache the result"""
+        handler = self.voice_handler
+        status = {
+            'available': handler.is_available(),
+            'speech_recognition': handler.recognizer is not None,
+            'text_to_speech': handler.tts_available,
+            'supported_languages': list(handler.supported_languages.keys()),
+            'error': None
+        }
+
+        if status['available']:
+            try:
+                status['available_voices'] = handler.get_available_voices()
+            except Exception as e:
+                status['error'] = str(e)
+
+        status['checked_at'] = time.time()
+
+        with self._lock:
+            self._status = status
+        return status
+
+    def self_test(self):
+        """Run the active voice self-test, which synthesizes audio, and cache its result"""
+        results = self.voice_handler.test_voice_functionality()
+        results['checked_at'] = time.time()
+
+        with self._lock:
+            self._self_test = results
+        return results
+
+    def status(self):
+        """Return the cached capability status without initializing the voice stack
+
+        Until the voice stack has been initialized, reports it as initializing
+        and starts the initialization in the background instead of in the
+        calling request; once it is initialized, probes if nothing is cached.
+        """
+        with self._lock:
+            status = self._status
+            self_test = self._self_test
+
+        if status is None:
+            if self.voice_handler.initialized:
+                status = self.probe()
+            else:
+                self._initialize_in_background()
+                status = self._initializing_status()
+
+        status = dict(status)
+        if self_test:
+            status['last_self_test'] = self_test
+        return status
+
+    def _initializing_status(self):
+        return {
+            'available': False,
+            'initializing': True,
+            'speech_recognition': False,
+            'text_to_speech': False,
+            'supported_languages': list(self.voice_handler.supported_languages.keys()),
+            'error': None,
+            'checked_at': time.time()
+        }
+
+    def _initialize_in_background(self):
+        with self._lock:
+            if self._initializer is not None:
+                return
+            self._initializer = threading.Thread(target=self._initialize, name='voice-initialize', daemon=True)
+        self._initializer.start()
+
+    def _initialize(self):
+        try:
+            self.voice_handler.ensure_initialized()
+            self.probe()
+        except Exception as e:
+            logging.error(f"Voice initialization failed: {e}")
+
+    def start(self):
+        """Probe every interval seconds on a daemon thread once the voice stack is initialized
+
+        Probing would itself initialize the voice stack, so the thread leaves
+        that to the warm-up, the first voice request or the first status()
+        call, which starts it in the background.
+        """
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='voice-capability-probe', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self.voice_handler.initialized:
+            if self._stop.wait(INITIALIZATION_POLL_INTERVAL):
+                return
+
+        while True:
+            try:
+                self.probe()
+            except Exception as e:
+                logging.error(f"Voice capability probe failed: {e}")
+            if self._stop.wait(self.interval):
+                return
@@ -1,302 +1,533 @@
 import os
+import asyncio
 import logging
 import tempfile
+import re
 import base64
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 import json
 
-try:
-    import speech_recognition as sr
-    import pyttsx3
-    from pydub import AudioSegment
-    import threading
-except ImportError as e:
-    logging.warning(f"Voice libraries not installed: {e}")
-    sr = None
-    pyttsx3 = None
-    AudioSegment = None
+# Voice libraries are slow to import, so they are loaded with the components
+# on first use or by the background warmup rather than at module import
+sr = None
+pyttsx3 = None
+AudioSegment = None
+
+
+def _load_voice_libraries():
+    global sr, pyttsx3, AudioSegment
+    try:
+        import speech_recognition as sr
+        import pyttsx3
+        from pydub import AudioSegment
+    except ImportError as e:
+        logging.warning(f"Voice libraries not installed: {e}")
+
+from tts_pool import (
+    TTSWorkerPool, TTSPoolBusy, TTS_RATE, TTS_VOLUME,
+    select_voice_ids, voice_for_language, describe_voices
+)
+from audio_cache import AudioCache, create_audio_cache
+from metrics import timed_stage, voice_job
+from resilience import RemoteDependency, DependencyUnavailable
+
+# Format the recognizer is fed, regardless of what the browser recorded
+RECOGNITION_SAMPLE_RATE = 16000
+RECOGNITION_SAMPLE_WIDTH = 2
+
+# Formats text_to_speech can return, with their MIME types
+AUDIO_FORMATS = {
+    'wav': 'audio/wav',
+    'mp3': 'audio/mpeg',
+    'ogg': 'audio/ogg'
+}
+
+
+# Sentence ends in English and Hindi (danda), and paragraph breaks
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?।])\s+|\n+')
+MARKDOWN_EMPHASIS = re.compile(r'[*_`#]+')
+
+# Chunks shorter than this are merged into the next one to avoid choppy playback
+MIN_SPEECH_CHUNK_CHARS = 40
+
+
+def split_for_speech(text):
+    """Split text into sentence-sized chunks suitable for incremental synthesis"""
+    chunks = []
+    pending = ''
+
+    for piece in SENTENCE_BOUNDARY.split(text):
+        piece = MARKDOWN_EMPHASIS.sub('', piece).strip()
+        if not piece:
+            continue
+        pending = f"{pending} {piece}" if pending else piece
+        if len(pending) >= MIN_SPEECH_CHUNK_CHARS:
+            chunks.append(pending)
+            pending = ''
+
+    if pending:
+        if chunks and len(pending) < MIN_SPEECH_CHUNK_CHARS // 2:
+            chunks[-1] = f"{chunks[-1]} {pending}"
+        else:
+            chunks.append(pending)
+
+    return chunks
+
+
+def sniff_audio_container(buffer):
+    """Identify the audio container from its magic bytes"""
+    header = bytes(buffer[:12])
+    if header[:4] == b'RIFF' and header[8:12] == b'WAVE':
+        return 'wav'
+    if header[:4] == b'OggS':
+        return 'ogg'
+    if header[:4] == b'\x1aE\xdf\xa3':
+        return 'webm'
+    if header[:4] == b'fLaC':
+        return 'flac'
+    if header[:4] == b'FORM' and header[8:12] in (b'AIFF', b'AIFC'):
+        return 'aiff'
+    if header[4:8] == b'ftyp':
+        return 'mp4'
+    if header[:3] == b'ID3' or (len(header) > 1 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return 'mp3'
+    return None
 
 class VoiceHandler:
     def __init__(self):
-        """Initialize voice handler with speech recognition and TTS"""
-        self.recognizer = None
-        self.tts_engine = None
+        """Initialize voice handler; speech components are created on first use"""
+        self._recognizer = None
+        self._tts_engine = None
+        self._tts_pool = None
+        self._audio_cache = None
+        self._voice_ids = {}
+        self._voices = []
+        self._initialized = False
+        self._init_lock = threading.Lock()
+        # The in-process engine is not thread-safe; it is only used without a pool
+        self._tts_lock = threading.Lock()
+        # Dispatches streamed chunks so several can synthesize at once
+        self._stream_executor = ThreadPoolExecutor(
+            max_workers=int(os.environ.get('TTS_STREAM_PARALLELISM', '2')),
+            thread_name_prefix='tts-stream'
+        )
         self.supported_languages = {
             'en': 'en-US',
             'hi': 'hi-IN'
         }
         
-        self.initialize_components()
+        # Deadline, circuit breaker and concurrency limit for Google speech recognition
+        self.speech_service = RemoteDependency.from_env('google_speech', 'SPEECH_RECOGNITION', timeout=10, max_concurrent=4)
+        
+        # Deadlines used by the async variants in the ASGI serving mode
+        self.speech_timeout = float(os.environ.get('ASYNC_SPEECH_TIMEOUT', '20'))
+        self.synthesis_timeout = float(os.environ.get('ASYNC_SYNTHESIS_TIMEOUT', '30'))
+    
+    @property
+    def initialized(self):
+        return self._initialized
+    
+    @property
+    def recognizer(self):
+        self.ensure_initialized()
+        return self._recognizer
+    
+    @property
+    def tts_engine(self):
+        self.ensure_initialized()
+        return self._tts_engine
+    
+    @property
+    def tts_pool(self):
+        self.ensure_initialized()
+        return self._tts_pool
+    
+    @property
+    def audio_cache(self):
+        self.ensure_initialized()
+        return self._audio_cache
+    
+    @property
+    def tts_available(self):
+        """Whether text-to-speech works, in the pool workers or in this process"""
+        return self.tts_pool is not None or self.tts_engine is not None
+    
+    @property
+    def voice_ids(self):
+        self.ensure_initialized()
+        return self._voice_ids
+    
+    def preload_libraries(self):
+        """Import the voice libraries without creating any engine; safe before fork"""
+        with timed_stage('startup', 'voice_libraries'):
+            _load_voice_libraries()
+    
+    def ensure_initialized(self):
+        """Load the voice libraries and create the components once, on first use"""
+        if self._initialized:
+            return
+        
+        with self._init_lock:
+            if not self._initialized:
+                with timed_stage('startup', 'voice_components'):
+                    self.initialize_components()
+                self._initialized = True
     
     def initialize_components(self):
         """Initialize speech recognition and TTS components"""
+        _load_voice_libraries()
+        
         try:
             if sr:
-                self.recognizer = sr.Recognizer()
+                self._recognizer = sr.Recognizer()
                 # Adjust for ambient noise
-                self.recognizer.energy_threshold = 300
-                self.recognizer.dynamic_energy_threshold = True
-                self.recognizer.pause_threshold = 0.8
+                self._recognizer.energy_threshold = 300
+                self._recognizer.dynamic_energy_threshold = True
+                self._recognizer.pause_threshold = 0.8
+                # Abandoned calls still end, freeing their bulkhead slot
+                self._recognizer.operation_timeout = self.speech_service.timeout
                 
             if pyttsx3:
-                self.tts_engine = pyttsx3.init()
-                self._configure_tts()
+                if int(os.environ.get('TTS_POOL_SIZE', '2')) > 0:
+                    # The engines live in the pool workers; this process never creates one
+                    self._start_tts_pool()
+                else:
+                    self._tts_engine = pyttsx3.init()
+                    self._configure_tts()
+                
+                self._audio_cache = create_audio_cache()
                 
             logging.info("Voice components initialized successfully")
             
         except Exception as e:
             logging.error(f"Failed to initialize voice components: {e}")
     
+    def _start_tts_pool(self):
+        """Start the TTS pool and take the voice settings from one of its workers"""
+        pool = TTSWorkerPool()
+        try:
+            self._voice_ids, self._voices = pool.describe()
+        except Exception as e:
+            logging.error(f"TTS worker pool failed to start: {e}")
+            pool.shutdown()
+            return
+        self._tts_pool = pool
+    
     def _configure_tts(self):
         """Configure text-to-speech engine"""
-        if not self.tts_engine:
+        if not self._tts_engine:
             return
             
         try:
             # Set properties
-            self.tts_engine.setProperty('rate', 150)  # Speed
-            self.tts_engine.setProperty('volume', 0.8)  # Volume
+            self._tts_engine.setProperty('rate', TTS_RATE)  # Speed
+            self._tts_engine.setProperty('volume', TTS_VOLUME)  # Volume
             
-            # Try to find appropriate voices
-            voices = self.tts_engine.getProperty('voices')
-            if voices:
-                # Prefer female voice if available
-                for voice in voices:
-                    if 'female' in voice.name.lower() or 'zira' in voice.name.lower():
-                        self.tts_engine.setProperty('voice', voice.id)
-                        break
+            # Pre-select one voice per language, preferring a female default
+            self._voice_ids = select_voice_ids(self._tts_engine.getProperty('voices'))
+            if 'default' in self._voice_ids:
+                self._tts_engine.setProperty('voice', self._voice_ids['default'])
                         
         except Exception as e:
             logging.error(f"TTS configuration error: {e}")
     
     def is_available(self):
         """Check if voice functionality is available"""
-        return self.recognizer is not None and self.tts_engine is not None
+        return self.recognizer is not None and self.tts_available
     
     def speech_to_text(self, audio_data, language='en'):
-        """Convert speech audio to text"""
+        """Convert base64-encoded speech audio to text"""
         if not self.recognizer:
             return None, "Speech recognition not available"
         
+        # Validate base64 input
+        if not audio_data or len(audio_data) < 100:
+            return None, "No audio data received or data too small"
+        
+        # Convert base64 audio data to audio format
         try:
-            # Validate base64 input
-            if not audio_data or len(audio_data) < 100:
-                return None, "No audio data received or data too small"
-            
-            # Convert base64 audio data to audio format
-            try:
+            with timed_stage('voice', 'decode'):
                 audio_bytes = base64.b64decode(audio_data)
-                logging.info(f"Received audio data: {len(audio_bytes)} bytes")
-            except Exception as decode_error:
-                logging.error(f"Base64 decode error: {decode_error}")
-                return None, "Invalid audio data format"
-            
+            logging.info(f"Received audio data: {len(audio_bytes)} bytes")
+        except Exception as decode_error:
+            logging.error(f"Base64 decode error: {decode_error}")
+            return None, "Invalid audio data format"
+        
+        return self.speech_to_text_bytes(audio_bytes, language)
+    
+    def speech_to_text_bytes(self, audio_bytes, language='en'):
+        """Convert raw speech audio bytes to text without touching the disk"""
+        if not self.recognizer:
+            return None, "Speech recognition not available"
+        
+        try:
             if len(audio_bytes) < 1000:
                 return None, "Audio data too small. Please record for at least 1 second."
             
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                temp_file.write(audio_bytes)
-                temp_file_path = temp_file.name
-            
-            try:
-                # Validate and convert audio file if needed
-                audio_processed = False
-                
-                # First try to validate the original file
-                if self._validate_audio_file(temp_file_path):
-                    audio_processed = True
-                    logging.info("Original audio file is valid")
-                elif AudioSegment:
-                    # Try to convert using pydub if available
-                    try:
-                        logging.info("Attempting to convert audio file")
-                        audio_segment = AudioSegment.from_file(temp_file_path)
-                        
-                        # Normalize audio: convert to mono, 16kHz, 16-bit
-                        audio_segment = audio_segment.set_frame_rate(16000).set_channels(1)
-                        
-                        # Ensure minimum length (at least 0.5 seconds)
-                        if len(audio_segment) < 500:
-                            return None, "Audio recording too short. Please speak for at least 0.5 seconds."
-                        
-                        # Create new temporary file
-                        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as converted_file:
-                            converted_path = converted_file.name
-                        
-                        # Export as WAV with specific parameters
-                        audio_segment.export(
-                            converted_path, 
-                            format="wav",
-                            parameters=["-ac", "1", "-ar", "16000"]
-                        )
-                        
-                        # Clean up original file and use converted one
-                        os.unlink(temp_file_path)
-                        temp_file_path = converted_path
-                        audio_processed = True
-                        
-                        logging.info(f"Audio file converted successfully, duration: {len(audio_segment)}ms")
-                        
-                    except Exception as conv_error:
-                        logging.error(f"Audio conversion failed: {conv_error}")
-                        return None, f"Audio conversion failed: {str(conv_error)}. Please try recording again."
+            with voice_job('stt'):
+                with timed_stage('voice', 'convert'):
+                    audio, error = self._decode_audio(memoryview(audio_bytes))
+                if error:
+                    return None, error
                 
-                if not audio_processed:
-                    return None, "Could not process audio file. Please try recording again with a different browser or device."
+                audio_data_size = len(audio.frame_data)
+                logging.info(f"Audio prepared for recognition: {audio_data_size} bytes")
                 
-                # Load and process audio file
-                with sr.AudioFile(temp_file_path) as source:
-                    # Adjust for ambient noise with shorter duration
-                    try:
-                        self.recognizer.adjust_for_ambient_noise(source, duration=0.2)
-                    except Exception as noise_error:
-                        logging.warning(f"Could not adjust for ambient noise: {noise_error}")
-                    
-                    # Record the entire audio file
-                    audio = self.recognizer.record(source)
-                    
-                    audio_data_size = len(audio.get_raw_data())
-                    logging.info(f"Audio recorded for recognition: {audio_data_size} bytes")
-                    
-                    if audio_data_size < 1000:
-                        return None, "Processed audio too small. Please speak longer and more clearly."
+                if audio_data_size < 1000:
+                    return None, "Processed audio too small. Please speak longer and more clearly."
                 
-                # Convert language code
-                google_lang = self.supported_languages.get(language, 'en-US')
+                return self._recognize(audio, language)
+            
+        except Exception as e:
+            logging.error(f"Speech to text error: {e}")
+            return None, f"Error processing audio: {str(e)}"
+    
+    def _decode_audio(self, buffer):
+        """Decode an uploaded buffer into 16 kHz mono 16-bit sr.AudioData in memory"""
+        container = sniff_audio_container(buffer)
+        logging.info(f"Detected audio container: {container or 'unknown'}")
+        
+        if AudioSegment:
+            try:
+                audio_segment = AudioSegment.from_file(BytesIO(buffer), format=container)
                 
-                # Recognize speech using Google Speech Recognition with timeout
-                try:
-                    logging.info(f"Attempting speech recognition with language: {google_lang}")
-                    text = self.recognizer.recognize_google(
-                        audio, 
-                        language=google_lang,
-                        show_all=False
-                    )
-                    
-                    if not text or not text.strip():
-                        logging.warning("Empty text returned from speech recognition")
-                        return None, "No speech detected. Please speak more clearly and try again."
-                    
-                    logging.info(f"Speech recognition successful: {text}")
-                    return text.strip(), None
-                    
-                except sr.UnknownValueError:
-                    logging.warning("Speech recognition could not understand audio")
-                    return None, "Could not understand the audio. Please speak more clearly, louder, or try again."
-                    
-                except sr.RequestError as req_error:
-                    logging.error(f"Speech recognition service error: {req_error}")
-                    if "quota" in str(req_error).lower():
-                        return None, "Speech recognition quota exceeded. Please try again later."
-                    elif "network" in str(req_error).lower():
-                        return None, "Network error connecting to speech recognition service. Please check your internet connection."
-                    else:
-                        return None, f"Speech recognition service error: {req_error}"
+                # Normalize audio: convert to mono, 16kHz, 16-bit
+                audio_segment = (
+                    audio_segment
+                    .set_frame_rate(RECOGNITION_SAMPLE_RATE)
+                    .set_channels(1)
+                    .set_sample_width(RECOGNITION_SAMPLE_WIDTH)
+                )
                 
-                except Exception as recognition_error:
-                    logging.error(f"Unexpected speech recognition error: {recognition_error}")
-                    return None, f"Speech recognition failed: {str(recognition_error)}"
+                # Ensure minimum length (at least 0.5 seconds)
+                if len(audio_segment) < 500:
+                    return None, "Audio recording too short. Please speak for at least 0.5 seconds."
                 
-            finally:
-                # Clean up temporary file
-                if os.path.exists(temp_file_path):
-                    try:
-                        os.unlink(temp_file_path)
-                    except Exception as cleanup_error:
-                        logging.warning(f"Could not clean up temp file: {cleanup_error}")
+                logging.info(f"Audio decoded in memory, duration: {len(audio_segment)}ms")
+                return sr.AudioData(audio_segment.raw_data, RECOGNITION_SAMPLE_RATE, RECOGNITION_SAMPLE_WIDTH), None
                 
-        except Exception as e:
-            logging.error(f"Speech to text error: {e}")
-            return None, f"Error processing audio: {str(e)}"
+            except Exception as conv_error:
+                logging.error(f"Audio conversion failed: {conv_error}")
+                return None, f"Audio conversion failed: {str(conv_error)}. Please try recording again."
+        
+        if container in ('wav', 'flac', 'aiff'):
+            # Without pydub, speech_recognition can still read these from a buffer
+            try:
+                with sr.AudioFile(BytesIO(buffer)) as source:
+                    return self.recognizer.record(source), None
+            except Exception as read_error:
+                logging.warning(f"Audio buffer validation failed: {read_error}")
+        
+        return None, "Could not process audio file. Please try recording again with a different browser or device."
     
-    def _validate_audio_file(self, file_path):
-        """Validate if audio file can be read by speech_recognition"""
+    def _recognize(self, audio, language):
+        """Run Google speech recognition on prepared audio"""
+        # Convert language code
+        google_lang = self.supported_languages.get(language, 'en-US')
+        
+        # Recognize speech using Google Speech Recognition
         try:
-            with sr.AudioFile(file_path) as source:
-                # Try to read a small portion
-                self.recognizer.record(source, duration=0.1)
-            return True
-        except Exception as e:
-            logging.warning(f"Audio file validation failed: {e}")
-            return False
+            logging.info(f"Attempting speech recognition with language: {google_lang}")
+            with timed_stage('voice', 'recognize'):
+                text = self.speech_service.call(
+                    self.recognizer.recognize_google,
+                    audio, 
+                    language=google_lang,
+                    show_all=False,
+                    expected=(sr.UnknownValueError,)
+                )
+            
+            if not text or not text.strip():
+                logging.warning("Empty text returned from speech recognition")
+                return None, "No speech detected. Please speak more clearly and try again."
+            
+            logging.info(f"Speech recognition successful: {text}")
+            return text.strip(), None
+            
+        except DependencyUnavailable as unavailable:
+            logging.warning(f"Speech recognition skipped: {unavailable}")
+            return None, "Speech recognition is temporarily unavailable. Please type your message instead."
+            
+        except sr.UnknownValueError:
+            logging.warning("Speech recognition could not understand audio")
+            return None, "Could not understand the audio. Please speak more clearly, louder, or try again."
+            
+        except sr.RequestError as req_error:
+            logging.error(f"Speech recognition service error: {req_error}")
+            if "quota" in str(req_error).lower():
+                return None, "Speech recognition quota exceeded. Please try again later."
+            elif "network" in str(req_error).lower():
+                return None, "Network error connecting to speech recognition service. Please check your internet connection."
+            else:
+                return None, f"Speech recognition service error: {req_error}"
+        
+        except Exception as recognition_error:
+            logging.error(f"Unexpected speech recognition error: {recognition_error}")
+            return None, f"Speech recognition failed: {str(recognition_error)}"
+    
+    async def speech_to_text_async(self, audio_data, language='en'):
+        """Async variant of speech_to_text with a recognition deadline"""
+        return await self._recognize_with_deadline(self.speech_to_text, audio_data, language)
+    
+    async def speech_to_text_bytes_async(self, audio_bytes, language='en'):
+        """Async variant of speech_to_text_bytes with a recognition deadline"""
+        return await self._recognize_with_deadline(self.speech_to_text_bytes, audio_bytes, language)
+    
+    async def _recognize_with_deadline(self, func, audio, language):
+        try:
+            return await asyncio.wait_for(asyncio.to_thread(func, audio, language), self.speech_timeout)
+        except asyncio.TimeoutError:
+            logging.error(f"Speech recognition exceeded {self.speech_timeout}s deadline")
+            return None, "Speech recognition timed out. Please try again."
     
     def text_to_speech(self, text, language='en'):
         """Convert text to speech audio"""
-        if not self.tts_engine:
+        if not self.tts_available:
             return None, "Text-to-speech not available"
         
         try:
-            # Create temporary file for audio output
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                temp_file_path = temp_file.name
-            
-            # Configure voice for language if possible
-            self._set_voice_for_language(language)
-            
-            # Save speech to file
-            self.tts_engine.save_to_file(text, temp_file_path)
-            self.tts_engine.runAndWait()
-            
-            # Read the audio file and convert to base64
-            with open(temp_file_path, 'rb') as audio_file:
-                audio_data = audio_file.read()
-                audio_base64 = base64.b64encode(audio_data).decode('utf-8')
-            
-            # Clean up
-            os.unlink(temp_file_path)
+            audio_data = self.synthesize_audio(text, language)
             
+            audio_base64 = base64.b64encode(audio_data).decode('utf-8')
             return audio_base64, None
             
+        except TTSPoolBusy:
+            logging.warning("Text to speech rejected: synthesis queue is full")
+            return None, "Voice service is busy. Please try again in a moment."
+            
         except Exception as e:
             logging.error(f"Text to speech error: {e}")
             return None, f"Error generating speech: {e}"
     
+    def speech_etag(self, text, language='en', audio_format='wav'):
+        """Stable identifier of the audio text renders to with the current voice settings"""
+        voice_id = voice_for_language(self.voice_ids, language)
+        return AudioCache.make_key(text, language, voice_id, TTS_RATE, audio_format)
+    
+    def has_cached_speech(self, text, language='en', audio_format='wav'):
+        """Check whether text has already been rendered into the audio cache"""
+        return bool(self.audio_cache) and self.audio_cache.contains(self.speech_etag(text, language, audio_format))
+    
+    def synthesize_audio(self, text, language='en', audio_format='wav'):
+        """Render text to audio bytes, serving repeated text from the audio cache"""
+        if audio_format not in AUDIO_FORMATS:
+            raise ValueError(f"Unsupported audio format: {audio_format}")
+        
+        cache_key = None
+        if self.audio_cache:
+            cache_key = self.speech_etag(text, language, audio_format)
+            cached = self.audio_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        if audio_format != 'wav':
+            wav_data = self.synthesize_audio(text, language)
+            with timed_stage('voice', 'convert'):
+                audio_data = self._transcode(wav_data, audio_format)
+        else:
+            with voice_job('tts'), timed_stage('voice', 'synthesize'):
+                if self.tts_pool:
+                    audio_data = self.tts_pool.synthesize(text, language)
+                else:
+                    audio_data = self._synthesize_in_process(text, language)
+        
+        if cache_key:
+            self.audio_cache.put(cache_key, audio_data)
+        
+        return audio_data
+    
+    def _transcode(self, wav_bytes, audio_format):
+        """Compress WAV audio into audio_format in memory"""
+        if not AudioSegment:
+            raise ValueError(f"Audio format {audio_format} requires pydub")
+        
+        output = BytesIO()
+        AudioSegment.from_wav(BytesIO(wav_bytes)).export(output, format=audio_format)
+        return output.getvalue()
+    
+    def _synthesize_in_process(self, text, language):
+        """Render text to WAV bytes with the shared engine, one request at a time"""
+        with self._tts_lock:
+            # Create temporary file for audio output
+            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
+                temp_file_path = temp_file.name
+            
+            try:
+                # Configure voice for language if possible
+                self._set_voice_for_language(language)
+                
+                # Save speech to file
+                self.tts_engine.save_to_file(text, temp_file_path)
+                self.tts_engine.runAndWait()
+                
+                with open(temp_file_path, 'rb') as audio_file:
+                    return audio_file.read()
+            finally:
+                os.unlink(temp_file_path)
+    
+    def iter_speech_chunks(self, text, language='en'):
+        """Synthesize text sentence by sentence, yielding (index, chunk, wav_bytes, error) in order
+        
+        All chunks are submitted up front so later ones render while earlier
+        ones are being delivered; the first chunk is ready as soon as it alone
+        has been synthesized.
+        """
+        chunks = split_for_speech(text)
+        futures = [
+            self._stream_executor.submit(self.synthesize_audio, chunk, language)
+            for chunk in chunks
+        ]
+        
+        try:
+            for index, (chunk, future) in enumerate(zip(chunks, futures)):
+                try:
+                    yield index, chunk, future.result(), None
+                except TTSPoolBusy:
+                    yield index, chunk, None, "Voice service is busy. Please try again in a moment."
+                except Exception as e:
+                    logging.error(f"Streaming synthesis error: {e}")
+                    yield index, chunk, None, f"Error generating speech: {e}"
+        finally:
+            # The client went away or the stream ended; drop work not yet started
+            for future in futures:
+                future.cancel()
+    
+    async def text_to_speech_async(self, text, language='en'):
+        """Async variant of text_to_speech with a synthesis deadline"""
+        try:
+            return await asyncio.wait_for(
+                asyncio.to_thread(self.text_to_speech, text, language),
+                self.synthesis_timeout
+            )
+        except asyncio.TimeoutError:
+            logging.error(f"Speech synthesis exceeded {self.synthesis_timeout}s deadline")
+            return None, "Speech generation timed out. Please try again."
+    
     def _set_voice_for_language(self, language):
-        """Set appropriate voice for the given language"""
+        """Set the pre-selected voice for the given language"""
         if not self.tts_engine:
             return
         
         try:
-            voices = self.tts_engine.getProperty('voices')
-            if not voices:
-                return
-            
-            # Language-specific voice selection
-            if language == 'hi':
-                # Look for Hindi voice
-                for voice in voices:
-                    if 'hindi' in voice.name.lower() or 'hi-' in voice.id:
-                        self.tts_engine.setProperty('voice', voice.id)
-                        return
-            
-            # Default to English voice
-            for voice in voices:
-                if 'english' in voice.name.lower() or 'en-' in voice.id:
-                    self.tts_engine.setProperty('voice', voice.id)
-                    return
+            voice_id = voice_for_language(self.voice_ids, language)
+            if voice_id:
+                self.tts_engine.setProperty('voice', voice_id)
                     
         except Exception as e:
             logging.error(f"Voice selection error: {e}")
     
     def get_available_voices(self):
         """Get list of available voices"""
+        if self.tts_pool:
+            return self._voices
+        
         if not self.tts_engine:
             return []
         
         try:
-            voices = self.tts_engine.getProperty('voices')
-            voice_info = []
-            
-            for voice in voices:
-                voice_info.append({
-                    'id': voice.id,
-                    'name': voice.name,
-                    'language': getattr(voice, 'languages', ['unknown']),
-                    'gender': getattr(voice, 'gender', 'unknown')
-                })
-            
-            return voice_info
+            return describe_voices(self.tts_engine.getProperty('voices'))
             
         except Exception as e:
             logging.error(f"Error getting voices: {e}")
@@ -312,7 +543,7 @@ class VoiceHandler:
         
         try:
             # Test TTS
-            if self.tts_engine:
+            if self.tts_available:
                 test_audio, error = self.text_to_speech("Testing voice functionality", 'en')
                 if test_audio and not error:
                     results['text_to_speech'] = True
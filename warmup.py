@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+import logging
+import threading
+import subprocess
+
+# Longest a fresh interpreter may take to import the app, checked by tests/test_startup.py
+IMPORT_BUDGET_MS = float(os.environ.get('STARTUP_IMPORT_BUDGET_MS', '1000'))
+
+
+class Warmup:
+    """Loads slow components on a background thread and reports readiness
+
+    Each step is a (name, callable) pair run in order. A failing step is
+    recorded but does not block readiness: the component it loads is
+    retried lazily on first use, and callers already fall back without it.
+    """
+
+    def __init__(self, steps):
+        self.steps = steps
+        self.status = {name: 'pending' for name, _ in steps}
+        self.started_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self._done.is_set()
+
+    def start(self):
+        """Run the warmup steps on a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name='warmup', daemon=True)
+        self._thread.start()
+
+    def skip(self):
+        """Report ready immediately and leave every component to load on first use"""
+        for name in self.status:
+            self.status[name] = 'lazy'
+        self._done.set()
+
+    def _run(self):
+        try:
+            for name, step in self.steps:
+                self.status[name] = 'loading'
+                try:
+                    step()
+                    self.status[name] = 'ready'
+                except Exception as e:
+                    logging.error(f"Warmup of {name} failed: {e}")
+                    self.status[name] = 'failed'
+        finally:
+            self.finished_at = time.monotonic()
+            self._done.set()
+
+    def report(self):
+        report = {
+            'ready': self.ready,
+            'components': dict(self.status)
+        }
+        if self.started_at is not None and self.finished_at is not None:
+            report['warmup_seconds'] = round(self.finished_at - self.started_at, 3)
+        return report
+
+
+def measure_import_time(module='main'):
+    """Seconds a fresh interpreter takes to import module with warmup disabled"""
+    code = f"import time; started = time.perf_counter(); import {module}; print(time.perf_counter() - started)"
+    env = dict(os.environ, WARMUP_ON_START='0')
+    result = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    # Import-time budget check for CI: python warmup.py [budget_ms]
+    logging.basicConfig(level=logging.INFO)
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else IMPORT_BUDGET_MS
+    elapsed_ms = measure_import_time() * 1000
+
+    if elapsed_ms > budget_ms:
+        logging.error(f"Importing the app took {elapsed_ms:.0f} ms, over the {budget_ms:.0f} ms budget")
+        sys.exit(1)
+
+    logging.info(f"Importing the app took {elapsed_ms:.0f} ms (budget {budget_ms:.0f} ms)")
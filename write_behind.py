@@ -0,0 +1,187 @@
+import os
+import time
+import logging
+import threading
+from itertools import groupby
+from metrics import timed_stage, WRITE_BEHIND_PENDING, WRITE_BEHIND_DROPPED
+
+try:
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+except ImportError:
+    text = None
+    OperationalError = None
+
+
+class BatchWriter:
+    """Write-behind queue applying database statements in batches on one background thread
+
+    Statements run in submission order inside one transaction per batch, so
+    a row is never written before a row it references. A submission with a
+    coalesce key replaces a still-pending one with the same statement and
+    key, which collapses repeated upserts of the same row into one write.
+
+    A statement is either SQL text or a Core insert() construct. Runs of the
+    same insert() are sent as multi-row INSERTs by SQLAlchemy's
+    insertmanyvalues; SQL text is executed once per row, so only use it
+    for statements Core cannot express.
+    """
+
+    def __init__(self, engine, batch_size=None, flush_interval=None, max_pending=None, retry_interval=None):
+        self.engine = engine
+        self.batch_size = batch_size if batch_size is not None else int(os.environ.get('WRITE_BEHIND_BATCH_SIZE', '200'))
+        self.flush_interval = flush_interval if flush_interval is not None else float(os.environ.get('WRITE_BEHIND_FLUSH_INTERVAL', '0.5'))
+        self.max_pending = max_pending if max_pending is not None else int(os.environ.get('WRITE_BEHIND_MAX_PENDING', '10000'))
+        self.retry_interval = retry_interval if retry_interval is not None else float(os.environ.get('WRITE_BEHIND_RETRY_INTERVAL', '2'))
+
+        self._pending = []
+        self._by_key = {}
+        self._statements = {}
+        self._condition = threading.Condition()
+        self._thread = None
+        self._pid = None
+        self._closed = False
+        self.written = 0
+        self.dropped = 0
+
+    def submit(self, statement, params, key=None, limit=None):
+        """Queue a statement for writing; return False if the queue is full and it was dropped
+
+        limit caps the queue length at which this submission is accepted,
+        letting low-priority writes leave headroom for more important ones.
+        """
+        with self._condition:
+            self._ensure_started()
+
+            if key is not None:
+                entry = self._by_key.get((statement, key))
+                if entry is not None:
+                    entry[1] = params
+                    return True
+
+            if len(self._pending) >= min(self.max_pending, limit or self.max_pending):
+                self._record_dropped(1, 'queue_full')
+                return False
+
+            entry = [statement, params, key]
+            self._pending.append(entry)
+            if key is not None:
+                self._by_key[(statement, key)] = entry
+            WRITE_BEHIND_PENDING.set(len(self._pending))
+
+            if len(self._pending) == 1 or len(self._pending) >= self.batch_size:
+                self._condition.notify()
+            return True
+
+    def pending(self):
+        with self._condition:
+            return len(self._pending)
+
+    def close(self, timeout=5):
+        """Flush what is queued and stop the writer thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._thread and self._pid == os.getpid():
+            self._thread.join(timeout)
+
+    def _ensure_started(self):
+        # Started lazily, and again after a fork, since threads do not survive fork
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._closed = False
+            self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+            self._thread.start()
+
+    def _record_dropped(self, count, reason):
+        self.dropped += count
+        WRITE_BEHIND_DROPPED.labels(reason).inc(count)
+
+    def _take_batch(self):
+        with self._condition:
+            while not self._pending and not self._closed:
+                self._condition.wait()
+            if len(self._pending) < self.batch_size and not self._closed:
+                # Give a partial batch the flush interval to fill up
+                self._condition.wait(self.flush_interval)
+
+            batch = self._pending[:self.batch_size]
+            del self._pending[:len(batch)]
+            for statement, _, key in batch:
+                if key is not None:
+                    self._by_key.pop((statement, key), None)
+            WRITE_BEHIND_PENDING.set(len(self._pending))
+            return batch
+
+    def _requeue(self, batch):
+        """Put a batch that failed transiently back at the head of the queue
+
+        A row resubmitted meanwhile keeps its place in the batch, with the
+        newer parameters, rather than being written after the rows queued
+        behind it that may reference it.
+        """
+        with self._condition:
+            superseded = set()
+            for entry in batch:
+                statement, _, key = entry
+                if key is None:
+                    continue
+                newer = self._by_key.get((statement, key))
+                if newer is not None:
+                    entry[1] = newer[1]
+                    superseded.add(id(newer))
+                self._by_key[(statement, key)] = entry
+            if superseded:
+                self._pending = [entry for entry in self._pending if id(entry) not in superseded]
+            self._pending[:0] = batch
+            WRITE_BEHIND_PENDING.set(len(self._pending))
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                if self._closed:
+                    return
+                continue
+
+            if not self._flush(batch):
+                self._requeue(batch)
+                if self._closed:
+                    return
+                time.sleep(self.retry_interval)
+
+    def _flush(self, batch):
+        """Write a batch; return False if it should be retried later"""
+        try:
+            with timed_stage('database', 'write_behind_flush'):
+                self._write(batch)
+            self.written += len(batch)
+            return True
+        except Exception as e:
+            if OperationalError is not None and isinstance(e, OperationalError):
+                logging.error(f"Write-behind flush failed, will retry: {e}")
+                return False
+            logging.error(f"Write-behind batch rejected, writing rows individually: {e}")
+
+        # One bad row must not take the rest of its batch down with it
+        for entry in batch:
+            try:
+                self._write([entry])
+                self.written += 1
+            except Exception as e:
+                logging.error(f"Dropping write-behind row: {e}")
+                self._record_dropped(1, 'rejected')
+        return True
+
+    def _write(self, batch):
+        with self.engine.begin() as connection:
+            for statement, entries in groupby(batch, key=lambda entry: entry[0]):
+                connection.execute(self._compile(statement), [entry[1] for entry in entries])
+
+    def _compile(self, statement):
+        if not isinstance(statement, str):
+            return statement
+        compiled = self._statements.get(statement)
+        if compiled is None:
+            compiled = self._statements[statement] = text(statement)
+        return compiled